@@ -3,26 +3,176 @@ FastAPI wrapper for the Fitgirl scraper backend.
 This keeps all scraping logic in Python while exposing HTTP endpoints for Flutter.
 """
 
-from fastapi import FastAPI, HTTPException
+import asyncio
+import contextvars
+import functools
+import json
+import os
+import time
+from contextlib import asynccontextmanager, contextmanager
+
+from fastapi import FastAPI, HTTPException, Query
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from fastapi.routing import APIRoute
 from pydantic import BaseModel
-from typing import List, Optional
+from typing import Dict, List, Optional
 import uvicorn
 
-# Import the new scraping functions with PrivateBin decryption support
+# Async scraping functions share one pooled HTTP client so routes never block the event loop
 from fetch_fitgirl import (
-    search_fitgirl,
-    fetch_download_links,
-    decrypt_privatebin_paste,
-    fetch_fuckingfast_page,
-    fetch_popular_repacks,
-    fetch_game_metadata,
-    fetch_home,
-    fetch_home_latest,
-    fetch_upcoming_list,
+    search_games_async,
+    SEARCH_MODES,
+    fetch_download_links_async,
+    decrypt_privatebin_paste_async,
+    fetch_fuckingfast_page_async,
+    fuckingfast_urls_from,
+    resolve_fuckingfast_links_async,
+    fetch_popular_repacks_async,
+    fetch_game_metadata_async,
+    fetch_game_metadata_batch_async,
+    fetch_game_async,
+    fetch_home_async,
+    fetch_home_latest_async,
+    fetch_upcoming_list_async,
+    close_async_client,
+    cache_stats,
+    cpu_stats,
+    start_cpu_pool,
+    stop_cpu_pool,
+    start_cache_sweeper,
+    stop_cache_sweeper,
+    init_persistent_cache,
+    close_persistent_cache,
+    start_prewarm,
+    stop_prewarm,
+    BATCH_CONCURRENCY,
+    STAGE_SECONDS,
+)
+from metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, REGISTRY
+from crawler import index_mirror
+from log_config import setup_logging
+from tracing import TracingMiddleware, exporter_from_env, span
+
+HTTP_REQUEST_SECONDS = REGISTRY.histogram(
+    'fitgirl_http_request_seconds', 'API request duration by route, method and status', ('route', 'method', 'status'),
 )
+HTTP_IN_FLIGHT = REGISTRY.gauge('fitgirl_http_requests_in_flight', 'API requests being handled', ('route',))
+# Route template of the request being handled, the "fetcher" label of its serialize stage
+_CURRENT_ROUTE = contextvars.ContextVar('current_route', default='other')
+# OTLP/JSON trace file when FITGIRL_TRACE_FILE is set; Server-Timing headers are always sent
+TRACE_EXPORTER = exporter_from_env()
+# The crawler's SQLite mirror; every game in it is added to the local search index at startup
+CATALOG_DB_PATH = os.environ.get("FITGIRL_CATALOG_DB", "")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Before anything logs; uvicorn keeps its own handlers for its access and error logs
+    setup_logging()
+    init_persistent_cache()
+    if CATALOG_DB_PATH:
+        await asyncio.to_thread(index_mirror, CATALOG_DB_PATH)
+    start_cache_sweeper()
+    # Spawning and warming process workers blocks; keep it off the event loop
+    await asyncio.to_thread(start_cpu_pool)
+    start_prewarm()
+    yield
+    await stop_prewarm()
+    stop_cache_sweeper()
+    close_persistent_cache()
+    await close_async_client()
+    await asyncio.to_thread(stop_cpu_pool)
+    if TRACE_EXPORTER is not None:
+        TRACE_EXPORTER.close()
+
+
+@contextmanager
+def _serialize_stage():
+    with span('serialize'), STAGE_SECONDS.time(fetcher=_CURRENT_ROUTE.get(), stage='serialize'):
+        yield
+
+
+class TimedJSONResponse(JSONResponse):
+    """JSONResponse that records its serialization time per route."""
+
+    def render(self, content) -> bytes:
+        with _serialize_stage():
+            return super().render(content)
+
+
+class TracedRoute(APIRoute):
+    """
+    Route with two extra spans: 'handler' around the endpoint function, and
+    'validate' around FastAPI's request handling. The self time of 'validate'
+    is query/body parsing plus response model validation and encoding.
+    """
+
+    def __init__(self, path, endpoint, **kwargs):
+        if asyncio.iscoroutinefunction(endpoint):
+            endpoint = self._traced_endpoint(endpoint)
+        super().__init__(path, endpoint, **kwargs)
+
+    @staticmethod
+    def _traced_endpoint(endpoint):
+        # functools.wraps keeps the signature FastAPI reads the parameters from
+        @functools.wraps(endpoint)
+        async def traced(*args, **kwargs):
+            with span('handler'):
+                return await endpoint(*args, **kwargs)
+        return traced
+
+    def get_route_handler(self):
+        handler = super().get_route_handler()
+
+        async def traced_handler(request):
+            with span('validate'):
+                return await handler(request)
+        return traced_handler
+
+
+class MetricsMiddleware:
+    """Plain ASGI middleware: in-flight gauge and duration histogram for every API request."""
+
+    def __init__(self, app):
+        self.app = app
+        self._routes = None
+
+    def _route_for(self, scope) -> str:
+        # Every route is a fixed path; anything else shares one label so 404 scans cannot blow up cardinality
+        if self._routes is None:
+            self._routes = {route.path for route in app.routes}
+        return scope['path'] if scope['path'] in self._routes else 'other'
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            return await self.app(scope, receive, send)
+        route = self._route_for(scope)
+        token = _CURRENT_ROUTE.set(route)
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message['type'] == 'http.response.start':
+                status = message['status']
+            await send(message)
+
+        started = time.perf_counter()
+        HTTP_IN_FLIGHT.inc(route=route)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            HTTP_IN_FLIGHT.dec(route=route)
+            HTTP_REQUEST_SECONDS.observe(time.perf_counter() - started, route=route, method=scope['method'], status=status)
+            _CURRENT_ROUTE.reset(token)
 
-app = FastAPI(title="Fitgirl Scraper API", version="1.0.0")
+
+app = FastAPI(title="Fitgirl Scraper API", version="1.0.0", lifespan=lifespan,
+              default_response_class=TimedJSONResponse)
+# Must be set before the routes below are declared
+app.router.route_class = TracedRoute
+app.add_middleware(MetricsMiddleware)
+app.add_middleware(TracingMiddleware, exporter=TRACE_EXPORTER)
 
 # Enable CORS for local Flutter app
 app.add_middleware(
@@ -51,6 +201,11 @@ class SearchResponse(BaseModel):
     data: Optional[List[ArticleLink]] = None
     error: Optional[str] = None
     count: int = 0
+    # 'local' when answered from the index of already-scraped games, 'upstream' otherwise
+    source: Optional[str] = None
+    page: int = 1
+    # Last upstream results page known (None for local results)
+    total_pages: Optional[int] = None
 
 class DownloadLinksResponse(BaseModel):
     """Response for download links endpoint"""
@@ -99,6 +254,58 @@ class GameMetadataResponse(BaseModel):
     error: Optional[str] = None
 
 
+class GameMetadataBatchRequest(BaseModel):
+    """Request body for the batch metadata endpoint"""
+    page_urls: List[str]
+    force_refresh: bool = False
+    image_size: str = "medium"
+    concurrency: Optional[int] = None
+
+
+class GameMetadataBatchItem(BaseModel):
+    """Outcome for one page of a batch, in request order"""
+    url: str
+    success: bool
+    data: Optional[GameMetadata] = None
+    error: Optional[str] = None
+
+
+class GameMetadataBatchResponse(BaseModel):
+    """Response for batch game metadata endpoint"""
+    success: bool
+    data: Optional[List[GameMetadataBatchItem]] = None
+    error: Optional[str] = None
+    count: int = 0
+    failed: int = 0
+
+
+# A grid screen shows at most 50 tiles; leave some headroom
+BATCH_MAX_URLS = 100
+
+
+class ResolveFuckingFastRequest(BaseModel):
+    """Request body for the batch FuckingFast resolver: a paste URL or the part URLs themselves"""
+    paste_url: Optional[str] = None
+    urls: Optional[List[str]] = None
+
+
+# A large repack has ~100 parts; anything beyond this is not a single repack
+RESOLVE_MAX_URLS = 200
+
+
+class GameDetails(BaseModel):
+    """Game metadata together with the article's download links"""
+    metadata: GameMetadata
+    download_links: List[DownloadLink] = []
+
+
+class GameResponse(BaseModel):
+    """Response for the combined game endpoint"""
+    success: bool
+    data: Optional[GameDetails] = None
+    error: Optional[str] = None
+
+
 class HomeItem(BaseModel):
     title: str
     url: str
@@ -108,11 +315,18 @@ class HomeItem(BaseModel):
     repack_size: Optional[str] = None
 
 
+class HomeSectionStatus(BaseModel):
+    ok: bool
+    error: Optional[str] = None
+
+
 class HomeData(BaseModel):
     featured: Optional[HomeItem] = None
     latest: List[HomeItem] = []
     upcoming: List[str] = []
     popular: List[ArticleLink] = []
+    # Per-section status; a failed section comes back empty while the others are still filled
+    sections: Dict[str, HomeSectionStatus] = {}
 
 
 class HomeResponse(BaseModel):
@@ -138,6 +352,24 @@ async def root():
     }
 
 
+@app.get("/api/cache/stats")
+async def get_cache_stats():
+    """Scrape cache usage plus hit, miss and eviction counters per namespace."""
+    return cache_stats()
+
+
+@app.get("/metrics", include_in_schema=False)
+async def get_metrics():
+    """Prometheus text exposition: stage timings, cache counters, in-flight gauges, upstream statuses."""
+    return PlainTextResponse(REGISTRY.render(), media_type=METRICS_CONTENT_TYPE)
+
+
+@app.get("/api/cpu/stats")
+async def get_cpu_stats():
+    """Parse/decrypt executor mode, worker count, queue depth and wait/run times."""
+    return cpu_stats()
+
+
 @app.get("/api/popular-repacks", response_model=SearchResponse)
 async def get_popular_repacks(force_refresh: bool = False, image_size: str = "medium"):
     """
@@ -153,7 +385,7 @@ async def get_popular_repacks(force_refresh: bool = False, image_size: str = "me
         # Call the popular repacks function
         if image_size not in {"thumb", "medium", "full"}:
             raise HTTPException(status_code=400, detail="image_size must be 'thumb', 'medium', or 'full'")
-        links = fetch_popular_repacks(force_refresh=force_refresh, image_size=image_size)
+        links = await fetch_popular_repacks_async(force_refresh=force_refresh, image_size=image_size)
         
         if links is None:
             return SearchResponse(
@@ -180,27 +412,39 @@ async def get_popular_repacks(force_refresh: bool = False, image_size: str = "me
 
 
 @app.get("/api/search", response_model=SearchResponse)
-async def search(query: str):
+async def search(query: str, force_refresh: bool = False, mode: Optional[str] = None,
+                 page: int = Query(1, ge=1), limit: Optional[int] = Query(None, ge=1, le=200),
+                 all_pages: bool = False):
     """
     Search Fitgirl Repacks for games
     
     Args:
         query: Search term (e.g., "resident evil")
+        force_refresh: Bypass the search cache (and the local index)
+        mode: upstream, offline (local index only) or auto (local index, upstream
+            when it has too few matches); defaults to FITGIRL_SEARCH_MODE
+        page: Results page (upstream pages are the site's own)
+        limit: Maximum number of results returned
+        all_pages: Fetch every upstream results page concurrently and merge them
     
     Returns:
         SearchResponse with list of article links
     
     Example:
         GET /api/search?query=resident+evil
+        GET /api/search?query=resident+evil&all_pages=true
     """
     if not query or not query.strip():
         raise HTTPException(status_code=400, detail="Search query cannot be empty")
+    if mode is not None and mode not in SEARCH_MODES:
+        raise HTTPException(status_code=400, detail=f"mode must be one of {', '.join(SEARCH_MODES)}")
     
     try:
-        # Call the existing Python function (unchanged logic)
-        links = search_fitgirl(query.strip())
+        # Call the async scraper (same parsing logic as the CLI)
+        result = await search_games_async(query, mode=mode, force_refresh=force_refresh,
+                                          page=page, limit=limit, all_pages=all_pages)
         
-        if links is None:
+        if result is None:
             return SearchResponse(
                 success=False,
                 error="Failed to fetch search results. Please check your connection.",
@@ -208,12 +452,15 @@ async def search(query: str):
             )
         
         # Convert to response format
-        articles = [ArticleLink(**link) for link in links]
+        articles = [ArticleLink(**link) for link in result['links']]
         
         return SearchResponse(
             success=True,
             data=articles,
-            count=len(articles)
+            count=len(articles),
+            source=result['source'],
+            page=result['page'],
+            total_pages=result['total_pages']
         )
         
     except Exception as e:
@@ -246,8 +493,8 @@ async def get_download_links(page_url: str):
         raise HTTPException(status_code=400, detail="Invalid URL format")
     
     try:
-        # Call the existing Python function (unchanged logic)
-        links = fetch_download_links(page_url.strip())
+        # Call the async scraper (same parsing logic as the CLI)
+        links = await fetch_download_links_async(page_url.strip())
         
         if links is None:
             return DownloadLinksResponse(
@@ -296,7 +543,7 @@ async def decrypt_paste(paste_url: str):
     
     try:
         # Call the decryption function
-        urls = decrypt_privatebin_paste(paste_url.strip())
+        urls = await decrypt_privatebin_paste_async(paste_url.strip())
         
         if urls is None:
             return DecryptPasteResponse(
@@ -319,6 +566,120 @@ async def decrypt_paste(paste_url: str):
         )
 
 
+def _ndjson(event: dict) -> str:
+    return json.dumps(event, ensure_ascii=False) + "\n"
+
+
+def _sse(event: dict) -> str:
+    return f"event: {event['event']}\ndata: {json.dumps(event, ensure_ascii=False)}\n\n"
+
+
+# format query value -> (line encoder, media type)
+STREAM_FORMATS = {
+    "ndjson": (_ndjson, "application/x-ndjson"),
+    "sse": (_sse, "text/event-stream"),
+}
+
+
+def _event_stream(events, stream_format: str = "ndjson") -> StreamingResponse:
+    encode, media_type = STREAM_FORMATS[stream_format]
+
+    async def body():
+        try:
+            async for event in events:
+                with _serialize_stage():
+                    line = encode(event)
+                yield line
+        except Exception as e:
+            yield encode({"event": "error", "error": f"An unexpected error occurred: {str(e)}"})
+
+    # no-cache / no proxy buffering so each event reaches the client as soon as it is written
+    return StreamingResponse(
+        body(),
+        media_type=media_type,
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+def _check_stream_format(stream_format: str):
+    if stream_format not in STREAM_FORMATS:
+        raise HTTPException(status_code=400, detail="format must be 'ndjson' or 'sse'")
+
+
+async def _resolve_parts_events(paste_url: Optional[str], urls: List[str]):
+    # parts -> part (one per URL, completion order) -> done; "error" ends the stream early
+    started = time.perf_counter()
+    if paste_url:
+        links = await decrypt_privatebin_paste_async(paste_url)
+        if links is None:
+            yield {"event": "error", "error": "Failed to decrypt paste. The key might be invalid."}
+            return
+        urls = fuckingfast_urls_from(links)[:RESOLVE_MAX_URLS]
+
+    yield {"event": "parts", "count": len(urls), "urls": urls}
+
+    failed = 0
+    async for part in resolve_fuckingfast_links_async(urls):
+        links = [DownloadLink(**btn).model_dump() for btn in part['links'] or []]
+        failed += part['error'] is not None
+        yield {
+            "event": "part",
+            "index": part['index'],
+            "url": part['url'],
+            "success": part['error'] is None,
+            "data": links,
+            "error": part['error'],
+        }
+
+    yield {"event": "done", "count": len(urls), "failed": failed, "elapsed": round(time.perf_counter() - started, 3)}
+
+
+async def _paste_events(paste_url: str, resolve: bool):
+    # url (one per link in the paste) -> optionally parts/part -> done; "error" ends the stream early
+    started = time.perf_counter()
+    urls = await decrypt_privatebin_paste_async(paste_url)
+    if urls is None:
+        yield {"event": "error", "error": "Failed to decrypt paste. The key might be invalid."}
+        return
+
+    for index, url in enumerate(urls):
+        yield {"event": "url", "index": index, "url": url}
+
+    if resolve:
+        async for event in _resolve_parts_events(None, fuckingfast_urls_from(urls)[:RESOLVE_MAX_URLS]):
+            yield event
+    else:
+        yield {"event": "done", "count": len(urls), "failed": 0, "elapsed": round(time.perf_counter() - started, 3)}
+
+
+@app.get("/api/decrypt-paste/stream")
+async def decrypt_paste_stream(paste_url: str, resolve: bool = False, stream_format: str = Query("ndjson", alias="format")):
+    """
+    Streaming variant of /api/decrypt-paste
+    
+    Args:
+        paste_url: Full URL of the PrivateBin paste (must include #key)
+        resolve: Also resolve every FuckingFast link in the paste, streaming each part as it finishes
+        format: 'ndjson' (default) or 'sse'
+    
+    Returns:
+        One event per line (NDJSON) or per SSE message:
+        {"event": "url", "index": 0, "url": "https://..."} for each URL in the paste, then with
+        resolve=true the /api/resolve-fuckingfast events, and finally {"event": "done", ...}
+    
+    Example:
+        GET /api/decrypt-paste/stream?paste_url=https://paste.fitgirl-repacks.site/?...%23key&resolve=true
+    """
+    if not paste_url or not paste_url.strip():
+        raise HTTPException(status_code=400, detail="Paste URL cannot be empty")
+    
+    if '#' not in paste_url:
+        raise HTTPException(status_code=400, detail="Paste URL must contain encryption key (#key)")
+    
+    _check_stream_format(stream_format)
+    return _event_stream(_paste_events(paste_url.strip(), resolve), stream_format)
+
+
 @app.get("/api/extract-fuckingfast", response_model=FuckingFastButtonsResponse)
 async def extract_fuckingfast_buttons(fuckingfast_url: str):
     """
@@ -341,7 +702,7 @@ async def extract_fuckingfast_buttons(fuckingfast_url: str):
     
     try:
         # Call the extraction function
-        buttons = fetch_fuckingfast_page(fuckingfast_url.strip(), save_html=False)
+        buttons = await fetch_fuckingfast_page_async(fuckingfast_url.strip())
         
         if buttons is None:
             return FuckingFastButtonsResponse(
@@ -366,6 +727,71 @@ async def extract_fuckingfast_buttons(fuckingfast_url: str):
             count=0
         )
 
+@app.post("/api/resolve-fuckingfast")
+async def resolve_fuckingfast(request: ResolveFuckingFastRequest):
+    """
+    Resolve every FuckingFast part of a repack concurrently, streaming each result as it finishes
+    
+    Args:
+        paste_url: Paste URL (with #key) whose FuckingFast links should be resolved, or
+        urls: FuckingFast part URLs to resolve directly
+    
+    Returns:
+        Newline-delimited JSON (application/x-ndjson), one event per line:
+        {"event": "parts", "count": N, "urls": [...]}
+        {"event": "part", "index": i, "url": "...", "success": true, "data": [{"text", "url"}], "error": null}
+        {"event": "done", "count": N, "failed": 0, "elapsed": 1.23}
+        {"event": "error", "error": "..."} if the paste cannot be decrypted
+    
+    Example:
+        POST /api/resolve-fuckingfast
+        {"paste_url": "https://paste.fitgirl-repacks.site/?...#key"}
+    """
+    if bool(request.paste_url) == bool(request.urls):
+        raise HTTPException(status_code=400, detail="Provide either paste_url or urls")
+    
+    if request.paste_url and '#' not in request.paste_url:
+        raise HTTPException(status_code=400, detail="Paste URL must contain encryption key (#key)")
+    
+    urls = [url.strip() for url in request.urls or []]
+    if any('fuckingfast' not in url.lower() for url in urls):
+        raise HTTPException(status_code=400, detail="Invalid FuckingFast URL")
+    
+    if len(urls) > RESOLVE_MAX_URLS:
+        raise HTTPException(status_code=400, detail=f"At most {RESOLVE_MAX_URLS} URLs per request")
+    
+    return _event_stream(_resolve_parts_events(request.paste_url and request.paste_url.strip(), urls))
+
+
+@app.get("/api/extract-fuckingfast/stream")
+async def extract_fuckingfast_stream(fuckingfast_url: List[str] = Query(...), stream_format: str = Query("ndjson", alias="format")):
+    """
+    Streaming variant of /api/extract-fuckingfast for one or many part URLs
+    
+    Args:
+        fuckingfast_url: FuckingFast URL; repeat the parameter for several parts
+        format: 'ndjson' (default) or 'sse'
+    
+    Returns:
+        The /api/resolve-fuckingfast events (parts, part per URL as it finishes, done)
+    
+    Example:
+        GET /api/extract-fuckingfast/stream?fuckingfast_url=https://fuckingfast.co/a&fuckingfast_url=https://fuckingfast.co/b
+    """
+    urls = [url.strip() for url in fuckingfast_url if url and url.strip()]
+    if not urls:
+        raise HTTPException(status_code=400, detail="FuckingFast URL cannot be empty")
+    
+    if any('fuckingfast' not in url.lower() for url in urls):
+        raise HTTPException(status_code=400, detail="Invalid FuckingFast URL")
+    
+    if len(urls) > RESOLVE_MAX_URLS:
+        raise HTTPException(status_code=400, detail=f"At most {RESOLVE_MAX_URLS} URLs per request")
+    
+    _check_stream_format(stream_format)
+    return _event_stream(_resolve_parts_events(None, urls), stream_format)
+
+
 @app.get("/api/game-metadata", response_model=GameMetadataResponse)
 async def get_game_metadata(page_url: str, force_refresh: bool = False, image_size: str = "medium"):
     """
@@ -399,7 +825,7 @@ async def get_game_metadata(page_url: str, force_refresh: bool = False, image_si
         # Call the metadata extraction function
         if image_size not in {"thumb", "medium", "full"}:
             raise HTTPException(status_code=400, detail="image_size must be 'thumb', 'medium', or 'full'")
-        metadata = fetch_game_metadata(page_url.strip(), force_refresh=force_refresh, image_size=image_size)
+        metadata = await fetch_game_metadata_async(page_url.strip(), force_refresh=force_refresh, image_size=image_size)
         
         if metadata is None:
             return GameMetadataResponse(
@@ -422,13 +848,129 @@ async def get_game_metadata(page_url: str, force_refresh: bool = False, image_si
     )
 
 
+@app.post("/api/game-metadata/batch", response_model=GameMetadataBatchResponse)
+async def get_game_metadata_batch(request: GameMetadataBatchRequest):
+    """
+    Fetch metadata for a whole grid of games in one round trip
+    
+    Args:
+        page_urls: Game page URLs (up to 100)
+        concurrency: Optional lower limit on parallel scrapes for this request
+    
+    Returns:
+        GameMetadataBatchResponse with one item per URL, in request order.
+        Pages that fail carry their own error; the rest still succeed.
+    
+    Example:
+        POST /api/game-metadata/batch
+        {"page_urls": ["https://fitgirl-repacks.site/forza-horizon-5/", ...]}
+    """
+    if not request.page_urls:
+        raise HTTPException(status_code=400, detail="page_urls cannot be empty")
+    
+    if len(request.page_urls) > BATCH_MAX_URLS:
+        raise HTTPException(status_code=400, detail=f"At most {BATCH_MAX_URLS} page URLs per batch")
+    
+    if request.image_size not in {"thumb", "medium", "full"}:
+        raise HTTPException(status_code=400, detail="image_size must be 'thumb', 'medium', or 'full'")
+    
+    try:
+        page_urls = [url.strip() for url in request.page_urls]
+        # Invalid URLs get an error item instead of failing the batch
+        valid_urls = list(dict.fromkeys(url for url in page_urls if url.startswith("http")))
+        concurrency = min(request.concurrency, BATCH_CONCURRENCY) if request.concurrency else None
+        fetched = await fetch_game_metadata_batch_async(
+            valid_urls,
+            force_refresh=request.force_refresh,
+            image_size=request.image_size,
+            concurrency=concurrency,
+        )
+        by_url = {item['url']: item for item in fetched}
+        
+        items = []
+        for url in page_urls:
+            result = by_url.get(url)
+            if result is None:
+                items.append(GameMetadataBatchItem(url=url, success=False, error="Invalid URL format"))
+            elif result['error']:
+                items.append(GameMetadataBatchItem(url=url, success=False, error=result['error']))
+            else:
+                items.append(GameMetadataBatchItem(url=url, success=True, data=GameMetadata(**result['metadata'])))
+        
+        return GameMetadataBatchResponse(
+            success=True,
+            data=items,
+            count=len(items),
+            failed=sum(1 for item in items if not item.success)
+        )
+        
+    except Exception as e:
+        return GameMetadataBatchResponse(
+            success=False,
+            error=f"An unexpected error occurred: {str(e)}",
+            count=0
+        )
+
+
+@app.get("/api/game", response_model=GameResponse)
+async def get_game(page_url: str, force_refresh: bool = False, image_size: str = "medium"):
+    """
+    Fetch game metadata and download links from one article page in a single round trip
+    
+    Args:
+        page_url: Full URL of the game page
+    
+    Returns:
+        GameResponse with the same metadata as /api/game-metadata plus the
+        links /api/download-links would return
+    
+    Example:
+        GET /api/game?page_url=https://fitgirl-repacks.site/forza-horizon-5/
+    """
+    if not page_url or not page_url.strip():
+        raise HTTPException(status_code=400, detail="Page URL cannot be empty")
+    
+    if not page_url.startswith("http"):
+        raise HTTPException(status_code=400, detail="Invalid URL format")
+    
+    if image_size not in {"thumb", "medium", "full"}:
+        raise HTTPException(status_code=400, detail="image_size must be 'thumb', 'medium', or 'full'")
+    
+    try:
+        game = await fetch_game_async(page_url.strip(), force_refresh=force_refresh, image_size=image_size)
+        
+        if game is None:
+            return GameResponse(
+                success=False,
+                error="Failed to fetch game page. Please check the URL."
+            )
+        
+        return GameResponse(
+            success=True,
+            data=GameDetails(
+                metadata=GameMetadata(**game['metadata']),
+                download_links=[DownloadLink(**link) for link in game['download_links']],
+            )
+        )
+        
+    except Exception as e:
+        return GameResponse(
+            success=False,
+            error=f"An unexpected error occurred: {str(e)}"
+        )
+
+
+# Upper bound for max_items on the home routes; the homepage widget has far fewer slides
+HOME_MAX_ITEMS = 50
+
+
 @app.get("/api/home", response_model=HomeResponse)
-async def get_home(max_items: int = 12, force_refresh: bool = False, image_size: str = "medium"):
+async def get_home(max_items: int = Query(12, ge=1, le=HOME_MAX_ITEMS), force_refresh: bool = False, image_size: str = "medium"):
     """Aggregate homepage data: featured, latest, upcoming, popular."""
     try:
         if image_size not in {"thumb", "medium", "full"}:
             raise HTTPException(status_code=400, detail="image_size must be 'thumb', 'medium', or 'full'")
-        payload = fetch_home(max_items=max_items, force_refresh=force_refresh, image_size=image_size)
+        payload = await fetch_home_async(max_items=max_items, force_refresh=force_refresh, image_size=image_size)
         if not payload:
             return HomeResponse(success=False, error="Failed to fetch homepage data")
 
@@ -442,6 +984,7 @@ async def get_home(max_items: int = 12, force_refresh: bool = False, image_size:
                 latest=latest,
                 upcoming=payload.get('upcoming', []) or [],
                 popular=popular,
+                sections=payload.get('sections', {}),
             )
         )
     except Exception as e:
@@ -449,12 +992,12 @@ async def get_home(max_items: int = 12, force_refresh: bool = False, image_size:
 
 
 @app.get("/api/home-latest", response_model=HomeListResponse)
-async def get_home_latest(max_items: int = 12, force_refresh: bool = False, image_size: str = "medium"):
+async def get_home_latest(max_items: int = Query(12, ge=1, le=HOME_MAX_ITEMS), force_refresh: bool = False, image_size: str = "medium"):
     """Return the latest repacks list from the homepage widget."""
     try:
         if image_size not in {"thumb", "medium", "full"}:
             raise HTTPException(status_code=400, detail="image_size must be 'thumb', 'medium', or 'full'")
-        latest = fetch_home_latest(max_items=max_items, force_refresh=force_refresh, image_size=image_size)
+        latest = await fetch_home_latest_async(max_items=max_items, force_refresh=force_refresh, image_size=image_size)
         if latest is None:
             return HomeListResponse(success=False, error="Failed to fetch latest repacks", count=0)
         items = [HomeItem(**item) for item in latest]
@@ -467,7 +1010,7 @@ async def get_home_latest(max_items: int = 12, force_refresh: bool = False, imag
 async def get_upcoming():
     """Return the upcoming repacks list from the homepage."""
     try:
-        upcoming = fetch_upcoming_list()
+        upcoming = await fetch_upcoming_list_async()
         if upcoming is None:
             return HomeListResponse(success=False, error="Failed to fetch upcoming repacks", count=0)
         # Reuse HomeItem schema minimally with title only
@@ -477,15 +1020,28 @@ async def get_upcoming():
         return HomeListResponse(success=False, error=f"An unexpected error occurred: {str(e)}", count=0)
 
 
+# Number of uvicorn worker processes; above 1 they share one SQLite cache file
+API_WORKERS = int(os.environ.get("FITGIRL_WORKERS", "1"))
+SHARED_CACHE_DEFAULT_PATH = "scrape_cache.sqlite3"
+
+
 if __name__ == "__main__":
     print("🚀 Starting Fitgirl Scraper API...")
     print("📍 Server running at: http://127.0.0.1:8000")
     print("📚 API documentation: http://127.0.0.1:8000/docs")
+
+    if API_WORKERS > 1:
+        # Workers import this module afresh and read the cache settings from the environment
+        os.environ.setdefault("FITGIRL_CACHE_DB", SHARED_CACHE_DEFAULT_PATH)
+        os.environ["FITGIRL_CACHE_SHARED"] = "1"
+        print(f"👥 {API_WORKERS} workers sharing cache {os.environ['FITGIRL_CACHE_DB']}")
     print("\nPress CTRL+C to stop the server\n")
-    
+
     uvicorn.run(
-        app,
+        # Multiple workers need an import string so each process can load the app itself
+        "backend_api:app" if API_WORKERS > 1 else app,
         host="127.0.0.1",
         port=8000,
+        workers=API_WORKERS,
         log_level="info"
     )
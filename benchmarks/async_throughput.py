@@ -0,0 +1,170 @@
+"""
+Concurrent throughput benchmark: blocking fetchers vs the async fetch layer.
+
+Spins up a local mock upstream that answers every request after a fixed delay,
+then fires N concurrent "route" calls at it on a single event loop:
+
+  before: an ``async def`` route calling the blocking ``fetch_game_metadata``
+  after:  an ``async def`` route awaiting ``fetch_game_metadata_async``
+
+Usage:
+    python benchmarks/async_throughput.py --requests 200 --delay 0.1
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import fetch_fitgirl  # noqa: E402
+
+GAME_PAGE = """<!DOCTYPE html>
+<html><head>
+<script type="application/ld+json" class="yoast-schema-graph">
+{"@graph": [{"@type": "WebPage", "name": "Mock Game - v1.0", "thumbnailUrl": "https://img.example/mock-768x432.jpg",
+"datePublished": "2024-01-01T00:00:00+00:00", "dateModified": "2024-01-02T00:00:00+00:00"}]}
+</script>
+</head><body><article><div class="entry-content">
+<p>Genres/Tags: Action<br>Companies: <strong>Mock Studio</strong><br>Languages: <strong>ENG/MULTI</strong><br>
+Original Size: <strong>40 GB</strong><br>Repack Size: <strong>from 20 GB [Selective Download]</strong></p>
+<h3>Repack Features</h3>
+<ul><li>Based on the Steam release</li><li>100% Lossless &amp; MD5 Perfect</li><li>Significantly smaller archive size</li></ul>
+</div></article></body></html>
+"""
+
+
+class MockUpstream:
+    """Minimal keep-alive HTTP/1.1 server on its own loop thread; every response waits ``delay`` seconds."""
+
+    def __init__(self, delay: float):
+        self.delay = delay
+        self.port = None
+        self._ready = threading.Event()
+        self._loop = None
+        self._server = None
+        self._handlers = set()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self._thread.start()
+        self._ready.wait()
+        return f"http://127.0.0.1:{self.port}"
+
+    def stop(self):
+        asyncio.run_coroutine_threadsafe(self._shutdown(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+
+    async def _shutdown(self):
+        # Keep-alive handlers would otherwise sit in readuntil() until the loop is torn down under them
+        self._server.close()
+        for task in list(self._handlers):
+            task.cancel()
+        await asyncio.gather(*self._handlers, return_exceptions=True)
+        await self._server.wait_closed()
+
+    def _run(self):
+        self._loop = asyncio.new_event_loop()
+        self._server = self._loop.run_until_complete(
+            asyncio.start_server(self._handle, "127.0.0.1", 0, backlog=2048)
+        )
+        self.port = self._server.sockets[0].getsockname()[1]
+        self._ready.set()
+        try:
+            self._loop.run_forever()
+        finally:
+            self._loop.close()
+
+    async def _handle(self, reader, writer):
+        task = asyncio.current_task()
+        self._handlers.add(task)
+        body = GAME_PAGE.encode("utf-8")
+        try:
+            while True:
+                head = await reader.readuntil(b"\r\n\r\n")
+                if not head:
+                    break
+                await asyncio.sleep(self.delay)
+                writer.write(
+                    b"HTTP/1.1 200 OK\r\nContent-Type: text/html; charset=utf-8\r\n"
+                    + f"Content-Length: {len(body)}\r\n\r\n".encode("ascii")
+                    + body
+                )
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        except asyncio.CancelledError:
+            # Cancelled by _shutdown(); asyncio's stream callback reports a cancelled handler as an error
+            pass
+        finally:
+            writer.close()
+            self._handlers.discard(task)
+
+
+async def _run_concurrent(route, base_url: str, count: int):
+    latencies = []
+    started = time.perf_counter()
+
+    async def one(idx):
+        # Latency is measured from the moment the whole batch arrives, as a client would see it
+        result = await route(f"{base_url}/game-{idx}/")
+        latencies.append(time.perf_counter() - started)
+        return result is not None
+
+    results = await asyncio.gather(*(one(i) for i in range(count)))
+    elapsed = time.perf_counter() - started
+    return {
+        "ok": sum(results),
+        "elapsed": elapsed,
+        "rps": count / elapsed,
+        "p50": statistics.median(latencies),
+        "p95": statistics.quantiles(latencies, n=20)[-1] if len(latencies) > 1 else latencies[0],
+    }
+
+
+async def blocking_route(page_url):
+    # Pre-async behaviour: a coroutine route calling the requests-based fetcher directly
+    return fetch_fitgirl.fetch_game_metadata(page_url, force_refresh=True)
+
+
+async def async_route(page_url):
+    return await fetch_fitgirl.fetch_game_metadata_async(page_url, force_refresh=True)
+
+
+async def _bench(base_url: str, count: int):
+    report = {}
+    for label, route in (("before (blocking)", blocking_route), ("after (async)", async_route)):
+        report[label] = await _run_concurrent(route, base_url, count)
+    await fetch_fitgirl.close_async_client()
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200, help="concurrent route calls per run")
+    parser.add_argument("--delay", type=float, default=0.1, help="mock upstream latency in seconds")
+    args = parser.parse_args()
+
+    upstream = MockUpstream(args.delay)
+    base_url = upstream.start()
+    try:
+        report = asyncio.run(_bench(base_url, args.requests))
+    finally:
+        upstream.stop()
+
+    print(f"{args.requests} concurrent requests, upstream latency {args.delay * 1000:.0f} ms\n")
+    print(f"{'mode':<20}{'ok':>6}{'wall (s)':>10}{'req/s':>10}{'p50 (ms)':>10}{'p95 (ms)':>10}")
+    for label, row in report.items():
+        print(
+            f"{label:<20}{row['ok']:>6}{row['elapsed']:>10.2f}{row['rps']:>10.1f}"
+            f"{row['p50'] * 1000:>10.0f}{row['p95'] * 1000:>10.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+CPU executor benchmark: thread pool vs process pool for parse and decrypt work.
+
+Submits N concurrent CPU-bound tasks through the same path the async fetchers
+use (fetch_fitgirl._run_cpu), with the fixture pages as input:
+
+  article  - _parse_article over benchmarks/fixtures/article.html
+  paste    - _decrypt_paste_data with a cold key cache over benchmarks/fixtures/paste.json (PBKDF2 + AES-GCM + inflate)
+
+Thread mode is bound by the GIL, so throughput stays near one core; process
+mode should scale with the worker count.
+
+Usage:
+    python benchmarks/cpu_pool_bench.py --tasks 64 --workers 4
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import sys
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+FIXTURES_DIR = os.path.join(BENCH_DIR, "fixtures")
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+sys.path.insert(0, FIXTURES_DIR)
+
+import fetch_fitgirl  # noqa: E402
+from cpu_pool import CpuExecutor  # noqa: E402
+from generate import PASTE_KEY  # noqa: E402
+
+
+def _silence_worker():
+    # The parsers print progress; keep worker processes as quiet as the redirected parent
+    sys.stdout = open(os.devnull, "w")
+
+
+def _decrypt_cold(data, key):
+    # Every task pays the full PBKDF2 cost, as a never-seen paste would
+    fetch_fitgirl._derive_paste_key.cache_clear()
+    return fetch_fitgirl._decrypt_paste_data(data, key)
+
+
+def _workloads():
+    with open(os.path.join(FIXTURES_DIR, "article.html"), encoding="utf-8") as f:
+        article = f.read()
+    with open(os.path.join(FIXTURES_DIR, "paste.json"), encoding="utf-8") as f:
+        paste = json.load(f)
+    return {
+        "article": (fetch_fitgirl._parse_article, (article, "https://fitgirl-repacks.site/bench/")),
+        "paste": (_decrypt_cold, (paste, PASTE_KEY)),
+    }
+
+
+async def _run(executor, func, args, tasks):
+    started = time.perf_counter()
+    await asyncio.gather(*(executor.run(func, *args) for _ in range(tasks)))
+    return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tasks", type=int, default=48, help="concurrent tasks per workload")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="pool size for both modes")
+    args = parser.parse_args()
+
+    print(f"{args.tasks} concurrent tasks, {args.workers} workers\n")
+    print(f"{'workload':<10}{'mode':<9}{'warm-up (s)':>12}{'wall (s)':>10}{'tasks/s':>10}{'avg wait (ms)':>15}{'avg run (ms)':>14}")
+    for name, (func, func_args) in _workloads().items():
+        for mode in ("thread", "process"):
+            executor = CpuExecutor(mode, args.workers, warm_modules=("fetch_fitgirl",), initializer=_silence_worker)
+            with contextlib.redirect_stdout(io.StringIO()):
+                warm = executor.start()
+                elapsed = asyncio.run(_run(executor, func, func_args, args.tasks))
+            executor.shutdown()
+            stats = executor.stats()
+            print(
+                f"{name:<10}{mode:<9}{warm:>12.2f}{elapsed:>10.2f}{args.tasks / elapsed:>10.1f}"
+                f"{stats['avg_queue_wait_ms']:>15.1f}{stats['avg_run_ms']:>14.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
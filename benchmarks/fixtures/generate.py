@@ -0,0 +1,271 @@
+"""
+Regenerate the offline fixture pages used by the benchmarks.
+
+The pages are synthetic, not recordings of the live sites. They reproduce only
+the elements and attributes the scrapers select (WordPress theme, Jetpack/WPLP
+widgets, FuckingFast download page), padded with head/sidebar/footer filler to
+give the parsers a realistic amount of markup to skip. Anything else the real
+pages contain, and any drift in their markup, is not covered, so benchmark
+numbers are indicative and a passing run does not prove the selectors still
+match the live sites. paste.json has the shape of a PrivateBin v2 API
+response with made-up content, encrypted here with a fixed key so the
+decrypt path can run end to end; PASTE_URL carries that key.
+Output is deterministic, so re-running only changes the files when this script
+changes.
+
+Usage:
+    python benchmarks/fixtures/generate.py
+"""
+
+import base64
+import json
+import os
+import random
+import zlib
+
+import base58
+from Crypto.Cipher import AES
+from Crypto.Hash import SHA256
+from Crypto.Protocol.KDF import PBKDF2
+
+FIXTURES_DIR = os.path.dirname(os.path.abspath(__file__))
+SITE = "https://fitgirl-repacks.site"
+IMG = "https://i0.wp.com/riotpixels.net/data"
+
+PASTE_ID = "5d2f9e1c0b7a4e36"
+PASTE_KEY = base58.b58encode(random.Random("paste-key").randbytes(32)).decode("ascii")
+PASTE_URL = f"https://paste.fitgirl-repacks.site/?{PASTE_ID}#{PASTE_KEY}"
+PASTE_ITERATIONS = 100000  # PrivateBin's default
+
+WORDS = (
+    "shadow legacy chronicles iron frontier remastered definitive tactics kingdom "
+    "station protocol horizon crimson echoes forgotten empire stellar outpost ember "
+    "rogue citadel harbor vanguard tides hollow summit paradox nomad signal"
+).split()
+FEATURES = [
+    "Based on Steam release (v{v} - Build {b}) + {n} DLCs",
+    "100% Lossless & MD5 Perfect: all files are identical to originals after installation",
+    "NOTHING ripped, NOTHING re-encoded",
+    "Selective Download feature: you may skip downloading and installing of bonus content",
+    "Significantly smaller archive size (compressed from {o} to {r} GB)",
+    "Installation takes 15-40 minutes (depending on your system)",
+    "After-install integrity check so you could make sure that everything installed properly",
+    "HDD space after installation: {o} GB",
+    "Language can be changed in game settings",
+    "At least 2 GB of free RAM (inc. virtual) required for installing this repack",
+]
+
+
+def _title(rng, words=3):
+    return " ".join(w.capitalize() for w in rng.sample(WORDS, words))
+
+
+def _slug(title):
+    return title.lower().replace(" ", "-").replace(":", "")
+
+
+def _head(rng, title):
+    # Theme/plugin boilerplate: stylesheets, preloads, inline config and trackers
+    parts = [f"<meta charset=\"UTF-8\"><title>{title} &#8211; FitGirl Repacks</title>"]
+    for i in range(24):
+        parts.append(f'<link rel="stylesheet" id="plugin-{i}-css" href="{SITE}/wp-content/plugins/p{i}/style.css?ver=6.{i}" media="all">')
+    for i in range(12):
+        parts.append(f'<meta property="og:extra{i}" content="{_title(rng, 4)}">')
+    css = " ".join(f".c{i}{{margin:{i}px;padding:{i % 7}px;color:#{i * 4099 % 0xffffff:06x}}}" for i in range(600))
+    parts.append(f"<style id=\"theme-inline-css\">{css}</style>")
+    for i in range(10):
+        parts.append(f'<script src="{SITE}/wp-includes/js/s{i}.min.js?ver=3.{i}"></script>')
+    blob = json.dumps({"ajaxurl": f"{SITE}/wp-admin/admin-ajax.php", "i18n": {f"k{i}": _title(rng, 5) for i in range(80)}})
+    parts.append(f"<script>var themeConfig = {blob};</script>")
+    return "\n".join(parts)
+
+
+def _nav(rng):
+    items = "".join(f'<li class="menu-item menu-item-{i}"><a href="{SITE}/category/{_slug(_title(rng, 2))}/">{_title(rng, 2)}</a></li>' for i in range(30))
+    return f'<header id="masthead" class="site-header"><nav class="main-navigation"><ul class="menu">{items}</ul></nav></header>'
+
+
+def _paragraphs(rng, count):
+    return "".join(
+        "<p>" + " ".join(rng.choice(WORDS) for _ in range(rng.randint(40, 90))).capitalize() + ".</p>"
+        for _ in range(count)
+    )
+
+
+def _repack_post(rng, title, full=True):
+    slug = _slug(title)
+    version = f"v{rng.randint(1, 9)}.{rng.randint(0, 20)}.{rng.randint(0, 99)}"
+    original, repack = rng.randint(20, 120), rng.randint(8, 60)
+    features = "".join(
+        f"<li>{f.format(v=version, b=rng.randint(10000, 99999), n=rng.randint(1, 30), o=original, r=repack)}</li>"
+        for f in FEATURES
+    )
+    mirrors = "".join(
+        f'<li><a href="https://{host}/{slug}-{i}" target="_blank" rel="noopener">{host.split(".")[0].capitalize()}</a></li>'
+        for i, host in enumerate(["1337x.to", "rutor.info", "tapochek.net", "multiupload.example", "filecrypt.cc"])
+    )
+    paste = f'<li><a href="https://paste.fitgirl-repacks.site/?{slug[:12]}#B{slug[:20]}">Filehoster: FuckingFast</a></li>'
+    body = (
+        f'<h3>#{rng.randint(3000, 4000)} {title} &#8211; {version} + {rng.randint(1, 30)} DLCs</h3>'
+        f'<p><a href="{IMG}/covers/{slug}.jpg"><img class="alignleft" src="{IMG}/covers/{slug}-240x360.jpg" width="150"></a>'
+        f'Genres/Tags: Action, RPG, 3D<br>Companies: <strong>{_title(rng, 2)} Studios</strong><br>'
+        f'Languages: <strong>ENG/MULTI{rng.randint(5, 14)}</strong><br>Original Size: <strong>{original} GB</strong><br>'
+        f'Repack Size: <strong>from {repack} GB [Selective Download]</strong></p>'
+        f"<h3>Download Mirrors (Direct Links)</h3><ul>{paste}{mirrors}</ul>"
+    )
+    if full:
+        body += (
+            "<h3>Screenshots (Click to enlarge)</h3>"
+            + "".join(f'<a href="{IMG}/shots/{slug}-{i}.jpg"><img src="{IMG}/shots/{slug}-{i}-150x150.jpg"></a>' for i in range(8))
+            + f"<h3>Repack Features</h3><ul>{features}</ul>"
+            + "<h3>Game Description</h3>" + _paragraphs(rng, 4)
+        )
+    return (
+        f'<article id="post-{rng.randint(10000, 99999)}" class="post type-post status-publish format-standard hentry category-lossless-repack">'
+        f'<header class="entry-header"><h1 class="entry-title"><a href="{SITE}/{slug}/" rel="bookmark">{title}, {version} + {rng.randint(1, 30)} DLCs</a></h1>'
+        f'<div class="entry-meta"><span class="entry-date"><time datetime="2025-0{rng.randint(1, 9)}-1{rng.randint(0, 9)}">date</time></span></div></header>'
+        f'<div class="entry-content">{body}</div>'
+        f'<footer class="entry-meta"><span class="cat-links">Lossless Repack</span></footer></article>'
+    )
+
+
+def _upcoming_post(rng):
+    lines = "".join(f'<span style="color: #339966;">⇢ {_title(rng, 3)}</span><br>' for _ in range(14))
+    return (
+        '<article id="post-1" class="post type-post sticky"><header class="entry-header">'
+        f'<h1 class="entry-title"><a href="{SITE}/upcoming-repacks-11/">Upcoming Repacks</a></h1></header>'
+        f'<div class="entry-content"><p>{lines}</p></div></article>'
+    )
+
+
+def _popular_widget(rng, count=50):
+    cells = []
+    for _ in range(count):
+        title = _title(rng, 3)
+        slug = _slug(title)
+        cells.append(
+            f'<div class="widget-grid-view-image"><a href="{SITE}/{slug}/" title="{title}" class="bump-view" data-bump-view="tp">'
+            f'<img loading="lazy" width="200" height="200" src="{IMG}/covers/{slug}-768x432.jpg?resize=200%2C200&amp;ssl=1" alt="{title}"></a></div>'
+        )
+    return f'<div class="widget_text widget jetpack_top_posts_widget"><h2 class="widget-title">Top 50 Repacks</h2><div class="widgets-grid-layout no-grav">{"".join(cells)}</div></div>'
+
+
+def _latest_widget(rng, count=24):
+    slides = []
+    for _ in range(count):
+        title = _title(rng, 3)
+        slug = _slug(title)
+        slides.append(
+            f'<div class="swiper-slide"><div class="insideframe"><a class="thumbnail" href="{SITE}/{slug}/">'
+            f'<img src="{IMG}/covers/{slug}-768x432.jpg?w=300" alt="{title} – v1.{rng.randint(0, 40)}"></a></div></div>'
+        )
+    return f'<div id="wplp_widget_13066" class="wplp_outside"><div class="wplp_listposts swiper-wrapper">{"".join(slides)}</div></div>'
+
+
+def _sidebar(rng, with_popular=True):
+    archives = "".join(f'<li><a href="{SITE}/20{y}/{m:02d}/">Month {m} 20{y}</a></li>' for y in range(16, 26) for m in range(1, 13))
+    sidebar = f'<aside id="secondary" class="widget-area">{_latest_widget(rng)}'
+    if with_popular:
+        sidebar += _popular_widget(rng)
+    return sidebar + f'<div class="widget widget_archive"><ul>{archives}</ul></div></aside>'
+
+
+def _page(rng, title, main, sidebar=True, with_popular=True):
+    footer = "".join(f'<script>/* tracker {i} */ window.__t{i} = {json.dumps(_title(rng, 6))};</script>' for i in range(20))
+    return (
+        f"<!DOCTYPE html>\n<html lang=\"en-US\"><head>{_head(rng, title)}</head><body class=\"home blog\">"
+        f'<div id="page" class="hfeed site">{_nav(rng)}<div id="main" class="site-main"><div id="primary" class="content-area">'
+        f'<div id="content" class="site-content" role="main">{main}</div></div>'
+        f"{_sidebar(rng, with_popular) if sidebar else ''}</div>"
+        f'<footer id="colophon" class="site-footer">{_paragraphs(rng, 2)}</footer></div>{footer}</body></html>'
+    )
+
+
+def homepage(rng):
+    posts = _upcoming_post(rng) + "".join(_repack_post(rng, _title(rng)) for _ in range(10))
+    return _page(rng, "FitGirl Repacks", posts)
+
+
+def search(rng):
+    posts = "".join(_repack_post(rng, _title(rng), full=False) for _ in range(10))
+    return _page(rng, "Search results", posts)
+
+
+def article(rng):
+    title = _title(rng)
+    graph = {"@context": "https://schema.org", "@graph": [
+        {"@type": "WebPage", "name": f"{title} - v1.4.2 + 12 DLCs", "thumbnailUrl": f"{IMG}/covers/{_slug(title)}-768x432.jpg",
+         "datePublished": "2025-03-01T10:00:00+00:00", "dateModified": "2025-03-04T12:30:00+00:00"},
+        {"@type": "BreadcrumbList", "itemListElement": [{"@type": "ListItem", "position": i, "name": _title(rng, 2)} for i in range(1, 4)]},
+    ]}
+    page = _page(rng, title, _repack_post(rng, title))
+    schema = f'<script type="application/ld+json" class="yoast-schema-graph">{json.dumps(graph)}</script>'
+    return page.replace("</head>", schema + "</head>", 1)
+
+
+def popular(rng):
+    return _page(rng, "Popular Repacks", '<article class="page"><h1 class="entry-title">Popular Repacks</h1></article>')
+
+
+def fuckingfast(rng):
+    links = "".join(f'<a href="https://fuckingfast.co/help/{i}" class="nav-link">Help {i}</a>' for i in range(15))
+    token = "".join(rng.choice("abcdefghijklmnopqrstuvwxyz0123456789") for _ in range(64))
+    styles = " ".join(f".x{i}{{width:{i}%}}" for i in range(300))
+    return (
+        f"<!DOCTYPE html><html><head><title>{_title(rng)}.part01.rar - FuckingFast</title><style>{styles}</style>"
+        '<script src="https://fuckingfast.co/static/app.js"></script></head><body>'
+        f'<nav>{links}</nav><main><h1>{_title(rng)}.part01.rar</h1><p>Size: 500 MB</p>'
+        '<button class="link-button" onclick="download()">DOWNLOAD</button></main>'
+        f'<script>function download() {{ window.open("https://fuckingfast.co/dl/{token}"); }}</script>'
+        f"<footer>{_paragraphs(rng, 1)}</footer></body></html>"
+    )
+
+
+def paste(rng):
+    # Encrypt the way PrivateBin's JS client does: PBKDF2-SHA256 key, AES-256-GCM,
+    # raw deflate, and the base64 spec JSON as authenticated data
+    # The decrypted JSON escapes newlines, so the URL regex relies on the spaces between links
+    links = " \n".join(
+        f"https://fuckingfast.co/{rng.randbytes(6).hex()}#{_slug(_title(rng))}.part{i:02d}.rar" for i in range(1, 41)
+    )
+    plaintext = json.dumps({"paste": links}).encode("utf-8")
+    iv, salt = rng.randbytes(16), rng.randbytes(8)
+    spec = [base64.b64encode(iv).decode(), base64.b64encode(salt).decode(), PASTE_ITERATIONS, 256, 128, "aes", "gcm", "zlib"]
+    adata = [spec, "plaintext", 0, 0]
+
+    key = PBKDF2(base58.b58decode(PASTE_KEY), salt, dkLen=32, count=PASTE_ITERATIONS, hmac_hash_module=SHA256)
+    compressor = zlib.compressobj(9, zlib.DEFLATED, -zlib.MAX_WBITS)
+    cipher = AES.new(key, AES.MODE_GCM, nonce=iv)
+    cipher.update(json.dumps(adata, separators=(",", ":")).encode("utf-8"))
+    ciphertext, tag = cipher.encrypt_and_digest(compressor.compress(plaintext) + compressor.flush())
+    return json.dumps({
+        "status": 0,
+        "id": PASTE_ID,
+        "url": f"/?{PASTE_ID}",
+        "adata": adata,
+        "ct": base64.b64encode(ciphertext + tag).decode(),
+        "meta": {"created": 1735689600},
+        "v": 2,
+    }, indent=2)
+
+
+PAGES = {
+    "homepage.html": homepage,
+    "search.html": search,
+    "article.html": article,
+    "popular.html": popular,
+    "fuckingfast.html": fuckingfast,
+    "paste.json": paste,
+}
+
+
+def main():
+    for name, build in PAGES.items():
+        html = build(random.Random(name))
+        with open(os.path.join(FIXTURES_DIR, name), "w", encoding="utf-8") as f:
+            f.write(html)
+        print(f"✓ {name} ({len(html) / 1024:.0f} KB)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Parse micro-benchmark: full BeautifulSoup vs SoupStrainer vs plain lxml.
+
+Runs every page parser over the saved fixture pages in benchmarks/fixtures with
+each parser strategy it supports, checks the results match the full-tree
+parse, and reports median parse time and peak memory per page. Peak memory comes
+from tracemalloc, which sees Python allocations only: the lxml tree itself
+lives in libxml2 memory, so the lxml column shows what the extraction keeps
+alive on the Python side.
+
+Usage:
+    python benchmarks/parse_bench.py --runs 50
+    python benchmarks/parse_bench.py --page popular --page fuckingfast
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import fetch_fitgirl  # noqa: E402
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+# page type -> (fixture, parse callable taking (html, parser), strategies worth measuring)
+PAGES = {
+    "search": ("search.html", fetch_fitgirl._parse_search_results, ("full", "strainer", "lxml")),
+    "article": (
+        "article.html",
+        lambda html, parser: fetch_fitgirl._parse_article(html, "https://fitgirl-repacks.site/bench/", parser),
+        ("full", "strainer"),
+    ),
+    "popular": ("popular.html", lambda html, parser: fetch_fitgirl._parse_popular_repacks(html, "medium", parser), ("full", "strainer", "lxml")),
+    "homepage": ("homepage.html", fetch_fitgirl._parse_homepage, ("full",)),
+    "fuckingfast": ("fuckingfast.html", fetch_fitgirl._parse_fuckingfast_page, ("full", "strainer", "lxml")),
+}
+
+
+def _quiet(func, *args):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return func(*args)
+
+
+def _time_parse(parse, html, parser, runs):
+    samples = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        _quiet(parse, html, parser)
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples)
+
+
+def _peak_memory(parse, html, parser):
+    tracemalloc.start()
+    try:
+        _quiet(parse, html, parser)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=30, help="timed parses per page and strategy")
+    parser.add_argument("--page", action="append", choices=sorted(PAGES), help="limit to these page types")
+    args = parser.parse_args()
+
+    print(f"{'page':<13}{'parser':<10}{'KB':>6}{'median (ms)':>13}{'speedup':>9}{'peak (KB)':>11}  result")
+    for page_type in args.page or PAGES:
+        fixture, parse, strategies = PAGES[page_type]
+        with open(os.path.join(FIXTURES_DIR, fixture), encoding="utf-8") as f:
+            html = f.read()
+
+        reference = _quiet(parse, html, "full")
+        baseline = None
+        for strategy in strategies:
+            result = _quiet(parse, html, strategy)
+            median = _time_parse(parse, html, strategy, args.runs)
+            peak = _peak_memory(parse, html, strategy)
+            baseline = baseline or median
+            print(
+                f"{page_type:<13}{strategy:<10}{len(html) / 1024:>6.0f}{median * 1000:>13.2f}"
+                f"{baseline / median:>8.1f}x{peak / 1024:>11.0f}  {'same' if result == reference else 'DIFFERS'}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,362 @@
+"""
+Offline scraper benchmark: latency percentiles, memory and fetch/parse split.
+
+Every scraper runs against the synthetic pages in benchmarks/fixtures (see
+fixtures/generate.py) instead of the live sites. Sync fetchers get a requests transport adapter mounted on the
+shared session; async fetchers get an httpx.MockTransport client. Both can add
+a fixed simulated network latency.
+
+For each function the report shows:
+  p50/p90/p99  wall time per call (caches cleared before every call)
+  fetch        time spent inside the fixture transport
+  parse        time spent in the page parser / paste decryption
+  peak         tracemalloc peak for one call (Python allocations only)
+
+Baselines are JSON files in benchmarks/baselines; save one on a commit and
+compare against it later:
+
+    python benchmarks/scraper_bench.py --runs 30 --save-baseline main
+    python benchmarks/scraper_bench.py --runs 30 --compare main
+    python benchmarks/scraper_bench.py --only search_fitgirl --latency 0.02
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from urllib.parse import parse_qs, urlsplit
+
+import httpx
+import requests
+from bs4 import BeautifulSoup
+from requests.adapters import BaseAdapter
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+FIXTURES_DIR = os.path.join(BENCH_DIR, "fixtures")
+BASELINES_DIR = os.path.join(BENCH_DIR, "baselines")
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+sys.path.insert(0, FIXTURES_DIR)
+
+import fetch_fitgirl  # noqa: E402
+from generate import PASTE_URL  # noqa: E402
+
+ARTICLE_URL = "https://fitgirl-repacks.site/stellar-protocol-frontier/"
+FUCKINGFAST_URL = "https://fuckingfast.co/0192f37b0372#stellar-protocol-frontier.part01.rar"
+
+# Functions whose time counts as "parse"; they are looked up by name at call time,
+# so wrapping the module attributes catches both sync and async (to_thread) callers
+PARSE_FUNCTIONS = (
+    "_parse_article",
+    "_parse_homepage",
+    "_parse_popular_repacks",
+    "_parse_search_results",
+    "_parse_fuckingfast_page",
+    "_decrypt_paste_data",
+)
+
+
+class _Clock:
+    """Per-call accumulators for time spent fetching and parsing."""
+
+    def __init__(self):
+        self.fetch = 0.0
+        self.parse = 0.0
+
+    def reset(self):
+        self.fetch = 0.0
+        self.parse = 0.0
+
+
+CLOCK = _Clock()
+
+
+def _fixture_for(url: str):
+    # Route a request URL to (fixture file, content type) the way the real sites lay out their URLs
+    parts = urlsplit(url)
+    query = parse_qs(parts.query)
+    if parts.netloc == "paste.fitgirl-repacks.site":
+        return "paste.json", "application/json"
+    if parts.netloc == "fuckingfast.co":
+        return "fuckingfast.html", "text/html; charset=utf-8"
+    if "s" in query:
+        return "search.html", "text/html; charset=utf-8"
+    if parts.path in ("", "/"):
+        return "homepage.html", "text/html; charset=utf-8"
+    if parts.path.startswith("/popular-repacks"):
+        return "popular.html", "text/html; charset=utf-8"
+    return "article.html", "text/html; charset=utf-8"
+
+
+_FIXTURE_BYTES = {}
+
+
+def _fixture_body(name: str) -> bytes:
+    if name not in _FIXTURE_BYTES:
+        with open(os.path.join(FIXTURES_DIR, name), "rb") as f:
+            _FIXTURE_BYTES[name] = f.read()
+    return _FIXTURE_BYTES[name]
+
+
+class FixtureAdapter(BaseAdapter):
+    """requests transport adapter answering from the fixture files."""
+
+    def __init__(self, latency: float = 0.0):
+        super().__init__()
+        self.latency = latency
+
+    def send(self, request, **kwargs):
+        started = time.perf_counter()
+        if self.latency:
+            time.sleep(self.latency)
+        name, content_type = _fixture_for(request.url)
+        response = requests.Response()
+        response.status_code = 200
+        response.url = request.url
+        response.request = request
+        response.encoding = "utf-8"
+        response.headers["Content-Type"] = content_type
+        response._content = _fixture_body(name)
+        CLOCK.fetch += time.perf_counter() - started
+        return response
+
+    def close(self):
+        pass
+
+
+def fixture_async_client(latency: float = 0.0) -> httpx.AsyncClient:
+    async def handler(request: httpx.Request) -> httpx.Response:
+        started = time.perf_counter()
+        if latency:
+            await asyncio.sleep(latency)
+        name, content_type = _fixture_for(str(request.url))
+        response = httpx.Response(200, headers={"Content-Type": content_type}, content=_fixture_body(name))
+        CLOCK.fetch += time.perf_counter() - started
+        return response
+
+    return httpx.AsyncClient(transport=httpx.MockTransport(handler), follow_redirects=True)
+
+
+def _install_parse_timers():
+    def timed(func):
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                CLOCK.parse += time.perf_counter() - started
+        return wrapper
+
+    for name in PARSE_FUNCTIONS:
+        setattr(fetch_fitgirl, name, timed(getattr(fetch_fitgirl, name)))
+
+
+def _homepage_soup():
+    return BeautifulSoup(_fixture_body("homepage.html").decode("utf-8"), "lxml")
+
+
+# Extraction-only cases: the whole call is parse time
+PARSE_ONLY = {"_parse_latest_widget", "_parse_upcoming_list"}
+
+
+def _sync_cases():
+    soup = _homepage_soup()
+    return {
+        "fetch_game_metadata": lambda: fetch_fitgirl.fetch_game_metadata(ARTICLE_URL, force_refresh=True),
+        "fetch_download_links": lambda: fetch_fitgirl.fetch_download_links(ARTICLE_URL, force_refresh=True),
+        "fetch_home_latest": lambda: fetch_fitgirl.fetch_home_latest(force_refresh=True),
+        "fetch_popular_repacks": lambda: fetch_fitgirl.fetch_popular_repacks(force_refresh=True),
+        "search_fitgirl": lambda: fetch_fitgirl.search_fitgirl("stellar frontier"),
+        "decrypt_privatebin_paste": lambda: fetch_fitgirl.decrypt_privatebin_paste(PASTE_URL),
+        "fetch_fuckingfast_page": lambda: fetch_fitgirl.fetch_fuckingfast_page(FUCKINGFAST_URL, save_html=False),
+        # Extraction only, over a pre-built homepage soup
+        "_parse_latest_widget": lambda: fetch_fitgirl._parse_latest_widget(soup),
+        "_parse_upcoming_list": lambda: fetch_fitgirl._parse_upcoming_list(soup),
+    }
+
+
+def _async_cases():
+    return {
+        "fetch_game_metadata_async": lambda: fetch_fitgirl.fetch_game_metadata_async(ARTICLE_URL, force_refresh=True),
+        "search_fitgirl_async": lambda: fetch_fitgirl.search_fitgirl_async("stellar frontier"),
+        "decrypt_privatebin_paste_async": lambda: fetch_fitgirl.decrypt_privatebin_paste_async(PASTE_URL),
+    }
+
+
+def _clear_caches():
+    # Measure cold calls: no cached pages, pastes or derived paste keys
+    fetch_fitgirl._CACHE.clear()
+    fetch_fitgirl._derive_paste_key.cache_clear()
+
+
+def _percentile(samples, pct):
+    if len(samples) < 2:
+        return samples[0]
+    return statistics.quantiles(samples, n=100, method="inclusive")[pct - 1]
+
+
+def _summarize(walls, fetches, parses, peak, result):
+    return {
+        "runs": len(walls),
+        "p50_ms": _percentile(walls, 50) * 1000,
+        "p90_ms": _percentile(walls, 90) * 1000,
+        "p99_ms": _percentile(walls, 99) * 1000,
+        "fetch_ms": statistics.median(fetches) * 1000,
+        "parse_ms": statistics.median(parses) * 1000,
+        "peak_kb": peak / 1024,
+        "ok": result is not None,
+    }
+
+
+def _measure_sync(call, runs, parse_only=False):
+    walls, fetches, parses = [], [], []
+    result = None
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(runs):
+            _clear_caches()
+            CLOCK.reset()
+            started = time.perf_counter()
+            result = call()
+            walls.append(time.perf_counter() - started)
+            fetches.append(CLOCK.fetch)
+            parses.append(walls[-1] if parse_only else CLOCK.parse)
+
+        _clear_caches()
+        tracemalloc.start()
+        call()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return _summarize(walls, fetches, parses, peak, result)
+
+
+async def _measure_async(call, runs, latency):
+    fetch_fitgirl._ASYNC_CLIENT = fixture_async_client(latency)
+    fetch_fitgirl._ASYNC_CLIENT_LOOP = asyncio.get_running_loop()
+    walls, fetches, parses = [], [], []
+    result = None
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            for _ in range(runs):
+                _clear_caches()
+                CLOCK.reset()
+                started = time.perf_counter()
+                result = await call()
+                walls.append(time.perf_counter() - started)
+                fetches.append(CLOCK.fetch)
+                parses.append(CLOCK.parse)
+
+            _clear_caches()
+            tracemalloc.start()
+            await call()
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+    finally:
+        await fetch_fitgirl.close_async_client()
+    return _summarize(walls, fetches, parses, peak, result)
+
+
+def run(runs: int, latency: float, only=None):
+    fetch_fitgirl._get_session().mount("https://", FixtureAdapter(latency))
+    _install_parse_timers()
+
+    results = {}
+    for name, call in _sync_cases().items():
+        if not only or name in only:
+            results[name] = _measure_sync(call, runs, parse_only=name in PARSE_ONLY)
+    for name, call in _async_cases().items():
+        if not only or name in only:
+            results[name] = asyncio.run(_measure_async(call, runs, latency))
+    return results
+
+
+def _git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BENCH_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _baseline_path(name: str) -> str:
+    return os.path.join(BASELINES_DIR, f"{name}.json")
+
+
+def save_baseline(name: str, results: dict, args):
+    os.makedirs(BASELINES_DIR, exist_ok=True)
+    payload = {
+        "revision": _git_revision(),
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "runs": args.runs,
+        "latency": args.latency,
+        "results": results,
+    }
+    with open(_baseline_path(name), "w", encoding="utf-8") as f:
+        json.dump(payload, f, indent=2)
+    print(f"\n💾 Saved baseline '{name}' ({payload['revision'] or 'no git revision'}) to {_baseline_path(name)}")
+
+
+def print_report(results: dict):
+    print(f"{'function':<32}{'p50':>9}{'p90':>9}{'p99':>9}{'fetch':>9}{'parse':>9}{'peak KB':>10}  ok")
+    for name, row in results.items():
+        print(
+            f"{name:<32}{row['p50_ms']:>9.2f}{row['p90_ms']:>9.2f}{row['p99_ms']:>9.2f}"
+            f"{row['fetch_ms']:>9.2f}{row['parse_ms']:>9.2f}{row['peak_kb']:>10.0f}  {'✓' if row['ok'] else '✗'}"
+        )
+    print("\n(times in ms)")
+
+
+def compare(name: str, results: dict, threshold: float) -> bool:
+    """Print p50/peak deltas against a saved baseline; returns True if anything regressed."""
+    with open(_baseline_path(name), encoding="utf-8") as f:
+        baseline = json.load(f)
+    print(f"\n📊 Against baseline '{name}' (revision {baseline.get('revision') or '?'}, {baseline.get('created')})")
+    print(f"{'function':<32}{'p50 before':>12}{'p50 now':>10}{'change':>9}{'peak change':>13}")
+
+    regressed = False
+    for func, row in results.items():
+        before = baseline["results"].get(func)
+        if not before:
+            print(f"{func:<32}{'-':>12}{row['p50_ms']:>10.2f}{'new':>9}")
+            continue
+        change = row["p50_ms"] / before["p50_ms"] - 1 if before["p50_ms"] else 0.0
+        peak_change = row["peak_kb"] / before["peak_kb"] - 1 if before["peak_kb"] else 0.0
+        flag = ""
+        if change > threshold or peak_change > threshold:
+            flag = "  ⚠️ regression"
+            regressed = True
+        print(f"{func:<32}{before['p50_ms']:>12.2f}{row['p50_ms']:>10.2f}{change:>+9.0%}{peak_change:>+13.0%}{flag}")
+    return regressed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=20, help="timed calls per function")
+    parser.add_argument("--latency", type=float, default=0.0, help="simulated network latency per request, seconds")
+    parser.add_argument("--only", action="append", help="limit to these function names")
+    parser.add_argument("--save-baseline", metavar="NAME", help="write results to benchmarks/baselines/NAME.json")
+    parser.add_argument("--compare", metavar="NAME", help="compare against benchmarks/baselines/NAME.json")
+    parser.add_argument("--threshold", type=float, default=0.10, help="relative slowdown counted as a regression")
+    parser.add_argument("--fail-on-regression", action="store_true", help="exit 1 when --compare finds a regression")
+    args = parser.parse_args()
+
+    results = run(args.runs, args.latency, args.only)
+    print_report(results)
+    if args.save_baseline:
+        save_baseline(args.save_baseline, results, args)
+    if args.compare:
+        regressed = compare(args.compare, results, args.threshold)
+        if regressed and args.fail_on_regression:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
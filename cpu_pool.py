@@ -0,0 +1,158 @@
+"""
+Executor for the CPU-bound stages of scraping: HTML parsing and paste decryption.
+
+Async fetchers await ``CpuExecutor.run`` so that work never blocks the event
+loop. Three modes:
+
+* ``thread``  - a thread pool; cheap hand-off, but parses still contend for the GIL
+* ``process`` - a process pool, so a single uvicorn worker can keep every core
+  busy; arguments and results are pickled, so only top-level functions with
+  plain-data results can be submitted
+* ``inline``  - run on the calling thread (debugging and benchmarks)
+
+Process workers are started with ``spawn`` (the API process already runs
+threads, which ``fork`` does not copy safely) and can be warmed up front so
+the first requests do not pay interpreter start-up and import time.
+"""
+
+import asyncio
+import contextvars
+import functools
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+MODES = ('thread', 'process', 'inline')
+
+
+def _timed_call(func, args):
+    # Runs in the worker; wall-clock stamps are comparable across processes
+    started = time.time()
+    result = func(*args)
+    return result, started, time.time()
+
+
+def _warm_worker(modules):
+    # Import the heavy modules once so real tasks start hot
+    for module in modules:
+        __import__(module)
+    return os.getpid()
+
+
+class CpuExecutor:
+    """Runs CPU-bound callables in a thread or process pool and tracks queue depth."""
+
+    def __init__(self, mode: str = 'thread', workers: int = None, warm_modules=(), initializer=None):
+        if mode not in MODES:
+            raise ValueError(f"Unknown CPU executor mode '{mode}', expected one of {MODES}")
+        self.mode = mode
+        self.workers = max(1, workers or os.cpu_count() or 1)
+        self.warm_modules = tuple(warm_modules)
+        # Runs once in every worker process (process mode only)
+        self.initializer = initializer
+        self._executor = None
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._max_in_flight = 0
+        self._counters = {'tasks': 0, 'errors': 0, 'restarts': 0}
+        self._queue_wait = 0.0
+        self._queue_wait_max = 0.0
+        self._run_time = 0.0
+        self._warm_pids = []
+
+    def _ensure_executor(self):
+        with self._lock:
+            if self._executor is None and self.mode != 'inline':
+                if self.mode == 'process':
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=self.workers,
+                        mp_context=multiprocessing.get_context('spawn'),
+                        initializer=self.initializer,
+                    )
+                else:
+                    self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='cpu')
+            return self._executor
+
+    def start(self, warm: bool = True):
+        """Create the pool; in process mode optionally start and warm every worker now."""
+        executor = self._ensure_executor()
+        if warm and self.mode == 'process':
+            started = time.perf_counter()
+            # One task per worker forces the pool to spawn all of them
+            futures = [executor.submit(_warm_worker, self.warm_modules) for _ in range(self.workers)]
+            self._warm_pids = sorted({future.result() for future in futures})
+            return time.perf_counter() - started
+        return 0.0
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    async def run(self, func, *args):
+        if self.mode == 'inline':
+            submitted = time.time()
+            return self._record(*_timed_call(func, args), submitted)
+
+        executor = self._ensure_executor()
+        loop = asyncio.get_running_loop()
+        if self.mode == 'thread':
+            # Keep contextvars (request-scoped state) visible to the parse code, like asyncio.to_thread
+            call = functools.partial(contextvars.copy_context().run, _timed_call, func, args)
+        else:
+            call = functools.partial(_timed_call, func, args)
+
+        submitted = time.time()
+        with self._lock:
+            self._in_flight += 1
+            self._max_in_flight = max(self._max_in_flight, self._in_flight)
+        try:
+            result, started, finished = await loop.run_in_executor(executor, call)
+        except BrokenProcessPool:
+            # A worker died (OOM kill, segfault in a parser); replace the pool for the next caller
+            with self._lock:
+                self._counters['errors'] += 1
+                self._counters['restarts'] += 1
+                if self._executor is executor:
+                    self._executor = None
+            executor.shutdown(wait=False, cancel_futures=True)
+            raise
+        except BaseException:
+            with self._lock:
+                self._counters['errors'] += 1
+            raise
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+        return self._record(result, started, finished, submitted)
+
+    def _record(self, result, started, finished, submitted):
+        with self._lock:
+            wait = max(0.0, started - submitted)
+            self._counters['tasks'] += 1
+            self._queue_wait += wait
+            self._queue_wait_max = max(self._queue_wait_max, wait)
+            self._run_time += finished - started
+        return result
+
+    def stats(self) -> dict:
+        with self._lock:
+            tasks = self._counters['tasks']
+            return {
+                'mode': self.mode,
+                'workers': self.workers if self.mode != 'inline' else 0,
+                'started': self._executor is not None,
+                'warm_pids': list(self._warm_pids),
+                'in_flight': self._in_flight,
+                # Submitted but not yet picked up by a worker
+                'queued': max(0, self._in_flight - self.workers),
+                'max_in_flight': self._max_in_flight,
+                **self._counters,
+                'avg_queue_wait_ms': round(self._queue_wait / tasks * 1000, 3) if tasks else 0.0,
+                'max_queue_wait_ms': round(self._queue_wait_max * 1000, 3),
+                'avg_run_ms': round(self._run_time / tasks * 1000, 3) if tasks else 0.0,
+            }
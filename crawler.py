@@ -0,0 +1,354 @@
+"""
+Incremental crawler that keeps a local mirror of repack metadata.
+
+Discovery walks the site's sitemap index (the post sitemaps, with their
+<lastmod>) and the first few blog listing pages. Sitemap pages whose lastmod
+matches the stored one are skipped without a request. Every other page is
+fetched with If-None-Match / If-Modified-Since, so an unchanged page costs a
+304 and no parse. A page that still comes back 200 is only re-parsed when its
+body hash changed.
+
+Parsed pages land in a SQLite mirror (metadata, download links, ETag,
+Last-Modified, modified_date). With FITGIRL_CACHE_DB set they also go into
+that persistent scrape cache, which the API reads, so it serves crawled pages
+without fetching them. The API adds every game in the mirror to its local
+search index at startup when FITGIRL_CATALOG_DB points at the mirror
+(``index_mirror``). Progress (the remaining frontier and counters) is
+checkpointed to a JSON file, so an interrupted crawl resumes where it stopped.
+
+Usage:
+    python crawler.py --db catalog.sqlite3 --concurrency 2 --delay 0.5
+    python crawler.py --db catalog.sqlite3 --max-pages 200   # stop early, resume next run
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+
+import lxml.etree
+
+from fetch_fitgirl import (
+    HOMEPAGE_URL,
+    close_async_client,
+    close_persistent_cache,
+    fetch_page_conditional_async,
+    index_game_metadata,
+    ingest_article_async,
+    init_persistent_cache,
+    parse_listing_page_async,
+    stop_cpu_pool,
+)
+from log_config import setup_logging
+
+SITEMAP_URL = HOMEPAGE_URL + "sitemap_index.xml"
+# Sub-sitemaps holding the repack posts (Yoast names them post-sitemap.xml, post-sitemap2.xml, ...)
+SITEMAP_INCLUDE = re.compile(r'post-sitemap')
+LISTING_PAGES = 3
+CHECKPOINT_EVERY = 20
+
+log = logging.getLogger("crawler")
+
+_COUNTERS = ('discovered', 'skipped', 'not_modified', 'unchanged', 'new', 'updated', 'failed')
+
+
+def _listing_url(page: int) -> str:
+    return HOMEPAGE_URL if page == 1 else f"{HOMEPAGE_URL}page/{page}/"
+
+
+def _parse_sitemap(xml: bytes):
+    """Return ``(sub_sitemaps, [(loc, lastmod), ...])`` for a sitemap index or urlset."""
+    root = lxml.etree.fromstring(xml, parser=lxml.etree.XMLParser(resolve_entities=False, no_network=True))
+    sitemaps = [loc.strip() for loc in root.xpath("//*[local-name()='sitemap']/*[local-name()='loc']/text()")]
+    urls = []
+    for node in root.xpath("//*[local-name()='url']"):
+        loc = node.xpath("string(*[local-name()='loc'])").strip()
+        lastmod = node.xpath("string(*[local-name()='lastmod'])").strip() or None
+        if loc:
+            urls.append((loc, lastmod))
+    return sitemaps, urls
+
+
+class CrawlStore:
+    """SQLite mirror of crawled article pages and the validators needed to re-check them."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS pages ('
+            ' url TEXT PRIMARY KEY, title TEXT, etag TEXT, last_modified TEXT, sitemap_lastmod TEXT,'
+            ' modified_date TEXT, body_hash TEXT, metadata TEXT, download_links TEXT,'
+            ' crawled_at REAL, changed_at REAL)'
+        )
+
+    def get(self, url: str):
+        with self._lock:
+            cursor = self._conn.execute('SELECT * FROM pages WHERE url = ?', (url,))
+            row = cursor.fetchone()
+            columns = [column[0] for column in cursor.description]
+        return dict(zip(columns, row)) if row is not None else None
+
+    def metadata(self):
+        """Yield the stored metadata of every crawled page."""
+        with self._lock:
+            rows = self._conn.execute('SELECT metadata FROM pages WHERE metadata IS NOT NULL').fetchall()
+        for (metadata,) in rows:
+            yield json.loads(metadata)
+
+    def sitemap_lastmods(self) -> dict:
+        with self._lock:
+            return dict(self._conn.execute('SELECT url, sitemap_lastmod FROM pages WHERE metadata IS NOT NULL'))
+
+    def save(self, url: str, snapshot, etag: str, last_modified: str, sitemap_lastmod: str, body_hash: str):
+        metadata = snapshot['metadata']
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                (url, metadata.get('title'), etag, last_modified, sitemap_lastmod, metadata.get('modified_date'),
+                 body_hash, json.dumps(metadata), json.dumps(snapshot['download_links']), now, now),
+            )
+
+    def touch(self, url: str, etag: str = None, last_modified: str = None, sitemap_lastmod: str = None):
+        """Record a check that found the page unchanged, refreshing whichever validators came back."""
+        with self._lock:
+            self._conn.execute(
+                'UPDATE pages SET crawled_at = ?, etag = COALESCE(?, etag),'
+                ' last_modified = COALESCE(?, last_modified), sitemap_lastmod = COALESCE(?, sitemap_lastmod)'
+                ' WHERE url = ?',
+                (time.time(), etag, last_modified, sitemap_lastmod, url),
+            )
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute('SELECT COUNT(*) FROM pages').fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def load_checkpoint(path: str):
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def save_checkpoint(path: str, state: dict):
+    # Write-then-rename so a crash mid-write never leaves a truncated checkpoint
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(state, f)
+    os.replace(tmp_path, path)
+
+
+class CatalogCrawler:
+    """Discovers article pages and re-checks them with conditional GETs, resumable via a checkpoint."""
+
+    def __init__(self, store: CrawlStore, checkpoint_path: str, concurrency: int = 2, delay: float = 0.5,
+                 listing_pages: int = LISTING_PAGES, max_pages: int = None, sitemap_url: str = SITEMAP_URL):
+        self.store = store
+        self.checkpoint_path = checkpoint_path
+        self.concurrency = max(1, concurrency)
+        # Pause after each request, per worker, to stay polite to the site
+        self.delay = delay
+        self.listing_pages = listing_pages
+        self.max_pages = max_pages
+        self.sitemap_url = sitemap_url
+        self.stats = dict.fromkeys(_COUNTERS, 0)
+        self._frontier = []
+        self._done = set()
+        self._started_at = None
+
+    async def _sitemap_entries(self):
+        try:
+            response = await fetch_page_conditional_async(self.sitemap_url)
+            sitemaps, urls = _parse_sitemap(response.content)
+            posts = [loc for loc in sitemaps if SITEMAP_INCLUDE.search(loc)] or sitemaps
+            for loc in posts:
+                response = await fetch_page_conditional_async(loc)
+                urls.extend(_parse_sitemap(response.content)[1])
+                await asyncio.sleep(self.delay)
+        except Exception as e:
+            # Listing pages still find the recent posts
+            log.warning("⚠️ Sitemap unavailable (%s); using listing pages only", e)
+            return {}
+        return dict(urls)
+
+    async def _listing_entries(self):
+        urls = []
+        for page in range(1, self.listing_pages + 1):
+            try:
+                response = await fetch_page_conditional_async(_listing_url(page))
+            except Exception as e:
+                log.warning("⚠️ Listing page %d failed: %s", page, e)
+                break
+            urls.extend(link['url'] for link in await parse_listing_page_async(response.text))
+            await asyncio.sleep(self.delay)
+        return urls
+
+    async def discover(self):
+        """Build the frontier: ``[url, sitemap lastmod]`` pairs that need a (conditional) request."""
+        entries = await self._sitemap_entries()
+        for url in await self._listing_entries():
+            # Listing pages carry no lastmod; the conditional GET decides for them
+            entries.setdefault(url, None)
+        known = self.store.sitemap_lastmods()
+        frontier = []
+        for url, lastmod in entries.items():
+            if lastmod is not None and known.get(url) == lastmod:
+                self.stats['skipped'] += 1
+                continue
+            frontier.append([url, lastmod])
+        self.stats['discovered'] = len(entries)
+        return frontier
+
+    def _checkpoint(self):
+        save_checkpoint(self.checkpoint_path, {
+            'started_at': self._started_at,
+            'frontier': [item for item in self._frontier if item[0] not in self._done],
+            'stats': self.stats,
+        })
+
+    async def _crawl_page(self, url: str, lastmod: str):
+        row = self.store.get(url)
+        response = await fetch_page_conditional_async(
+            url, etag=row and row['etag'], last_modified=row and row['last_modified']
+        )
+        etag, last_modified = response.headers.get('etag'), response.headers.get('last-modified')
+        if response.status_code == 304:
+            self.store.touch(url, etag, last_modified, lastmod)
+            self.stats['not_modified'] += 1
+            return
+        body_hash = hashlib.sha1(response.content).hexdigest()
+        if row is not None and row['metadata'] is not None and row['body_hash'] == body_hash:
+            # Server ignored the validators but the page is byte-for-byte the same
+            self.store.touch(url, etag, last_modified, lastmod)
+            self.stats['unchanged'] += 1
+            return
+        snapshot = await ingest_article_async(url, response.text)
+        self.store.save(url, snapshot, etag, last_modified, lastmod, body_hash)
+        if row is None:
+            self.stats['new'] += 1
+        elif row['modified_date'] != snapshot['metadata'].get('modified_date'):
+            self.stats['updated'] += 1
+        else:
+            self.stats['unchanged'] += 1
+
+    async def _worker(self, queue: asyncio.Queue):
+        while True:
+            try:
+                url, lastmod = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            try:
+                await self._crawl_page(url, lastmod)
+            except Exception as e:
+                self.stats['failed'] += 1
+                log.warning("✗ Crawl of %s failed: %s", url, e)
+            self._done.add(url)
+            if len(self._done) % CHECKPOINT_EVERY == 0:
+                self._checkpoint()
+            await asyncio.sleep(self.delay)
+
+    async def run(self) -> dict:
+        """Crawl (or resume) until the frontier is empty or ``max_pages`` were requested."""
+        checkpoint = load_checkpoint(self.checkpoint_path)
+        if checkpoint is not None:
+            self._started_at = checkpoint['started_at']
+            self._frontier = checkpoint['frontier']
+            self.stats.update(checkpoint['stats'])
+            log.info("↩️ Resuming crawl: %d pages left", len(self._frontier))
+        else:
+            self._started_at = time.time()
+            self._frontier = await self.discover()
+            log.info("🕸️ Crawl: %d pages found, %d to check", self.stats['discovered'], len(self._frontier))
+        self._checkpoint()
+
+        batch = self._frontier[:self.max_pages] if self.max_pages else self._frontier
+        queue = asyncio.Queue()
+        for item in batch:
+            queue.put_nowait(tuple(item))
+        try:
+            await asyncio.gather(*(self._worker(queue) for _ in range(self.concurrency)))
+        finally:
+            # Also reached on Ctrl+C (task cancelled): keep whatever is left for the next run
+            remaining = len(self._frontier) - len(self._done)
+            if remaining:
+                self._checkpoint()
+            elif os.path.exists(self.checkpoint_path):
+                os.remove(self.checkpoint_path)
+        return dict(self.stats, remaining=remaining, elapsed=round(time.time() - self._started_at, 1))
+
+
+async def crawl_catalog(db_path: str, checkpoint_path: str = None, **options) -> dict:
+    store = CrawlStore(db_path)
+    try:
+        crawler = CatalogCrawler(store, checkpoint_path or f"{db_path}.checkpoint.json", **options)
+        return await crawler.run()
+    finally:
+        store.close()
+
+
+def index_mirror(db_path: str) -> int:
+    """Add every game in the mirror at ``db_path`` to the local search index; returns how many."""
+    if not os.path.exists(db_path):
+        log.warning("⚠️ Catalog mirror %s not found; run crawler.py to build it", db_path)
+        return 0
+    store = CrawlStore(db_path)
+    try:
+        count = 0
+        for metadata in store.metadata():
+            index_game_metadata(metadata)
+            count += 1
+    finally:
+        store.close()
+    log.info("🗂️ Indexed %d games from the catalog mirror %s", count, db_path)
+    return count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--db", default="catalog.sqlite3", help="SQLite mirror to create or update")
+    parser.add_argument("--checkpoint", help="checkpoint file (default: <db>.checkpoint.json)")
+    parser.add_argument("--concurrency", type=int, default=2, help="pages fetched at the same time")
+    parser.add_argument("--delay", type=float, default=0.5, help="seconds each worker waits between requests")
+    parser.add_argument("--listing-pages", type=int, default=LISTING_PAGES, help="blog listing pages to scan")
+    parser.add_argument("--max-pages", type=int, help="stop after this many page requests (resume later)")
+    args = parser.parse_args()
+    setup_logging()
+    # Parsed pages reach the API through the persistent cache file, when there is one
+    init_persistent_cache()
+
+    async def run():
+        try:
+            return await crawl_catalog(
+                args.db, args.checkpoint, concurrency=args.concurrency, delay=args.delay,
+                listing_pages=args.listing_pages, max_pages=args.max_pages,
+            )
+        finally:
+            await close_async_client()
+
+    try:
+        stats = asyncio.run(run())
+    finally:
+        close_persistent_cache()
+        stop_cpu_pool()
+    print("\n📊 Crawl finished:")
+    for name, value in stats.items():
+        print(f"   {name}: {value}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,25 +1,249 @@
+import asyncio
+import contextvars
+import httpx
 import requests
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
+import lxml.html
 import re
 import json
 import base64
 import zlib
-from urllib.parse import urlsplit, urlunsplit
+from urllib.parse import quote_plus, urlsplit, urlunsplit
 from Crypto.Cipher import AES
 from Crypto.Protocol.KDF import PBKDF2
 from Crypto.Hash import SHA256
 import base58
-from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
 import time
-
-REQUEST_TIMEOUT = 12
+import os
+import hashlib
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager, contextmanager
+from functools import lru_cache
+
+from scrape_cache import ScrapeCache, SqliteCacheTier, namespace_of
+from cpu_pool import CpuExecutor
+from prewarm import PrewarmScheduler
+from search_index import CatalogIndex
+from http_transport import OTHER_HOSTS, DnsCache, HostPoolAdapter, HostPoolTransport
+from metrics import REGISTRY
+from log_config import setup_logging
+import tracing
+
+# Request paths log through here; the CLI (main) talks to the user with print
+log = logging.getLogger("fetch_fitgirl")
+
+# Seconds to wait for upstream data once connected (and the basis of the cache lease TTL)
+REQUEST_TIMEOUT = float(os.environ.get("FITGIRL_HTTP_READ_TIMEOUT", "12"))
 CACHE_TTL_HOME = 180
+CACHE_TTL_POPULAR = 180
 CACHE_TTL_METADATA = 300
+CACHE_TTL_SEARCH = 120
+# Distinct normalized queries kept in memory; least recently searched go first
+CACHE_MAX_SEARCHES = 256
+# Pastes never change once created, so decrypted link lists can live for a long time
+CACHE_TTL_PASTE = 7 * 86400
+CACHE_MAX_PASTES = 512
+
+# Memory bounds for the scrape cache; least recently used entries go first
+CACHE_MAX_ENTRIES = 2048
+CACHE_MAX_BYTES = 64 * 1024 * 1024
+CACHE_SWEEP_INTERVAL = 60
+
+# Serve an expired value for this long while one background refresh runs
+CACHE_STALE_WHILE_REVALIDATE = 120
+# Keep serving the last good value for this long past expiry if upstream fails
+CACHE_STALE_IF_ERROR = 3600
+_STALE_NAMESPACES = ('home', 'popular', 'metadata')
+
+# Optional on-disk second tier that survives restarts; set FITGIRL_CACHE_DB to a file path to enable
+CACHE_DB_PATH = os.environ.get("FITGIRL_CACHE_DB", "")
+CACHE_DB_MAX_BYTES = 256 * 1024 * 1024
+CACHE_DB_TTLS = {
+    'metadata': 6 * 3600,
+    'paste': 30 * 86400,  # pastes never change once created
+    'search': 3600,
+}
+# Shared mode: the SQLite file is the cache every API worker process has in common.
+# All namespaces go through it and a key is fetched by one worker while the others wait.
+CACHE_SHARED = os.environ.get("FITGIRL_CACHE_SHARED", "") == "1"
+# How long a worker may hold a key's load lease before others stop waiting for it
+CACHE_LEASE_TTL = REQUEST_TIMEOUT * 2.5
 
 HOMEPAGE_URL = "https://fitgirl-repacks.site/"
 
-_CACHE = {}
+BROWSER_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+}
+PASTE_API_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
+    'Accept': 'application/json',
+}
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+# Where parsing and paste decryption run for async callers: thread, process or inline.
+# Process mode lets one API worker use every core; FITGIRL_CPU_WORKERS defaults to the core count.
+CPU_MODE = os.environ.get("FITGIRL_CPU_MODE", "thread")
+CPU_WORKERS = int(os.environ.get("FITGIRL_CPU_WORKERS", "0")) or None
+
+# Refresh-ahead for hot keys: every PREWARM_INTERVAL seconds the most read keys of each namespace
+# (up to PREWARM_LIMITS) that expire within PREWARM_LEAD seconds, plus up to 50% jitter, are
+# re-fetched in the background. FITGIRL_PREWARM=0 turns it off.
+PREWARM_ENABLED = os.environ.get("FITGIRL_PREWARM", "1") == "1"
+PREWARM_INTERVAL = 5
+PREWARM_LEAD = 30
+PREWARM_JITTER = 0.5
+PREWARM_LIMITS = {'home': 1, 'popular': 3, 'metadata': 50}
+# Cache reads, decayed with a 10 minute half-life, before a key is worth keeping warm (about two recent reads)
+PREWARM_MIN_SCORE = 1.5
+PREWARM_CONCURRENCY = int(os.environ.get("FITGIRL_PREWARM_CONCURRENCY", "4"))
+# Upstream requests per minute the scheduler may spend, across all namespaces
+PREWARM_BUDGET = float(os.environ.get("FITGIRL_PREWARM_BUDGET", "60"))
+
+# Local search over everything already scraped. upstream: always ask the site; offline: index only;
+# auto: the index first, the site when it has fewer than SEARCH_MIN_LOCAL_RESULTS matches.
+SEARCH_MODE = os.environ.get("FITGIRL_SEARCH_MODE", "upstream")
+SEARCH_MODES = ('upstream', 'offline', 'auto')
+SEARCH_MIN_LOCAL_RESULTS = 5
+SEARCH_LOCAL_LIMIT = 20
+# all_pages mode: never follow a query past this many results pages, fetching this many at once
+SEARCH_MAX_PAGES = int(os.environ.get("FITGIRL_SEARCH_MAX_PAGES", "20"))
+SEARCH_PAGE_CONCURRENCY = 4
+CATALOG_MAX_DOCUMENTS = 20000
+
+# Upper bound on article pages one batch request scrapes at the same time
+BATCH_CONCURRENCY = int(os.environ.get("FITGIRL_BATCH_CONCURRENCY", "8"))
+
+
+def _env_mapping(name: str) -> dict:
+    # "a=1,b=2" style overrides, e.g. FITGIRL_PARSERS="popular=full,article=strainer"
+    mapping = {}
+    for item in os.environ.get(name, "").split(","):
+        key, sep, value = item.partition("=")
+        if sep and key.strip() and value.strip():
+            mapping[key.strip()] = value.strip()
+    return mapping
+
+
+# How each page type is parsed:
+#   full     - whole BeautifulSoup tree (reference behaviour)
+#   strainer - BeautifulSoup built only from the tags the extractor reads
+#   lxml     - no BeautifulSoup at all, XPath straight over the lxml tree
+PARSER_STRATEGIES = {
+    'search': 'lxml',
+    'article': 'strainer',
+    'popular': 'lxml',
+    'homepage': 'full',
+    'fuckingfast': 'lxml',
+}
+PARSER_STRATEGIES.update(_env_mapping("FITGIRL_PARSERS"))
+PARSER_CHOICES = ('full', 'strainer', 'lxml')
+
+# Per-host politeness limits for the async client: (concurrent requests, request starts per second).
+# Hosts not listed are unlimited; override with FITGIRL_HOST_LIMITS="fuckingfast.co=8:10" (rate 0 = no pacing).
+HOST_LIMITS = {
+    'fuckingfast.co': (6, 8.0),
+}
+for _host, _limit in _env_mapping("FITGIRL_HOST_LIMITS").items():
+    _concurrency, _, _rate = _limit.partition(":")
+    HOST_LIMITS[_host] = (int(_concurrency), float(_rate or 0))
+
+# Upstream transport shared by the sync session and the async client. Connections are pooled per host:
+# HTTP_POOL_SIZE each, or HTTP_HOST_POOL_SIZES for the hosts listed there
+# (override with FITGIRL_HTTP_HOST_POOLS="fitgirl-repacks.site=128,fuckingfast.co=16").
+HTTP_CONNECT_TIMEOUT = float(os.environ.get("FITGIRL_HTTP_CONNECT_TIMEOUT", "5"))
+HTTP_TIMEOUT = (HTTP_CONNECT_TIMEOUT, REQUEST_TIMEOUT)
+HTTP_RETRIES = int(os.environ.get("FITGIRL_HTTP_RETRIES", "3"))
+HTTP_POOL_SIZE = int(os.environ.get("FITGIRL_HTTP_POOL_SIZE", "64"))
+HTTP_HOST_POOL_SIZES = {host: int(size) for host, size in _env_mapping("FITGIRL_HTTP_HOST_POOLS").items()}
+# Hosts the scraper talks to. The upstream metrics label any other host "other", because API
+# callers pick the URLs and could otherwise create a new time series per invented host.
+UPSTREAM_HOSTS = frozenset({
+    urlsplit(HOMEPAGE_URL).hostname, 'paste.fitgirl-repacks.site', 'fuckingfast.co',
+    *HOST_LIMITS, *HTTP_HOST_POOL_SIZES,
+})
+# Idle async connections are closed after this many seconds
+HTTP_KEEPALIVE_EXPIRY = float(os.environ.get("FITGIRL_HTTP_KEEPALIVE_EXPIRY", "30"))
+# HTTP/2 for the async client (needs the h2 package); requests only speaks HTTP/1.1
+HTTP2 = os.environ.get("FITGIRL_HTTP2", "0") == "1"
+# Longest a resolved upstream address is reused by the pooled clients; 0 resolves every new connection
+DNS_CACHE_TTL = float(os.environ.get("FITGIRL_DNS_CACHE_TTL", "60"))
+
+_CACHE = ScrapeCache(
+    max_entries=CACHE_MAX_ENTRIES,
+    max_bytes=CACHE_MAX_BYTES,
+    namespace_ttls={
+        'home': CACHE_TTL_HOME,
+        'popular': CACHE_TTL_POPULAR,
+        'metadata': CACHE_TTL_METADATA,
+        'search': CACHE_TTL_SEARCH,
+        'paste': CACHE_TTL_PASTE,
+    },
+    namespace_max_entries={'paste': CACHE_MAX_PASTES, 'search': CACHE_MAX_SEARCHES},
+    sweep_interval=CACHE_SWEEP_INTERVAL,
+    stale_while_revalidate=dict.fromkeys(_STALE_NAMESPACES, CACHE_STALE_WHILE_REVALIDATE),
+    stale_if_error=dict.fromkeys(_STALE_NAMESPACES, CACHE_STALE_IF_ERROR),
+)
+# Process workers log through their own queue listener, configured from the same environment
+_CPU = CpuExecutor(CPU_MODE, CPU_WORKERS, warm_modules=(__name__,), initializer=setup_logging)
+_CATALOG = CatalogIndex(max_documents=CATALOG_MAX_DOCUMENTS)
+_PREWARM = PrewarmScheduler(
+    _CACHE,
+    refreshers={
+        'home': lambda key: _get_homepage_snapshot_async(force_refresh=True),
+        'popular': lambda key: fetch_popular_repacks_async(force_refresh=True, image_size=key.split(':', 1)[1]),
+        'metadata': lambda key: _get_article_snapshot_async(key.split(':', 1)[1], force_refresh=True),
+    },
+    limits=PREWARM_LIMITS,
+    interval=PREWARM_INTERVAL,
+    lead=PREWARM_LEAD,
+    jitter=PREWARM_JITTER,
+    concurrency=PREWARM_CONCURRENCY,
+    budget_per_minute=PREWARM_BUDGET,
+    min_score=PREWARM_MIN_SCORE,
+)
+STAGE_SECONDS = REGISTRY.histogram(
+    'fitgirl_stage_seconds', 'Time per scrape stage (fetch, parse, decrypt, serialize) by fetcher', ('fetcher', 'stage'),
+)
+UPSTREAM_RESPONSES = REGISTRY.counter(
+    'fitgirl_upstream_responses_total', 'Upstream HTTP responses by host and status code', ('host', 'status'),
+)
+UPSTREAM_ERRORS = REGISTRY.counter(
+    'fitgirl_upstream_errors_total', 'Upstream requests that failed without a response', ('host', 'error'),
+)
+UPSTREAM_IN_FLIGHT = REGISTRY.gauge('fitgirl_upstream_in_flight', 'Upstream requests awaiting a response', ('host',))
+_ASYNC_CLIENT = None
+_ASYNC_CLIENT_LOOP = None
+_DNS_CACHE = DnsCache(DNS_CACHE_TTL)
+_HOST_LIMITERS = {}
+_HOST_LIMITERS_LOOP = None
+
+
+@contextmanager
+def _stage(fetcher: str, stage: str):
+    # with _stage('article', 'parse'): ... -> fitgirl_stage_seconds{fetcher="article",stage="parse"}
+    # plus a "parse.article" span when the call is part of a traced API request
+    with tracing.span(f"{stage}.{fetcher}", tracing.CLIENT if stage == 'fetch' else tracing.INTERNAL), \
+            STAGE_SECONDS.time(fetcher=fetcher, stage=stage):
+        yield
+
+
+async def _aget_or_load(key: str, loader, force_refresh: bool = False):
+    # _CACHE.aget_or_load in a "cache.<namespace>" span; on a miss the fetch and parse spans nest inside it
+    with tracing.span(f"cache.{namespace_of(key)}"):
+        return await _CACHE.aget_or_load(key, loader, force_refresh=force_refresh)
+
+
+def _host_label(url: str) -> str:
+    host = urlsplit(url).hostname
+    return host if host in UPSTREAM_HOSTS else OTHER_HOSTS
+
+
+def _count_upstream_response(response, *args, **kwargs):
+    # requests response hook; the async client counts in _async_get_unlimited
+    UPSTREAM_RESPONSES.inc(host=_host_label(response.url), status=response.status_code)
 
 
 def _get_session() -> requests.Session:
@@ -30,17 +254,176 @@ def _get_session() -> requests.Session:
     except NameError:
         _SESSION = requests.Session()
         retry = Retry(
-            total=3,
+            total=HTTP_RETRIES,
             backoff_factor=0.5,
-            status_forcelist=[429, 500, 502, 503, 504],
+            status_forcelist=sorted(RETRY_STATUSES),
             allowed_methods=["GET"],
         )
-        adapter = HTTPAdapter(pool_connections=10, pool_maxsize=10, max_retries=retry)
+        adapter = HostPoolAdapter(pool_size=HTTP_POOL_SIZE, host_pool_sizes=HTTP_HOST_POOL_SIZES,
+                                  dns_cache=_DNS_CACHE, hosts=UPSTREAM_HOSTS, max_retries=retry)
         _SESSION.mount("http://", adapter)
         _SESSION.mount("https://", adapter)
+        _SESSION.hooks['response'].append(_count_upstream_response)
         return _SESSION
 
 
+def _get_async_client() -> httpx.AsyncClient:
+    # One pooled client per event loop; httpx connections cannot be shared across loops
+    global _ASYNC_CLIENT, _ASYNC_CLIENT_LOOP
+    loop = asyncio.get_running_loop()
+    if _ASYNC_CLIENT is None or _ASYNC_CLIENT.is_closed or _ASYNC_CLIENT_LOOP is not loop:
+        _ASYNC_CLIENT = httpx.AsyncClient(
+            # The pool timeout (waiting for a free connection) follows the read timeout
+            timeout=httpx.Timeout(REQUEST_TIMEOUT, connect=HTTP_CONNECT_TIMEOUT),
+            follow_redirects=True,
+            transport=HostPoolTransport(
+                pool_size=HTTP_POOL_SIZE,
+                host_pool_sizes=HTTP_HOST_POOL_SIZES,
+                keepalive_expiry=HTTP_KEEPALIVE_EXPIRY,
+                http2=HTTP2,
+                retries=HTTP_RETRIES,
+                dns_cache=_DNS_CACHE,
+                hosts=UPSTREAM_HOSTS,
+            ),
+        )
+        _ASYNC_CLIENT_LOOP = loop
+    return _ASYNC_CLIENT
+
+
+async def close_async_client():
+    """Close the shared async client (called from the API shutdown hook)."""
+    global _ASYNC_CLIENT
+    if _ASYNC_CLIENT is not None and not _ASYNC_CLIENT.is_closed:
+        await _ASYNC_CLIENT.aclose()
+    _ASYNC_CLIENT = None
+
+
+class _HostLimiter:
+    """Caps concurrent requests to one host and spaces out their start times."""
+
+    def __init__(self, concurrency: int, per_second: float):
+        self._semaphore = asyncio.Semaphore(max(1, concurrency))
+        self._interval = 1.0 / per_second if per_second > 0 else 0.0
+        self._next_start = 0.0
+
+    @asynccontextmanager
+    async def slot(self):
+        async with self._semaphore:
+            if self._interval:
+                now = time.monotonic()
+                start_at = max(now, self._next_start)
+                self._next_start = start_at + self._interval
+                if start_at > now:
+                    await asyncio.sleep(start_at - now)
+            yield
+
+
+def _host_limiter(url: str):
+    # Limiters hold asyncio primitives, so like the client they are rebuilt per event loop
+    global _HOST_LIMITERS, _HOST_LIMITERS_LOOP
+    host = urlsplit(url).hostname
+    if host not in HOST_LIMITS:
+        return None
+    loop = asyncio.get_running_loop()
+    if _HOST_LIMITERS_LOOP is not loop:
+        _HOST_LIMITERS, _HOST_LIMITERS_LOOP = {}, loop
+    limiter = _HOST_LIMITERS.get(host)
+    if limiter is None:
+        limiter = _HOST_LIMITERS[host] = _HostLimiter(*HOST_LIMITS[host])
+    return limiter
+
+
+async def _async_get(url: str, headers: dict = None, ok_statuses=()) -> httpx.Response:
+    limiter = _host_limiter(url)
+    if limiter is None:
+        return await _async_get_unlimited(url, headers, ok_statuses)
+    async with limiter.slot():
+        return await _async_get_unlimited(url, headers, ok_statuses)
+
+
+async def _async_get_unlimited(url: str, headers: dict = None, ok_statuses=()) -> httpx.Response:
+    # Mirrors the sync session's Retry policy: back off on throttling and 5xx responses
+    client = _get_async_client()
+    host = _host_label(url)
+    for attempt in range(HTTP_RETRIES + 1):
+        UPSTREAM_IN_FLIGHT.inc(host=host)
+        try:
+            response = await client.get(url, headers=headers)
+        except httpx.TransportError as e:
+            UPSTREAM_ERRORS.inc(host=host, error=type(e).__name__)
+            raise
+        finally:
+            UPSTREAM_IN_FLIGHT.dec(host=host)
+        UPSTREAM_RESPONSES.inc(host=host, status=response.status_code)
+        if response.status_code not in RETRY_STATUSES or attempt == HTTP_RETRIES:
+            break
+        await asyncio.sleep(0.5 * (2 ** attempt))
+    # ok_statuses lets callers handle e.g. 304 Not Modified themselves
+    if response.status_code not in ok_statuses:
+        response.raise_for_status()
+    return response
+
+
+async def _run_cpu(func, *args):
+    # Keep BeautifulSoup parsing and PBKDF2 off the event loop thread; func must be
+    # a top-level function returning plain data so it can cross into a process pool
+    return await _CPU.run(func, *args)
+
+
+def _parser_for(page_type: str, parser: str = None) -> str:
+    parser = parser or PARSER_STRATEGIES.get(page_type, 'full')
+    if parser not in PARSER_CHOICES:
+        raise ValueError(f"Unknown parser '{parser}' for {page_type} pages")
+    return parser
+
+
+# Subtrees each extractor actually reads; everything else is never built
+_STRAINERS = {
+    'search': SoupStrainer('article'),
+    # JSON-LD lives in <head>, the metadata and download lists in the article body
+    'article': SoupStrainer(['article', 'script']),
+    # Strainers see the raw class attribute ("widget_text widget jetpack_top_posts_widget"), hence the regex
+    'popular': SoupStrainer('div', class_=re.compile(r'(^|\s)jetpack_top_posts_widget(\s|$)')),
+    'fuckingfast': SoupStrainer(['title', 'script', 'a']),
+}
+
+
+def _make_soup(html: str, page_type: str, parser: str = None) -> BeautifulSoup:
+    if _parser_for(page_type, parser) == 'strainer' and page_type in _STRAINERS:
+        return BeautifulSoup(html, 'lxml', parse_only=_STRAINERS[page_type])
+    return BeautifulSoup(html, 'lxml')
+
+
+def _lxml_root(html: str):
+    # document_fromstring raises on empty input; treat that like a page with no matches
+    if not html or not html.strip():
+        return None
+    return lxml.html.document_fromstring(html)
+
+
+def _lxml_text(element) -> str:
+    # Same result as BeautifulSoup's get_text(strip=True)
+    return ''.join(part.strip() for part in element.itertext())
+
+
+def _has_class(name: str) -> str:
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+
+def _article_heading_links_lxml(root):
+    # article > h1 > a, first h1 and first anchor of each article like the soup version
+    found = []
+    for article in root.iter('article'):
+        h1 = article.find('.//h1')
+        a_tag = h1.find('.//a') if h1 is not None else None
+        if a_tag is not None and a_tag.get('href'):
+            found.append((_lxml_text(a_tag), a_tag.get('href')))
+    return found
+
+
+IMAGE_SIZES = ('thumb', 'medium', 'full')
+
+
 def _select_image_url(raw_url: str, image_size: str) -> str:
     if not raw_url:
         return None
@@ -63,387 +446,874 @@ def _select_image_url(raw_url: str, image_size: str) -> str:
     return urlunsplit((parsed.scheme, parsed.netloc, parsed.path, '', ''))
 
 
-def _cache_get(key: str):
-    entry = _CACHE.get(key)
-    now = time.time()
-    if entry and entry["expires_at"] > now:
-        print(f"🟢 Cache hit for {key}")
-        return entry["value"]
-    if entry:
-        _CACHE.pop(key, None)
-    return None
+def cache_stats() -> dict:
+    """Hit/miss/eviction counters and memory usage of the scrape cache."""
+    stats = _CACHE.stats()
+    if CPU_MODE != 'process':
+        # In process mode decryption, and so this memo, lives in the pool workers
+        stats['derived_keys'] = _derive_paste_key.cache_info()._asdict()
+    stats['prewarm'] = _PREWARM.stats()
+    stats['catalog'] = _CATALOG.stats()
+    return stats
 
 
-def _cache_set(key: str, value, ttl: int):
-    _CACHE[key] = {"value": value, "expires_at": time.time() + ttl}
+def start_cpu_pool() -> float:
+    """Start the parse/decrypt pool; in process mode every worker is spawned and warmed now."""
+    elapsed = _CPU.start()
+    if CPU_MODE == 'process':
+        log.info("⚙️ CPU pool: %d worker processes warmed in %.2fs", _CPU.workers, elapsed)
+    return elapsed
 
 
-def _cache_invalidate(key: str):
-    _CACHE.pop(key, None)
+def stop_cpu_pool():
+    _CPU.shutdown()
 
-def search_fitgirl(search_query):
-    """Search Fitgirl Repacks and extract article links"""
-    
-    # Replace spaces with '+' for URL
-    formatted_query = search_query.replace(' ', '+')
-    url = f"https://fitgirl-repacks.site/?s={formatted_query}"
-    
-    # Headers to mimic a browser request
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+
+def cpu_stats() -> dict:
+    """Pool mode and size, queue depth and per-task wait/run times of the CPU executor."""
+    return _CPU.stats()
+
+
+def _collect_metrics():
+    # Read from the cache's and CPU pool's own counters whenever /metrics is scraped
+    stats = _CACHE.stats()
+    namespaces = sorted(stats['namespaces'].items())
+    yield ('fitgirl_cache_events_total', 'counter', 'Scrape cache events (hits, misses, evictions, ...) by namespace',
+           [({'namespace': ns, 'event': event}, values[event]) for ns, values in namespaces for event in ScrapeCache.COUNTERS])
+    yield ('fitgirl_cache_entries', 'gauge', 'Entries held in the memory cache by namespace',
+           [({'namespace': ns}, values['entries']) for ns, values in namespaces])
+    yield ('fitgirl_cache_bytes', 'gauge', 'Approximate size of the memory cache by namespace',
+           [({'namespace': ns}, values['bytes']) for ns, values in namespaces])
+    yield ('fitgirl_cache_loads_in_flight', 'gauge', 'Cache loads currently running', [({}, stats['in_flight'])])
+
+    cpu = _CPU.stats()
+    yield ('fitgirl_cpu_pool_workers', 'gauge', 'CPU pool workers', [({'mode': cpu['mode']}, cpu['workers'])])
+    yield ('fitgirl_cpu_pool_in_flight', 'gauge', 'CPU pool tasks submitted and not finished', [({}, cpu['in_flight'])])
+    yield ('fitgirl_cpu_pool_queued', 'gauge', 'CPU pool tasks waiting for a worker', [({}, cpu['queued'])])
+    for name in ('tasks', 'errors', 'restarts'):
+        yield (f'fitgirl_cpu_pool_{name}_total', 'counter', f'CPU pool {name}', [({}, cpu[name])])
+    yield ('fitgirl_cpu_pool_queue_wait_seconds_avg', 'gauge', 'Average time CPU pool tasks waited for a worker',
+           [({}, cpu['avg_queue_wait_ms'] / 1000)])
+
+    yield from _collect_transport_metrics()
+
+    catalog = _CATALOG.stats()
+    yield ('fitgirl_catalog_documents', 'gauge', 'Games in the local search index', [({}, catalog['documents'])])
+
+
+def _collect_transport_metrics():
+    pools = []
+    try:
+        pools.append(('sync', _SESSION.get_adapter("https://").pool_stats()))
+    except (NameError, AttributeError):
+        pass  # no session yet, or an adapter without pool stats (the benchmark's fixtures)
+    client = _ASYNC_CLIENT
+    if client is not None and not client.is_closed and hasattr(client._transport, 'pool_stats'):
+        pools.append(('async', client._transport.pool_stats()))
+    yield ('fitgirl_http_pool_max_connections', 'gauge', 'Connection pool size per upstream host',
+           [({'client': name, 'host': host}, values['max']) for name, stats in pools for host, values in stats.items()])
+    yield ('fitgirl_http_pool_connections', 'gauge', 'Pooled upstream connections by state (active or idle)',
+           [({'client': name, 'host': host, 'state': state}, values[state])
+            for name, stats in pools for host, values in stats.items() for state in ('active', 'idle')])
+    yield ('fitgirl_http_pool_queued', 'gauge', 'Async requests waiting for a free connection',
+           [({'host': host}, values['queued']) for name, stats in pools if name == 'async' for host, values in stats.items()])
+    yield ('fitgirl_http_pool_http2_connections', 'gauge', 'Async connections speaking HTTP/2',
+           [({'host': host}, values['http2']) for name, stats in pools if name == 'async' for host, values in stats.items()])
+    yield ('fitgirl_http_pool_connections_opened_total', 'counter',
+           'Connections the sync session opened; well above the pool size means the pool is too small',
+           [({'host': host}, values['opened']) for name, stats in pools if name == 'sync' for host, values in stats.items()])
+    dns = _DNS_CACHE.stats()
+    yield ('fitgirl_dns_cache_lookups_total', 'counter', 'Upstream DNS lookups answered from the cache (hit) or resolved (miss)',
+           [({'result': 'hit'}, dns['hits']), ({'result': 'miss'}, dns['misses'])])
+
+
+REGISTRY.add_collector(_collect_metrics)
+
+
+def init_persistent_cache(path: str = None, shared: bool = None) -> int:
+    """Attach the SQLite tier and pre-fill memory from it; returns how many entries were warmed."""
+    path = path or CACHE_DB_PATH
+    shared = CACHE_SHARED if shared is None else shared
+    if not path:
+        return 0
+    tier = SqliteCacheTier(path, namespace_ttls=CACHE_DB_TTLS, max_bytes=CACHE_DB_MAX_BYTES)
+    # Rows read back from disk (at warm-up or from other workers) also rebuild the local search index
+    decoders = {
+        'metadata': lambda sections: _index_article_snapshot(_ArticleSnapshot(sections)),
+        'paste': None,
+        'search': _index_search_page,
     }
-    
+    if shared:
+        # Short-lived pages too, so every worker serves the same homepage and popular list
+        decoders.update({
+            'home': lambda sections: _index_homepage_snapshot(_HomepageSnapshot(sections)),
+            'popular': _index_links,
+        })
+    _CACHE.attach_l2(tier, decoders=decoders, shared=shared, lease_ttl=CACHE_LEASE_TTL)
+    warmed = _CACHE.warm_from_l2()
+    mode = "shared" if shared else "persistent"
+    log.info("💾 %s cache %s: warmed %d entries", mode.capitalize(), path, warmed)
+    return warmed
+
+
+def close_persistent_cache():
+    _CACHE.detach_l2()
+
+
+def start_cache_sweeper():
+    _CACHE.start_sweeper()
+
+
+def stop_cache_sweeper():
+    _CACHE.stop_sweeper()
+
+
+def start_prewarm():
+    """Start refreshing hot keys ahead of expiry; call from inside the API's event loop."""
+    if PREWARM_ENABLED:
+        _PREWARM.start()
+
+
+async def stop_prewarm():
+    await _PREWARM.stop()
+
+def _article_heading_links(soup: BeautifulSoup):
+    # Extract links from article > h1 > a
+    found = []
+    for article in soup.find_all('article'):
+        h1 = article.find('h1')
+        if h1:
+            a_tag = h1.find('a')
+            if a_tag and a_tag.get('href'):
+                found.append((a_tag.get_text(strip=True), a_tag.get('href')))
+    return found
+
+
+def _parse_search_results(html: str, parser: str = None):
+    if _parser_for('search', parser) == 'lxml':
+        root = _lxml_root(html)
+        found = _article_heading_links_lxml(root) if root is not None else []
+    else:
+        found = _article_heading_links(_make_soup(html, 'search', parser))
+
+    # Skip "updates digest" links
+    links = [{'title': title, 'url': href} for title, href in found if 'updates digest' not in title.lower()]
+
+    if log.isEnabledFor(logging.DEBUG):
+        log.debug("🔗 Found %d results: %s", len(links), [link['title'] for link in links])
+
+    return links
+
+
+def normalize_search_query(search_query: str) -> str:
+    # WordPress search ignores case and extra whitespace, so "Resident  Evil" and "resident evil" are one query
+    return " ".join(search_query.split()).casefold()
+
+
+def _search_url(search_query: str, page: int = 1) -> str:
+    # quote_plus also escapes '&', '#', '+' and non-ASCII titles, which a bare space replace did not
+    query = quote_plus(normalize_search_query(search_query))
+    if page > 1:
+        return f"https://fitgirl-repacks.site/page/{page}/?s={query}"
+    return f"https://fitgirl-repacks.site/?s={query}"
+
+
+# Pagination links of a results page: /page/N/?s=... (numbered links and "older posts" alike)
+_SEARCH_PAGE_LINK = re.compile(r'/page/(\d+)/?\?(?:[^"\'\s>]*?&(?:amp;)?)?s=')
+
+
+def _parse_search_page(html: str, parser: str = None) -> dict:
+    # One results page plus the highest page number its pagination links point at
+    pages = [int(number) for number in _SEARCH_PAGE_LINK.findall(html)]
+    return {'links': _parse_search_results(html, parser), 'last_page': max(pages, default=1)}
+
+
+def _search_page_key(query: str, page: int) -> str:
+    return f"search:p{page}:{query}"
+
+
+def _index_search_page(result: dict) -> dict:
+    _index_links(result['links'])
+    return result
+
+
+def search_fitgirl(search_query, force_refresh: bool = False, page: int = 1):
+    """Search Fitgirl Repacks and extract article links (cached per normalized query and page)"""
+    query = normalize_search_query(search_query)
+    url = _search_url(query, page)
+
+    def load():
+        log.info("🔍 Searching for %r", search_query, extra={'url': url})
+        with _stage('search', 'fetch'):
+            response = _get_session().get(url, headers=BROWSER_HEADERS, timeout=HTTP_TIMEOUT)
+            response.raise_for_status()
+        with _stage('search', 'parse'):
+            return _index_search_page(_parse_search_page(response.text))
+
     try:
-        print(f"Searching for: {search_query}")
-        print(f"URL: {url}\n")
-        response = _get_session().get(url, headers=headers, timeout=REQUEST_TIMEOUT)
-        response.raise_for_status()
-        
-        # Parse HTML and extract links
-        soup = BeautifulSoup(response.text, 'lxml')
-        
-        # Find all article tags
-        articles = soup.find_all('article')
-        
-        # Extract links from article > h1 > a
-        links = []
-        for article in articles:
-            h1 = article.find('h1')
-            if h1:
-                a_tag = h1.find('a')
-                if a_tag and a_tag.get('href'):
-                    title = a_tag.get_text(strip=True)
-                    href = a_tag.get('href')
-                    
-                    # Skip "updates digest" links
-                    if 'updates digest' not in title.lower():
-                        links.append({'title': title, 'url': href})
-        
-        # Display extracted links
-        print(f"🔗 Found {len(links)} results:\n")
-        for idx, link in enumerate(links, 1):
-            print(f"{idx}. {link['title']}")
-        
-        return links
-            
+        return _CACHE.get_or_load(_search_page_key(query, page), load, force_refresh=force_refresh)['links']
+
     except requests.exceptions.RequestException as e:
-        print(f"✗ Error occurred: {e}")
+        log.warning("✗ Error occurred: %s", e)
         return None
 
-def fetch_game_metadata(page_url, force_refresh: bool = False, image_size: str = "medium"):
+
+async def _search_page_async(query: str, page: int, force_refresh: bool = False) -> dict:
+    # query must already be normalized; raises httpx errors to the caller
+    url = _search_url(query, page)
+
+    async def load():
+        log.info("🔍 Searching for %r (page %d)", query, page, extra={'url': url})
+        with _stage('search', 'fetch'):
+            response = await _async_get(url, headers=BROWSER_HEADERS)
+        with _stage('search', 'parse'):
+            return _index_search_page(await _run_cpu(_parse_search_page, response.text))
+
+    return await _aget_or_load(_search_page_key(query, page), load, force_refresh=force_refresh)
+
+
+async def search_fitgirl_async(search_query, force_refresh: bool = False, page: int = 1):
+    """Async variant of search_fitgirl sharing its cache entries."""
+    try:
+        return (await _search_page_async(normalize_search_query(search_query), page, force_refresh))['links']
+    except httpx.HTTPError as e:
+        log.warning("✗ Error occurred: %s", e)
+        return None
+
+
+async def search_fitgirl_all_pages_async(search_query, force_refresh: bool = False, max_pages: int = None):
     """
-    Fetch comprehensive game metadata from a Fitgirl repack page
-    
+    Fetch every results page of a query and merge them, de-duplicated by URL.
+
+    Page 1's pagination links give the page count; the remaining pages are
+    fetched concurrently (each one cached on its own). If the last page fetched
+    links further on, as an "older posts" style pager does, another round
+    follows. Pages that fail are skipped.
+
     Returns:
-        dict with game metadata including poster, genres, companies, sizes, features, etc.
+        {'links', 'pages' (fetched), 'last_page'} or None if page 1 failed
     """
-    
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-    }
-    
+    query = normalize_search_query(search_query)
+    max_pages = max_pages or SEARCH_MAX_PAGES
     try:
-        cache_key = f"metadata:{page_url}:{image_size}"
-        if not force_refresh:
-            cached = _cache_get(cache_key)
-            if cached is not None:
-                return cached
+        first = await _search_page_async(query, 1, force_refresh)
+    except httpx.HTTPError as e:
+        log.warning("✗ Error occurred: %s", e)
+        return None
 
-        started = time.perf_counter()
-        print(f"\n📥 Fetching game metadata from: {page_url}")
-        response = _get_session().get(page_url, headers=headers, timeout=REQUEST_TIMEOUT)
-        response.raise_for_status()
-        
-        soup = BeautifulSoup(response.text, 'lxml')
-        
-        metadata = {
-            'url': page_url,
-            'title': '',
-            'full_title': '',
-            'update_number': '',
-            'poster_url': '',
-            'genres': [],
-            'companies': '',
-            'languages': '',
-            'requirements': '',
-            'original_size': '',
-            'repack_size': '',
-            'selective_download': False,
-            'repack_features': [],
-            'published_date': '',
-            'modified_date': '',
-            'description': ''
-        }
-        
-        # Extract from JSON-LD schema (most reliable)
-        script_tag = soup.find('script', {'type': 'application/ld+json', 'class': 'yoast-schema-graph'})
-        if script_tag:
-            try:
-                schema_data = json.loads(script_tag.string)
-                for item in schema_data.get('@graph', []):
-                    if item.get('@type') == 'WebPage':
-                        metadata['title'] = item.get('name', '').split(' - ')[0] if ' - ' in item.get('name', '') else item.get('name', '')
-                        metadata['full_title'] = item.get('name', '')
-                        metadata['poster_url'] = _select_image_url(item.get('thumbnailUrl', ''), image_size)
-                        metadata['published_date'] = item.get('datePublished', '')
-                        metadata['modified_date'] = item.get('dateModified', '')
-            except Exception as e:
-                print(f"⚠️  Failed to parse JSON-LD: {e}")
-        
-        # Extract from entry-content
-        entry_content = soup.find('div', class_='entry-content')
-        if entry_content:
-            content_html = str(entry_content)
-
-            def is_valid_genre(text: str) -> bool:
-                clean = text.strip()
-                if not clean:
-                    return False
-                # Skip obvious download/filehoster strings that sometimes get swept in
-                bad_patterns = r"(filehoster|\.rar|\.bin|paste\.fitgirl|fitgirl-repacks|part\d|optional-|\.exe)"
-                return not re.search(bad_patterns, clean, re.IGNORECASE)
-
-            def clean_lines_from_li(li_tag):
-                # Replace <br> with newlines and split, keep non-empty lines
-                for br in li_tag.find_all('br'):
-                    br.replace_with('\n')
-                parts = [p.strip() for p in li_tag.get_text().split('\n') if p.strip()]
-                return parts if parts else [li_tag.get_text(strip=True)]
-
-            def is_valid_feature(text: str) -> bool:
-                clean = text.strip()
-                if not clean:
-                    return False
-                # Drop obvious download/mirror/file entries and raw links
-                bad_patterns = r"(filehoster|\.rar|\.bin|part\d|paste\.fitgirl|multiupload|onedrive|magnet:|http[s]?://|click to show direct links)"
-                return not re.search(bad_patterns, clean, re.IGNORECASE)
-
-            def collect_features_from_ul(ul_tag):
-                if not ul_tag:
-                    return
-                for li in ul_tag.find_all('li'):
-                    for line in clean_lines_from_li(li):
-                        if line and is_valid_feature(line) and line not in metadata['repack_features']:
-                            metadata['repack_features'].append(line)
-
-            def find_features_ul(root):
-                # Prefer UL directly following a heading containing "Repack Features" in the given root
-                for heading in root.find_all(['h2', 'h3', 'h4', 'p', 'div']):
-                    heading_text = heading.get_text(' ', strip=True).lower()
-                    if 'repack feature' in heading_text:
-                        sibling = heading.find_next_sibling()
-                        while sibling and sibling.name not in ['h1', 'h2', 'h3', 'h4']:
-                            if sibling.name == 'ul':
-                                return sibling
-                            sibling = sibling.find_next_sibling()
-                        fallback_ul = heading.find_next('ul')
-                        if fallback_ul:
-                            return fallback_ul
-                return None
-
-            search_roots = [entry_content]
-            article_root = soup.find('article')
-            if article_root and article_root not in search_roots:
-                search_roots.append(article_root)
-            search_roots.append(soup)
-
-            features_list = None
-            for root in search_roots:
-                if not root:
-                    continue
-                features_list = find_features_ul(root)
-                if features_list:
-                    break
+    semaphore = asyncio.Semaphore(SEARCH_PAGE_CONCURRENCY)
+
+    async def one(page):
+        async with semaphore:
+            return await _search_page_async(query, page, force_refresh)
+
+    results = {1: first}
+    last_page = min(first['last_page'], max_pages)
+    while len(results) < last_page:
+        pages = [page for page in range(2, last_page + 1) if page not in results]
+        fetched = await asyncio.gather(*(one(page) for page in pages), return_exceptions=True)
+        for page, result in zip(pages, fetched):
+            if isinstance(result, BaseException):
+                log.warning("✗ Search page %d failed: %s", page, result)
+                results[page] = {'links': [], 'last_page': page}
+            else:
+                results[page] = result
+        last_page = min(max(result['last_page'] for result in results.values()), max_pages)
 
-            if features_list:
-                collect_features_from_ul(features_list)
+    links, seen = [], set()
+    for page in sorted(results):
+        for link in results[page]['links']:
+            if link['url'] not in seen:
+                seen.add(link['url'])
+                links.append(link)
+    return {'links': links, 'pages': len(results), 'last_page': last_page}
 
-            # Heuristic fallback: locate a descriptive UL even without an explicit heading
-            if not metadata['repack_features']:
-                for root in search_roots:
-                    if not root:
-                        continue
-                    for ul in root.find_all('ul'):
-                        li_texts = [li.get_text(' ', strip=True) for li in ul.find_all('li', recursive=False) if li.get_text(strip=True)]
-                        if not li_texts:
-                            continue
-                        avg_len = sum(len(t) for t in li_texts) / len(li_texts)
-                        if len(li_texts) < 5 or avg_len < 30:
-                            continue
-                        if any(re.search(r'(filehoster|magnet|torrent|filecrypt|multiupload|gofile|rar)', t, re.IGNORECASE) for t in li_texts):
-                            continue
-                        collect_features_from_ul(ul)
-                        if metadata['repack_features']:
-                            break
-                    if metadata['repack_features']:
-                        break
-                        genre = a_tag.get_text(strip=True)
-                        if genre and genre not in metadata['genres']:
-                            metadata['genres'].append(genre)
 
-            # Filter out download artefacts accidentally captured as genres
-            metadata['genres'] = [g for g in metadata['genres'] if is_valid_genre(g)]
-            
-            # Extract companies
-            companies_match = re.search(r'Companies:\s*<strong>(.*?)</strong>', content_html)
-            if companies_match:
-                metadata['companies'] = companies_match.group(1)
-            
-            # Extract languages
-            languages_match = re.search(r'Languages:\s*<strong>(.*?)</strong>', content_html)
-            if languages_match:
-                metadata['languages'] = languages_match.group(1)
-            
-            # Extract original size
-            size_match = re.search(r'Original Size:\s*<strong>(.*?)</strong>', content_html)
-            if size_match:
-                metadata['original_size'] = size_match.group(1)
-            
-            # Extract repack size
-            repack_match = re.search(r'Repack Size:\s*<strong>(.*?)</strong>', content_html)
-            if repack_match:
-                repack_size = repack_match.group(1)
-                metadata['repack_size'] = repack_size
-                metadata['selective_download'] = 'Selective' in repack_size or 'selective' in repack_size.lower()
-            
-            # Extract requirements
-            req_match = re.search(r'Requires Windows ([^<]+)', content_html)
-            if req_match:
-                metadata['requirements'] = f"Windows {req_match.group(1)}"
-            
-            def collect_features_from_ul(ul_tag):
-                if not ul_tag:
-                    return
-                for li in ul_tag.find_all('li'):
-                    for line in clean_lines_from_li(li):
-                        if line and is_valid_feature(line) and line not in metadata['repack_features']:
-                            metadata['repack_features'].append(line)
-
-            def find_features_ul():
-                # Prefer UL directly following a heading containing "Repack Features"
-                for heading in entry_content.find_all(['h1', 'h2', 'h3', 'h4', 'p', 'div']):
-                    heading_text = heading.get_text(' ', strip=True).lower()
-                    if 'repack feature' in heading_text:
-                        # Walk siblings until next heading to avoid jumping into download lists
-                        sibling = heading.find_next_sibling()
-                        while sibling and sibling.name not in ['h1', 'h2', 'h3', 'h4']:
-                            if sibling.name == 'ul':
-                                return sibling
-                            sibling = sibling.find_next_sibling()
-                        fallback_ul = heading.find_next('ul')
-                        if fallback_ul:
-                            return fallback_ul
-                return None
-
-            features_list = find_features_ul()
+def _index_links(links):
+    # Search hits, popular and latest entries: title, URL and maybe a poster
+    for link in links or ():
+        _CATALOG.add(link.get('url'), title=link.get('title'), poster_url=link.get('poster_url') or link.get('image'))
+    return links
+
+
+def _index_article_snapshot(snapshot):
+    metadata = snapshot['metadata']
+    _CATALOG.add(
+        metadata.get('url'),
+        title=metadata.get('title'),
+        poster_url=metadata.get('poster_url'),
+        genres=metadata.get('genres'),
+        companies=metadata.get('companies'),
+        languages=metadata.get('languages'),
+    )
+    return snapshot
+
+
+def _index_homepage_snapshot(snapshot):
+    _index_links(snapshot['latest'])
+    return snapshot
+
+
+def index_game_metadata(metadata: dict):
+    """Add a game's metadata from outside the scrapers (the crawler's mirror) to the local search index."""
+    _index_article_snapshot({'metadata': metadata})
+
+
+def search_catalog(search_query: str, limit: int = SEARCH_LOCAL_LIMIT):
+    """Rank already-scraped games against ``search_query`` without touching the network."""
+    return _CATALOG.search(search_query, limit)
+
+
+async def search_games_async(search_query: str, mode: str = None, force_refresh: bool = False,
+                             page: int = 1, limit: int = None, all_pages: bool = False):
+    """Search in the given mode (default SEARCH_MODE).
+
+    Returns ``{'links', 'source', 'page', 'total_pages'}`` or None when
+    upstream failed. ``source`` is 'local' or 'upstream'. Local results carry
+    the extra fields the index knows (poster_url, genres, score) and are paged
+    by ``limit``; upstream pages are the site's own. ``all_pages`` merges every
+    upstream page. ``limit`` caps the number of links returned.
+    """
+    mode = mode or SEARCH_MODE
+    if mode not in SEARCH_MODES:
+        raise ValueError(f"Unknown search mode '{mode}', expected one of {SEARCH_MODES}")
+    if mode != 'upstream' and not force_refresh:
+        size = limit or SEARCH_LOCAL_LIMIT
+        start = 0 if all_pages else (page - 1) * size
+        # A thread, not _run_cpu: process workers have their own, empty, index
+        local = (await asyncio.to_thread(search_catalog, search_query, start + size))[start:]
+        if mode == 'offline' or len(local) >= SEARCH_MIN_LOCAL_RESULTS:
+            return {'links': local, 'source': 'local', 'page': page, 'total_pages': None}
+
+    if all_pages:
+        merged = await search_fitgirl_all_pages_async(search_query, force_refresh=force_refresh)
+        if merged is None:
+            return None
+        links, total_pages = merged['links'], merged['last_page']
+    else:
+        try:
+            result = await _search_page_async(normalize_search_query(search_query), page, force_refresh)
+        except httpx.HTTPError as e:
+            log.warning("✗ Error occurred: %s", e)
+            return None
+        links, total_pages = result['links'], max(result['last_page'], page)
+    return {'links': links[:limit] if limit else links, 'source': 'upstream', 'page': page, 'total_pages': total_pages}
+
+
+def _extract_game_metadata(soup: BeautifulSoup, page_url: str, image_size: str = "medium"):
+    # image_size=None keeps the raw thumbnailUrl so the poster size can be chosen later
+    metadata = {
+        'url': page_url,
+        'title': '',
+        'full_title': '',
+        'update_number': '',
+        'poster_url': '',
+        'genres': [],
+        'companies': '',
+        'languages': '',
+        'requirements': '',
+        'original_size': '',
+        'repack_size': '',
+        'selective_download': False,
+        'repack_features': [],
+        'published_date': '',
+        'modified_date': '',
+        'description': ''
+    }
+    
+    # Extract from JSON-LD schema (most reliable)
+    script_tag = soup.find('script', {'type': 'application/ld+json', 'class': 'yoast-schema-graph'})
+    if script_tag:
+        try:
+            schema_data = json.loads(script_tag.string)
+            for item in schema_data.get('@graph', []):
+                if item.get('@type') == 'WebPage':
+                    metadata['title'] = item.get('name', '').split(' - ')[0] if ' - ' in item.get('name', '') else item.get('name', '')
+                    metadata['full_title'] = item.get('name', '')
+                    raw_poster = item.get('thumbnailUrl', '')
+                    metadata['poster_url'] = _select_image_url(raw_poster, image_size) if image_size else raw_poster
+                    metadata['published_date'] = item.get('datePublished', '')
+                    metadata['modified_date'] = item.get('dateModified', '')
+        except Exception as e:
+            log.warning("⚠️ Failed to parse JSON-LD on %s: %s", page_url, e)
+    
+    # Extract from entry-content
+    entry_content = soup.find('div', class_='entry-content')
+    if entry_content:
+        content_html = str(entry_content)
+
+        def is_valid_genre(text: str) -> bool:
+            clean = text.strip()
+            if not clean:
+                return False
+            # Skip obvious download/filehoster strings that sometimes get swept in
+            bad_patterns = r"(filehoster|\.rar|\.bin|paste\.fitgirl|fitgirl-repacks|part\d|optional-|\.exe)"
+            return not re.search(bad_patterns, clean, re.IGNORECASE)
+
+        def clean_lines_from_li(li_tag):
+            # Replace <br> with newlines and split, keep non-empty lines
+            for br in li_tag.find_all('br'):
+                br.replace_with('\n')
+            parts = [p.strip() for p in li_tag.get_text().split('\n') if p.strip()]
+            return parts if parts else [li_tag.get_text(strip=True)]
+
+        def is_valid_feature(text: str) -> bool:
+            clean = text.strip()
+            if not clean:
+                return False
+            # Drop obvious download/mirror/file entries and raw links
+            bad_patterns = r"(filehoster|\.rar|\.bin|part\d|paste\.fitgirl|multiupload|onedrive|magnet:|http[s]?://|click to show direct links)"
+            return not re.search(bad_patterns, clean, re.IGNORECASE)
+
+        def collect_features_from_ul(ul_tag):
+            if not ul_tag:
+                return
+            for li in ul_tag.find_all('li'):
+                for line in clean_lines_from_li(li):
+                    if line and is_valid_feature(line) and line not in metadata['repack_features']:
+                        metadata['repack_features'].append(line)
+
+        def find_features_ul(root):
+            # Prefer UL directly following a heading containing "Repack Features" in the given root
+            for heading in root.find_all(['h2', 'h3', 'h4', 'p', 'div']):
+                heading_text = heading.get_text(' ', strip=True).lower()
+                if 'repack feature' in heading_text:
+                    sibling = heading.find_next_sibling()
+                    while sibling and sibling.name not in ['h1', 'h2', 'h3', 'h4']:
+                        if sibling.name == 'ul':
+                            return sibling
+                        sibling = sibling.find_next_sibling()
+                    fallback_ul = heading.find_next('ul')
+                    if fallback_ul:
+                        return fallback_ul
+            return None
+
+        search_roots = [entry_content]
+        article_root = soup.find('article')
+        if article_root and article_root not in search_roots:
+            search_roots.append(article_root)
+        search_roots.append(soup)
+
+        features_list = None
+        for root in search_roots:
+            if not root:
+                continue
+            features_list = find_features_ul(root)
             if features_list:
-                collect_features_from_ul(features_list)
+                break
+
+        if features_list:
+            collect_features_from_ul(features_list)
 
-            # Heuristic fallback: locate a descriptive UL even without an explicit heading
-            if not metadata['repack_features']:
-                for ul in entry_content.find_all('ul'):
+        # Heuristic fallback: locate a descriptive UL even without an explicit heading
+        if not metadata['repack_features']:
+            for root in search_roots:
+                if not root:
+                    continue
+                for ul in root.find_all('ul'):
                     li_texts = [li.get_text(' ', strip=True) for li in ul.find_all('li', recursive=False) if li.get_text(strip=True)]
                     if not li_texts:
                         continue
                     avg_len = sum(len(t) for t in li_texts) / len(li_texts)
-                    # Skip obvious download/mirror lists
-                    if len(li_texts) < 4 or avg_len < 25:
+                    if len(li_texts) < 5 or avg_len < 30:
                         continue
-                    if any(re.search(r'(filehoster|magnet|torrent|filecrypt|multiupload|gofile|paste\.fitgirl)', t, re.IGNORECASE) for t in li_texts):
+                    if any(re.search(r'(filehoster|magnet|torrent|filecrypt|multiupload|gofile|rar)', t, re.IGNORECASE) for t in li_texts):
                         continue
                     collect_features_from_ul(ul)
                     if metadata['repack_features']:
                         break
+                if metadata['repack_features']:
+                    break
+                    genre = a_tag.get_text(strip=True)
+                    if genre and genre not in metadata['genres']:
+                        metadata['genres'].append(genre)
 
-            # Final cleanup: drop any lingering download/mirror artefacts
-            metadata['repack_features'] = [f for f in metadata['repack_features'] if is_valid_feature(f)]
-            
-            # Extract description from first paragraph (if available)
-            first_p = entry_content.find('p')
-            if first_p and 'Genres/Tags:' not in first_p.get_text():
-                desc_text = first_p.get_text(strip=True)
-                if len(desc_text) > 50:  # Only use if substantial
-                    metadata['description'] = desc_text[:500]  # Limit to 500 chars
+        # Filter out download artefacts accidentally captured as genres
+        metadata['genres'] = [g for g in metadata['genres'] if is_valid_genre(g)]
+        
+        # Extract companies
+        companies_match = re.search(r'Companies:\s*<strong>(.*?)</strong>', content_html)
+        if companies_match:
+            metadata['companies'] = companies_match.group(1)
+        
+        # Extract languages
+        languages_match = re.search(r'Languages:\s*<strong>(.*?)</strong>', content_html)
+        if languages_match:
+            metadata['languages'] = languages_match.group(1)
+        
+        # Extract original size
+        size_match = re.search(r'Original Size:\s*<strong>(.*?)</strong>', content_html)
+        if size_match:
+            metadata['original_size'] = size_match.group(1)
         
-        print(f"✓ Extracted metadata for: {metadata['title']}")
-        _cache_set(cache_key, metadata, CACHE_TTL_METADATA)
-        print(f"⏱️ metadata scrape {time.perf_counter() - started:.2f}s (cache miss)")
+        # Extract repack size
+        repack_match = re.search(r'Repack Size:\s*<strong>(.*?)</strong>', content_html)
+        if repack_match:
+            repack_size = repack_match.group(1)
+            metadata['repack_size'] = repack_size
+            metadata['selective_download'] = 'Selective' in repack_size or 'selective' in repack_size.lower()
+        
+        # Extract requirements
+        req_match = re.search(r'Requires Windows ([^<]+)', content_html)
+        if req_match:
+            metadata['requirements'] = f"Windows {req_match.group(1)}"
+        
+        def collect_features_from_ul(ul_tag):
+            if not ul_tag:
+                return
+            for li in ul_tag.find_all('li'):
+                for line in clean_lines_from_li(li):
+                    if line and is_valid_feature(line) and line not in metadata['repack_features']:
+                        metadata['repack_features'].append(line)
+
+        def find_features_ul():
+            # Prefer UL directly following a heading containing "Repack Features"
+            for heading in entry_content.find_all(['h1', 'h2', 'h3', 'h4', 'p', 'div']):
+                heading_text = heading.get_text(' ', strip=True).lower()
+                if 'repack feature' in heading_text:
+                    # Walk siblings until next heading to avoid jumping into download lists
+                    sibling = heading.find_next_sibling()
+                    while sibling and sibling.name not in ['h1', 'h2', 'h3', 'h4']:
+                        if sibling.name == 'ul':
+                            return sibling
+                        sibling = sibling.find_next_sibling()
+                    fallback_ul = heading.find_next('ul')
+                    if fallback_ul:
+                        return fallback_ul
+            return None
+
+        features_list = find_features_ul()
+        if features_list:
+            collect_features_from_ul(features_list)
+
+        # Heuristic fallback: locate a descriptive UL even without an explicit heading
+        if not metadata['repack_features']:
+            for ul in entry_content.find_all('ul'):
+                li_texts = [li.get_text(' ', strip=True) for li in ul.find_all('li', recursive=False) if li.get_text(strip=True)]
+                if not li_texts:
+                    continue
+                avg_len = sum(len(t) for t in li_texts) / len(li_texts)
+                # Skip obvious download/mirror lists
+                if len(li_texts) < 4 or avg_len < 25:
+                    continue
+                if any(re.search(r'(filehoster|magnet|torrent|filecrypt|multiupload|gofile|paste\.fitgirl)', t, re.IGNORECASE) for t in li_texts):
+                    continue
+                collect_features_from_ul(ul)
+                if metadata['repack_features']:
+                    break
+
+        # Final cleanup: drop any lingering download/mirror artefacts
+        metadata['repack_features'] = [f for f in metadata['repack_features'] if is_valid_feature(f)]
+        
+        # Extract description from first paragraph (if available)
+        first_p = entry_content.find('p')
+        if first_p and 'Genres/Tags:' not in first_p.get_text():
+            desc_text = first_p.get_text(strip=True)
+            if len(desc_text) > 50:  # Only use if substantial
+                metadata['description'] = desc_text[:500]  # Limit to 500 chars
+    
+    log.debug("✓ Extracted metadata for: %s", metadata['title'])
+    return metadata
+
+
+def _parse_article(html: str, page_url: str, parser: str = None):
+    # No lxml fast path here: metadata extraction leans on BeautifulSoup navigation throughout,
+    # so 'lxml' falls back to the full tree
+    soup = _make_soup(html, 'article', parser)
+    # Download links first: metadata extraction rewrites <br> tags inside list items
+    download_links = _extract_download_links(soup)
+    return {
+        'metadata': _extract_game_metadata(soup, page_url, image_size=None),
+        'download_links': download_links,
+    }
+
+
+class _ArticleSnapshot(dict):
+    """One parse of an article page: metadata (raw poster URL) plus its download links."""
+
+    def __init__(self, sections: dict):
+        super().__init__(sections)
+        self._derived = {}
+
+    def metadata(self, image_size: str):
+        metadata = self._derived.get(image_size)
+        if metadata is None:
+            raw = self['metadata']
+            metadata = self._derived[image_size] = dict(
+                raw, poster_url=_select_image_url(raw['poster_url'], image_size)
+            )
         return metadata
+
+    def download_links(self):
+        return self['download_links']
+
+
+def _load_article_snapshot(page_url: str):
+    started = time.perf_counter()
+    log.info("📥 Fetching article page", extra={'url': page_url})
+    with _stage('article', 'fetch'):
+        response = _get_session().get(page_url, headers=BROWSER_HEADERS, timeout=HTTP_TIMEOUT)
+        response.raise_for_status()
+    with _stage('article', 'parse'):
+        snapshot = _index_article_snapshot(_ArticleSnapshot(_parse_article(response.text, page_url)))
+    elapsed = time.perf_counter() - started
+    log.info("⏱️ article scrape %.2fs (cache miss)", elapsed, extra={'url': page_url, 'elapsed': round(elapsed, 3)})
+    return snapshot
+
+
+async def _load_article_snapshot_async(page_url: str):
+    started = time.perf_counter()
+    log.info("📥 Fetching article page", extra={'url': page_url})
+    with _stage('article', 'fetch'):
+        response = await _async_get(page_url, headers=BROWSER_HEADERS)
+    with _stage('article', 'parse'):
+        snapshot = _index_article_snapshot(_ArticleSnapshot(await _run_cpu(_parse_article, response.text, page_url)))
+    elapsed = time.perf_counter() - started
+    log.info("⏱️ article scrape %.2fs (cache miss)", elapsed, extra={'url': page_url, 'elapsed': round(elapsed, 3)})
+    return snapshot
+
+
+def _get_article_snapshot(page_url: str, force_refresh: bool = False) -> _ArticleSnapshot:
+    # Metadata and download links for a page come from the same fetch and parse
+    return _CACHE.get_or_load(
+        f"metadata:{page_url}", lambda: _load_article_snapshot(page_url), force_refresh=force_refresh
+    )
+
+
+async def _get_article_snapshot_async(page_url: str, force_refresh: bool = False) -> _ArticleSnapshot:
+    return await _aget_or_load(
+        f"metadata:{page_url}", lambda: _load_article_snapshot_async(page_url), force_refresh=force_refresh
+    )
+
+
+def fetch_game_metadata(page_url, force_refresh: bool = False, image_size: str = "medium"):
+    """
+    Fetch comprehensive game metadata from a Fitgirl repack page
+    
+    Returns:
+        dict with game metadata including poster, genres, companies, sizes, features, etc.
+    """
+    
+    try:
+        return _get_article_snapshot(page_url, force_refresh).metadata(image_size)
         
     except requests.exceptions.RequestException as e:
-        print(f"✗ Error occurred: {e}")
-        _cache_invalidate(cache_key)
+        log.warning("✗ Error occurred: %s", e)
         return None
 
-def fetch_popular_repacks(force_refresh: bool = False, image_size: str = "medium"):
-    """Fetch popular repacks from the popular repacks page with TTL caching."""
-    cache_key = f"popular:{image_size}"
-    if not force_refresh:
-        cached = _cache_get(cache_key)
-        if cached is not None:
-            return cached
 
-    started = time.perf_counter()
+async def fetch_game_metadata_async(page_url, force_refresh: bool = False, image_size: str = "medium"):
+    """Async variant of fetch_game_metadata sharing its cache entries."""
+    try:
+        return (await _get_article_snapshot_async(page_url, force_refresh)).metadata(image_size)
 
-    url = "https://fitgirl-repacks.site/popular-repacks/"
+    except httpx.HTTPError as e:
+        log.warning("✗ Error occurred: %s", e)
+        return None
 
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-    }
 
+def fetch_game(page_url, force_refresh: bool = False, image_size: str = "medium"):
+    """Fetch metadata and download links for a game page in one request."""
     try:
-        print(f"📥 Fetching popular repacks...")
-        print(f"URL: {url}\n")
-        response = _get_session().get(url, headers=headers, timeout=REQUEST_TIMEOUT)
-        response.raise_for_status()
+        snapshot = _get_article_snapshot(page_url, force_refresh)
+        return {'metadata': snapshot.metadata(image_size), 'download_links': snapshot.download_links()}
+    except requests.exceptions.RequestException as e:
+        log.warning("✗ Error occurred: %s", e)
+        return None
+
+
+async def fetch_game_async(page_url, force_refresh: bool = False, image_size: str = "medium"):
+    """Async variant of fetch_game."""
+    try:
+        snapshot = await _get_article_snapshot_async(page_url, force_refresh)
+        return {'metadata': snapshot.metadata(image_size), 'download_links': snapshot.download_links()}
+    except httpx.HTTPError as e:
+        log.warning("✗ Error occurred: %s", e)
+        return None
+
+
+async def fetch_game_metadata_batch_async(page_urls, force_refresh: bool = False, image_size: str = "medium",
+                                          concurrency: int = None):
+    """
+    Fetch metadata for many game pages at once.
+
+    Cached pages are answered straight away; the rest are scraped in parallel,
+    at most `concurrency` at a time. Duplicate URLs share one fetch.
+
+    Returns:
+        list of {'url', 'metadata', 'error'} in the same order as page_urls;
+        exactly one of metadata/error is set per item
+    """
+    semaphore = asyncio.Semaphore(max(1, concurrency or BATCH_CONCURRENCY))
+
+    async def scrape(page_url):
+        # Only cache misses take a slot; hits return from the lookup without queueing
+        async with semaphore:
+            return await _load_article_snapshot_async(page_url)
+
+    async def one(page_url):
+        try:
+            snapshot = await _aget_or_load(f"metadata:{page_url}", lambda: scrape(page_url), force_refresh=force_refresh)
+            return {'url': page_url, 'metadata': snapshot.metadata(image_size), 'error': None}
+        except Exception as e:
+            # One broken page must not fail the whole batch
+            log.warning("✗ Error occurred for %s: %s", page_url, e)
+            return {'url': page_url, 'metadata': None, 'error': str(e) or e.__class__.__name__}
+
+    started = time.perf_counter()
+    results = await asyncio.gather(*(one(page_url) for page_url in page_urls))
+    failed = sum(1 for item in results if item['error'])
+    log.info("⏱️ metadata batch of %d in %.2fs (%d failed)", len(results), time.perf_counter() - started, failed)
+    return results
+
+
+async def fetch_page_conditional_async(url: str, etag: str = None, last_modified: str = None) -> httpx.Response:
+    """GET ``url`` with If-None-Match/If-Modified-Since; the response is 200 or 304 Not Modified."""
+    headers = dict(BROWSER_HEADERS)
+    if etag:
+        headers['If-None-Match'] = etag
+    if last_modified:
+        headers['If-Modified-Since'] = last_modified
+    with _stage('crawler', 'fetch'):
+        return await _async_get(url, headers=headers, ok_statuses=(304,))
+
+
+async def ingest_article_async(page_url: str, html: str) -> _ArticleSnapshot:
+    """Parse an article page fetched elsewhere (e.g. by the crawler) into the cache and search index."""
+    with _stage('crawler', 'parse'):
+        snapshot = _index_article_snapshot(_ArticleSnapshot(await _run_cpu(_parse_article, html, page_url)))
+    _CACHE.set(f"metadata:{page_url}", snapshot)
+    return snapshot
+
+
+def _parse_listing_page(html: str):
+    # Blog listing pages (/page/N/) use the same article > h1 > a markup as search results
+    root = _lxml_root(html)
+    found = _article_heading_links_lxml(root) if root is not None else []
+    return [{'title': title, 'url': href} for title, href in found if 'updates digest' not in title.lower()]
+
+
+async def parse_listing_page_async(html: str):
+    with _stage('crawler', 'parse'):
+        return _index_links(await _run_cpu(_parse_listing_page, html))
+
+
+POPULAR_URL = "https://fitgirl-repacks.site/popular-repacks/"
+
+
+def _popular_widget_entries(soup: BeautifulSoup):
+    # (title, href, raw poster) from the visible grid widget on the sidebar
+    entries = []
+    widget = soup.find('div', class_='jetpack_top_posts_widget')
+    if widget:
+        for anchor in widget.select('div.widget-grid-view-image a'):
+            img_tag = anchor.find('img')
+            raw_poster = (img_tag.get('src') or img_tag.get('data-src')) if img_tag else None
+            entries.append((anchor.get('title') or anchor.get_text(strip=True), anchor.get('href'), raw_poster))
+    return entries
+
+
+def _popular_widget_entries_lxml(root):
+    entries = []
+    widgets = root.xpath(f"//div[{_has_class('jetpack_top_posts_widget')}]")
+    if widgets:
+        for anchor in widgets[0].xpath(f".//div[{_has_class('widget-grid-view-image')}]//a"):
+            img_tag = anchor.find('.//img')
+            raw_poster = (img_tag.get('src') or img_tag.get('data-src')) if img_tag is not None else None
+            entries.append((anchor.get('title') or _lxml_text(anchor), anchor.get('href'), raw_poster))
+    return entries
+
+
+def _parse_popular_repacks(html: str, image_size: str = "medium", parser: str = None):
+    parser = _parser_for('popular', parser)
+    root = _lxml_root(html) if parser == 'lxml' else None
+    if parser == 'lxml':
+        entries = _popular_widget_entries_lxml(root) if root is not None else []
+    else:
+        entries = _popular_widget_entries(_make_soup(html, 'popular', parser))
+
+    links = []
+    for title, href, raw_poster in entries:
+        poster_url = _select_image_url(raw_poster, image_size) if raw_poster else None
+        if href and title and 'updates digest' not in title.lower():
+            links.append({'title': title, 'url': href, 'poster_url': poster_url})
+
+    # Fallback: old structure article > h1 > a (the strained soup never kept the articles)
+    if not links:
+        if parser == 'lxml':
+            found = _article_heading_links_lxml(root) if root is not None else []
+        else:
+            found = _article_heading_links(BeautifulSoup(html, 'lxml'))
+        links = [
+            {'title': title, 'url': href, 'poster_url': None}
+            for title, href in found if 'updates digest' not in title.lower()
+        ]
 
-        soup = BeautifulSoup(response.text, 'lxml')
-
-        links = []
-
-        # Primary source (visible grid widget on sidebar)
-        widget = soup.find('div', class_='jetpack_top_posts_widget')
-        if widget:
-            for anchor in widget.select('div.widget-grid-view-image a'):
-                href = anchor.get('href')
-                title = anchor.get('title') or anchor.get_text(strip=True)
-                poster_url = None
-                img_tag = anchor.find('img')
-                if img_tag:
-                    raw_poster = img_tag.get('src') or img_tag.get('data-src')
-                    if raw_poster:
-                        poster_url = _select_image_url(raw_poster, image_size)
-                if href and title and 'updates digest' not in title.lower():
-                    links.append({'title': title, 'url': href, 'poster_url': poster_url})
-
-        # Fallback: old structure article > h1 > a
-        if not links:
-            articles = soup.find_all('article')
-            for article in articles:
-                h1 = article.find('h1')
-                if h1:
-                    a_tag = h1.find('a')
-                    if a_tag and a_tag.get('href'):
-                        title = a_tag.get_text(strip=True)
-                        href = a_tag.get('href')
-                        if 'updates digest' not in title.lower():
-                            links.append({'title': title, 'url': href, 'poster_url': None})
-
-        print(f"🔗 Found {len(links)} popular repacks:\n")
-        for idx, link in enumerate(links, 1):
-            print(f"{idx}. {link['title']}")
-
-        _cache_set(cache_key, links, CACHE_TTL_HOME)
-        print(f"⏱️ popular scrape {time.perf_counter() - started:.2f}s (cache miss)")
+    if log.isEnabledFor(logging.DEBUG):
+        log.debug("🔗 Found %d popular repacks: %s", len(links), [link['title'] for link in links])
+
+    return links
+
+
+def _get_popular_repacks(force_refresh: bool = False, image_size: str = "medium"):
+    # Raises on upstream errors; fetch_popular_repacks turns them into None
+    cache_key = f"popular:{image_size}"
+
+    def load():
+        started = time.perf_counter()
+        log.info("📥 Fetching popular repacks", extra={'url': POPULAR_URL})
+        with _stage('popular', 'fetch'):
+            response = _get_session().get(POPULAR_URL, headers=BROWSER_HEADERS, timeout=HTTP_TIMEOUT)
+            response.raise_for_status()
+
+        with _stage('popular', 'parse'):
+            links = _index_links(_parse_popular_repacks(response.text, image_size))
+        elapsed = time.perf_counter() - started
+        log.info("⏱️ popular scrape %.2fs (cache miss)", elapsed, extra={'elapsed': round(elapsed, 3)})
         return links
 
+    return _CACHE.get_or_load(cache_key, load, force_refresh=force_refresh)
+
+
+def fetch_popular_repacks(force_refresh: bool = False, image_size: str = "medium"):
+    """Fetch popular repacks from the popular repacks page with TTL caching."""
+    try:
+        return _get_popular_repacks(force_refresh, image_size)
+
     except requests.exceptions.RequestException as e:
-        print(f"✗ Error occurred: {e}")
-        _cache_invalidate(cache_key)
+        log.warning("✗ Error occurred: %s", e)
+        return None
+
+
+async def _get_popular_repacks_async(force_refresh: bool = False, image_size: str = "medium"):
+    cache_key = f"popular:{image_size}"
+
+    async def load():
+        started = time.perf_counter()
+        log.info("📥 Fetching popular repacks", extra={'url': POPULAR_URL})
+        with _stage('popular', 'fetch'):
+            response = await _async_get(POPULAR_URL, headers=BROWSER_HEADERS)
+        with _stage('popular', 'parse'):
+            links = _index_links(await _run_cpu(_parse_popular_repacks, response.text, image_size))
+        elapsed = time.perf_counter() - started
+        log.info("⏱️ popular scrape %.2fs (cache miss)", elapsed, extra={'elapsed': round(elapsed, 3)})
+        return links
+
+    return await _aget_or_load(cache_key, load, force_refresh=force_refresh)
+
+
+async def fetch_popular_repacks_async(force_refresh: bool = False, image_size: str = "medium"):
+    """Async variant of fetch_popular_repacks sharing its cache entries."""
+    try:
+        return await _get_popular_repacks_async(force_refresh, image_size)
+
+    except httpx.HTTPError as e:
+        log.warning("✗ Error occurred: %s", e)
         return None
 
 
 def _parse_latest_widget(soup: BeautifulSoup, max_items: int = 12, image_size: str = "medium"):
+    # max_items=None keeps every slide; image_size=None keeps the raw <img src>
     items = []
     widget = soup.find(id="wplp_widget_13066")
     if not widget:
@@ -468,12 +1338,12 @@ def _parse_latest_widget(soup: BeautifulSoup, max_items: int = 12, image_size: s
             items.append({
                 'title': title,
                 'url': href,
-                'image': _select_image_url(img_src, image_size),
+                'image': _select_image_url(img_src, image_size) if image_size else img_src,
                 'version': version,
                 'published_date': '',  # homepage widget doesn’t expose date
                 'repack_size': ''
             })
-        if len(items) >= max_items:
+        if max_items is not None and len(items) >= max_items:
             break
     return items
 
@@ -501,123 +1371,349 @@ def _parse_upcoming_list(soup: BeautifulSoup):
     return upcoming
 
 
-def fetch_home_latest(max_items: int = 12, force_refresh: bool = False):
-    """Fetch latest repacks list from the homepage widget with a short TTL cache."""
-    def fetch_home_latest(max_items: int = 12, force_refresh: bool = False, image_size: str = "medium"):
-        """Fetch latest repacks list from the homepage widget with a short TTL cache."""
-        cache_key = f"home_latest:{max_items}:{image_size}"
-    if not force_refresh:
-        cached = _cache_get(cache_key)
-        if cached is not None:
-            return cached
+def _parse_homepage(html: str, parser: str = None):
+    # Latest widget and upcoming post sit in different parts of the page, so only 'full' applies here
+    soup = _make_soup(html, 'homepage', parser)
+    with tracing.span('parse.latest_widget'):
+        latest = _parse_latest_widget(soup, max_items=None, image_size=None)
+    with tracing.span('parse.upcoming_list'):
+        upcoming = _parse_upcoming_list(soup)
+    return {'latest': latest, 'upcoming': upcoming}
+
+
+class _HomepageSnapshot(dict):
+    """One parse of the homepage; per-request views are memoized on the snapshot itself."""
+
+    def __init__(self, sections: dict):
+        super().__init__(sections)
+        self._derived = {}
 
+    def latest(self, max_items: int, image_size: str):
+        # Clamped so the memo holds at most one view per length and image size, whatever callers ask for
+        max_items = max(0, min(max_items, len(self['latest'])))
+        if image_size not in IMAGE_SIZES:
+            return self._latest_view(max_items, image_size)
+        key = ('latest', max_items, image_size)
+        items = self._derived.get(key)
+        if items is None:
+            items = self._derived[key] = self._latest_view(max_items, image_size)
+        return items
+
+    def _latest_view(self, max_items: int, image_size: str):
+        return [
+            dict(item, image=_select_image_url(item['image'], image_size))
+            for item in self['latest'][:max_items]
+        ]
+
+    def upcoming(self):
+        return self['upcoming']
+
+
+HOMEPAGE_CACHE_KEY = "home:snapshot"
+
+
+def _load_homepage_snapshot():
     started = time.perf_counter()
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-    }
-    try:
-        response = _get_session().get(HOMEPAGE_URL, headers=headers, timeout=REQUEST_TIMEOUT)
+    with _stage('homepage', 'fetch'):
+        response = _get_session().get(HOMEPAGE_URL, headers=BROWSER_HEADERS, timeout=HTTP_TIMEOUT)
         response.raise_for_status()
-        soup = BeautifulSoup(response.text, 'lxml')
-        latest = _parse_latest_widget(soup, max_items=max_items, image_size=image_size)
-        if latest is not None:
-            _cache_set(cache_key, latest, CACHE_TTL_HOME)
-        print(f"⏱️ latest scrape {time.perf_counter() - started:.2f}s (cache miss)")
-        return latest
+    with _stage('homepage', 'parse'):
+        snapshot = _index_homepage_snapshot(_HomepageSnapshot(_parse_homepage(response.text)))
+    elapsed = time.perf_counter() - started
+    log.info("⏱️ homepage scrape %.2fs (cache miss)", elapsed, extra={'elapsed': round(elapsed, 3)})
+    return snapshot
+
+
+async def _load_homepage_snapshot_async():
+    started = time.perf_counter()
+    with _stage('homepage', 'fetch'):
+        response = await _async_get(HOMEPAGE_URL, headers=BROWSER_HEADERS)
+    with _stage('homepage', 'parse'):
+        snapshot = _index_homepage_snapshot(_HomepageSnapshot(await _run_cpu(_parse_homepage, response.text)))
+    elapsed = time.perf_counter() - started
+    log.info("⏱️ homepage scrape %.2fs (cache miss)", elapsed, extra={'elapsed': round(elapsed, 3)})
+    return snapshot
+
+
+def _get_homepage_snapshot(force_refresh: bool = False) -> _HomepageSnapshot:
+    # Shared by fetch_home, fetch_home_latest and fetch_upcoming_list: one download and parse per TTL
+    return _CACHE.get_or_load(HOMEPAGE_CACHE_KEY, _load_homepage_snapshot, force_refresh=force_refresh)
+
+
+async def _get_homepage_snapshot_async(force_refresh: bool = False) -> _HomepageSnapshot:
+    return await _aget_or_load(HOMEPAGE_CACHE_KEY, _load_homepage_snapshot_async, force_refresh=force_refresh)
+
+
+def fetch_home_latest(max_items: int = 12, force_refresh: bool = False, image_size: str = "medium"):
+    """Fetch latest repacks list from the homepage widget with a short TTL cache."""
+    try:
+        return _get_homepage_snapshot(force_refresh).latest(max_items, image_size)
     except requests.exceptions.RequestException as e:
-        print(f"✗ Error occurred: {e}")
-        _cache_invalidate(cache_key)
+        log.warning("✗ Error occurred: %s", e)
+        return None
+
+
+async def fetch_home_latest_async(max_items: int = 12, force_refresh: bool = False, image_size: str = "medium"):
+    """Async variant of fetch_home_latest sharing its cache entries."""
+    try:
+        return (await _get_homepage_snapshot_async(force_refresh)).latest(max_items, image_size)
+    except httpx.HTTPError as e:
+        log.warning("✗ Error occurred: %s", e)
         return None
 
 
-def fetch_upcoming_list():
+def fetch_upcoming_list(force_refresh: bool = False):
     """Fetch upcoming repacks list from the homepage."""
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-    }
     try:
-        response = _get_session().get(HOMEPAGE_URL, headers=headers, timeout=REQUEST_TIMEOUT)
-        response.raise_for_status()
-        soup = BeautifulSoup(response.text, 'lxml')
-        return _parse_upcoming_list(soup)
+        return _get_homepage_snapshot(force_refresh).upcoming()
     except requests.exceptions.RequestException as e:
-        print(f"✗ Error occurred: {e}")
+        log.warning("✗ Error occurred: %s", e)
         return None
 
 
-def fetch_home(max_items: int = 12, force_refresh: bool = False, image_size: str = "medium"):
-    """Aggregate homepage data: featured, latest, upcoming, popular with TTL caching."""
-    cache_key = f"home:{max_items}:{image_size}"
-    if not force_refresh:
-        cached = _cache_get(cache_key)
-        if cached is not None:
-            return cached
+async def fetch_upcoming_list_async(force_refresh: bool = False):
+    """Async variant of fetch_upcoming_list."""
+    try:
+        return (await _get_homepage_snapshot_async(force_refresh)).upcoming()
+    except httpx.HTTPError as e:
+        log.warning("✗ Error occurred: %s", e)
+        return None
 
-    started = time.perf_counter()
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+
+_FETCH_ERRORS = (requests.exceptions.RequestException, httpx.HTTPError)
+
+
+def _fetch_error_message(error: BaseException) -> str:
+    # What clients see about an upstream failure; the details stay in the log
+    response = getattr(error, 'response', None)
+    if response is not None:
+        return f"Upstream returned HTTP {response.status_code}"
+    return "Upstream request failed"
+
+
+def _home_payload(snapshot, popular, max_items: int, image_size: str):
+    """
+    Assemble the home aggregate from the homepage snapshot and the popular list,
+    either of which may be the exception its fetch raised.
+
+    Returns None when both sources failed. Otherwise every section is filled
+    from whatever succeeded, and ``sections`` gives each one's status as
+    ``{'ok': bool, 'error': str or None}``. Only upstream request errors count as
+    a failed section; anything else is re-raised.
+    """
+    failures = {}
+    for source, result in (('homepage', snapshot), ('popular', popular)):
+        if not isinstance(result, BaseException):
+            continue
+        if not isinstance(result, _FETCH_ERRORS):
+            # A parser bug or a cancellation is not a section outage
+            raise result
+        log.warning("✗ Home section %s failed: %s", source, result)
+        failures[source] = _fetch_error_message(result)
+    if len(failures) == 2:
+        return None
+
+    def status(source):
+        return {'ok': source not in failures, 'error': failures.get(source)}
+
+    latest = [] if 'homepage' in failures else snapshot.latest(max_items, image_size)
+    return {
+        'featured': latest[0] if latest else None,
+        'latest': latest,
+        'upcoming': [] if 'homepage' in failures else snapshot.upcoming(),
+        'popular': [] if 'popular' in failures else popular or [],
+        # featured, latest and upcoming all come from the homepage
+        'sections': {
+            'featured': status('homepage'),
+            'latest': status('homepage'),
+            'upcoming': status('homepage'),
+            'popular': status('popular'),
+        },
     }
+
+
+def fetch_home(max_items: int = 12, force_refresh: bool = False, image_size: str = "medium"):
+    """
+    Aggregate homepage data: featured, latest, upcoming, popular with TTL caching.
+
+    The homepage and the popular page are fetched in parallel and cached on
+    their own TTLs; if one of them fails the other's sections are still returned.
+    """
+    with ThreadPoolExecutor(max_workers=2, thread_name_prefix='home') as pool:
+        futures = (
+            # Each worker gets its own copy of the context so spans nest under the caller's
+            pool.submit(contextvars.copy_context().run, _get_homepage_snapshot, force_refresh),
+            pool.submit(contextvars.copy_context().run, _get_popular_repacks, force_refresh, image_size),
+        )
+        snapshot, popular = (future.exception() or future.result() for future in futures)
+    return _home_payload(snapshot, popular, max_items, image_size)
+
+
+async def fetch_home_async(max_items: int = 12, force_refresh: bool = False, image_size: str = "medium"):
+    """Async variant of fetch_home sharing its cache entries; both fetches run concurrently."""
+    snapshot, popular = await asyncio.gather(
+        _get_homepage_snapshot_async(force_refresh),
+        _get_popular_repacks_async(force_refresh, image_size),
+        return_exceptions=True,
+    )
+    return _home_payload(snapshot, popular, max_items, image_size)
+
+
+def _extract_download_links(soup: BeautifulSoup):
+    # Find links from div.entry-content > ul > li > a
+    download_links = []
+    entry_content = soup.find('div', class_='entry-content')
+
+    if entry_content:
+        for ul in entry_content.find_all('ul'):
+            for li in ul.find_all('li'):
+                a_tag = li.find('a')
+                if a_tag and a_tag.get('href'):
+                    text = a_tag.get_text(strip=True)
+                    href = a_tag.get('href')
+                    download_links.append({'text': text, 'url': href})
+
+    log.debug("🔗 Found %d download links", len(download_links))
+
+    return download_links
+
+
+def fetch_download_links(page_url, force_refresh: bool = False):
+    """Fetch download links from ul > li > a on the selected page"""
+    
     try:
-        response = _get_session().get(HOMEPAGE_URL, headers=headers, timeout=REQUEST_TIMEOUT)
-        response.raise_for_status()
-        soup = BeautifulSoup(response.text, 'lxml')
-        latest = _parse_latest_widget(soup, max_items=max_items, image_size=image_size)
-        featured = latest[0] if latest else None
-        upcoming = _parse_upcoming_list(soup)
-        popular = fetch_popular_repacks(force_refresh=force_refresh, image_size=image_size) or []
-        payload = {
-            'featured': featured,
-            'latest': latest,
-            'upcoming': upcoming,
-            'popular': popular
-        }
-        _cache_set(cache_key, payload, CACHE_TTL_HOME)
-        print(f"⏱️ home scrape {time.perf_counter() - started:.2f}s (cache miss)")
-        return payload
+        return _get_article_snapshot(page_url, force_refresh).download_links()
+        
     except requests.exceptions.RequestException as e:
-        print(f"✗ Error occurred: {e}")
-        _cache_invalidate(cache_key)
+        log.warning("✗ Error occurred: %s", e)
         return None
 
-def fetch_download_links(page_url):
-    """Fetch download links from ul > li > a on the selected page"""
+
+async def fetch_download_links_async(page_url, force_refresh: bool = False):
+    """Async variant of fetch_download_links."""
+    try:
+        return (await _get_article_snapshot_async(page_url, force_refresh)).download_links()
+    except httpx.HTTPError as e:
+        log.warning("✗ Error occurred: %s", e)
+        return None
+
+
+@lru_cache(maxsize=256)
+def _derive_paste_key(key_bytes: bytes, salt: bytes, iterations: int, dk_len: int) -> bytes:
+    # PBKDF2 with ~100k iterations is the expensive part of decryption; same inputs, same key
+    return PBKDF2(key_bytes, salt, dkLen=dk_len, count=iterations, hmac_hash_module=SHA256)
+
+
+def _decrypt_paste_data(data: dict, key: str):
+    """Decrypt a PrivateBin API payload with the base58 key from the paste URL fragment."""
+    if 'status' not in data or data['status'] != 0:
+        log.warning("✗ Paste API error (status %s)", data.get('status'))
+        return None
     
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-    }
+    # PrivateBin API returns the paste data differently
+    # Check if data has 'ct' and 'adata' OR if it's in different format
+    if 'ct' in data and 'adata' in data:
+        ct = data['ct']
+        adata = data['adata']
+    elif 'data' in data:
+        # Alternative format: data contains [ct, adata]
+        ct = data['data'][0]
+        adata = data['data'][1]
+    else:
+        log.warning("✗ Unexpected paste data format: %s", list(data.keys()))
+        return None
+    
+    # Extract encryption spec (first element of adata)
+    spec = adata[0]
+    
+    # spec[0] = IV (base64), spec[1] = salt (base64)
+    iv_b64 = spec[0]
+    salt_b64 = spec[1]
+    iterations = spec[2]
+    key_size = spec[3]
+    tag_size = spec[4]
+    
+    # Never log the IV, salt or key: together with the URL fragment they decrypt the paste
+    log.debug("🔧 Paste encryption: AES-GCM mode=%s compression=%s key=%d bits tag=%d bits iterations=%d ciphertext=%d chars",
+              spec[5], spec[7], key_size, tag_size, iterations, len(ct))
+    
+    # Decode key from base58
+    key_bytes_raw = base58.b58decode(key)
+    
+    # CRITICAL: PrivateBin pads the key to 32 bytes OR uses first 32 bytes
+    # From JS: symmetricKey = CryptTool.base58decode(newKey).padStart(32, '\u0000');
+    if len(key_bytes_raw) < 32:
+        key_bytes = b'\x00' * (32 - len(key_bytes_raw)) + key_bytes_raw
+    elif len(key_bytes_raw) > 32:
+        key_bytes = key_bytes_raw[:32]
+    else:
+        key_bytes = key_bytes_raw
+    
+    # Decode salt and IV
+    salt = base64.b64decode(salt_b64)
+    iv = base64.b64decode(iv_b64)
+    
+    # Derive encryption key using PBKDF2 with SHA256
+    derived_key = _derive_paste_key(key_bytes, salt, iterations, key_size // 8)
+    
+    # Decode ciphertext and extract auth tag
+    ct_bytes = base64.b64decode(ct)
+    tag_length = tag_size // 8
+    ciphertext = ct_bytes[:-tag_length]
+    tag = ct_bytes[-tag_length:]
+    
+    # CRITICAL DISCOVERY from PrivateBin source (js/privatebin.js lines 1304-1313):
+    # JavaScript does:
+    #   1. adataString = JSON.stringify(data[1])  <-- uses ORIGINAL base64 spec values
+    #   2. spec[0] = atob(spec[0])                <-- THEN decodes for key/iv use
+    #   3. spec[1] = atob(spec[1])
+    # 
+    # So authenticated data must use the BASE64 spec values, NOT decoded!
+    
+    # Use the ORIGINAL adata with base64 values for authentication
+    adata_str = json.dumps(adata, separators=(',', ':'))
+    
+    # Decrypt - standard UTF-8 encoding for the adata string
+    cipher = AES.new(derived_key, AES.MODE_GCM, nonce=iv)
+    
+    # Use UTF-8 encoding (standard JSON string encoding)
+    cipher.update(adata_str.encode('utf-8'))
     
     try:
-        print(f"\n📥 Fetching download links from selected page...")
-        response = _get_session().get(page_url, headers=headers, timeout=REQUEST_TIMEOUT)
-        response.raise_for_status()
-        
-        soup = BeautifulSoup(response.text, 'lxml')
-        
-        # Find links from div.entry-content > ul > li > a
-        download_links = []
-        entry_content = soup.find('div', class_='entry-content')
-        
-        if entry_content:
-            for ul in entry_content.find_all('ul'):
-                for li in ul.find_all('li'):
-                    a_tag = li.find('a')
-                    if a_tag and a_tag.get('href'):
-                        text = a_tag.get_text(strip=True)
-                        href = a_tag.get('href')
-                        download_links.append({'text': text, 'url': href})
-        
-        print(f"\n🔗 Found {len(download_links)} links:\n")
-        for idx, link in enumerate(download_links, 1):
-            print(f"{idx}. {link['text']}")
-            print(f"   {link['url']}\n")
-        
-        return download_links
-        
-    except requests.exceptions.RequestException as e:
-        print(f"✗ Error occurred: {e}")
+        plaintext = cipher.decrypt_and_verify(ciphertext, tag)
+    except ValueError as e:
+        log.warning("✗ Paste decryption failed: %s", e)
         return None
+    
+    # Decompress using raw deflate (no zlib header)
+    try:
+        # Use -zlib.MAX_WBITS for raw deflate format (no header)
+        decompressed = zlib.decompress(plaintext, -zlib.MAX_WBITS)
+        text = decompressed.decode('utf-8')
+    except Exception as e:
+        log.warning("✗ Paste decompression failed: %s", e)
+        return None
+    
+    # Extract URLs
+    urls = re.findall(r'https?://[^\s<>"\']+', text)
+    log.debug("✅ Decrypted paste: %d URLs", len(urls))
+    
+    return urls
 
-def decrypt_privatebin_paste(paste_url):
+
+def _split_paste_url(paste_url: str):
+    base_url, key = paste_url.split('#', 1)
+    paste_id = base_url.split('?')[-1] if '?' in base_url else None
+    api_url = f"{base_url.split('?')[0]}?pasteid={paste_id}"
+    return api_url, paste_id, key
+
+
+def _paste_cache_key(paste_id: str, key: str) -> str:
+    # Hash the decryption key so it never shows up in cache stats or the on-disk tier
+    return f"paste:{paste_id}:{hashlib.sha256(key.encode('utf-8')).hexdigest()[:32]}"
+
+
+def decrypt_privatebin_paste(paste_url, force_refresh: bool = False):
     """
     Decrypt PrivateBin paste using pure Python (no browser required)
     
@@ -628,165 +1724,120 @@ def decrypt_privatebin_paste(paste_url):
     4. Base58 key may need padding to 32 bytes with null bytes at start
     """
     
-    print(f"\n{'='*80}")
-    print("🔓 DECRYPTING PRIVATEBIN PASTE (Pure Python - NO BROWSER)")
-    print(f"{'='*80}\n")
-    
     if '#' not in paste_url:
-        print("✗ No encryption key in URL")
+        log.warning("✗ No encryption key in paste URL")
         return None
     
-    base_url, key = paste_url.split('#', 1)
-    paste_id = base_url.split('?')[-1] if '?' in base_url else None
-    
-    print(f"📋 Paste ID: {paste_id}")
-    print(f"🔑 Key (base58): {key}")
-    print(f"🔑 Key (truncated): {key[:20]}...\n")
+    api_url, paste_id, key = _split_paste_url(paste_url)
     
-    # Fetch encrypted data from API
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
-        'Accept': 'application/json',
-    }
-    
-    try:
-        api_url = f"{base_url.split('?')[0]}?pasteid={paste_id}"
-        print(f"📥 Fetching from API: {api_url}")
-        
-        response = _get_session().get(api_url, headers=headers, timeout=REQUEST_TIMEOUT)
-        response.raise_for_status()
-        data = response.json()
-        
-        print(f"✓ Got API response\n")
-        
-        if 'status' not in data or data['status'] != 0:
-            print(f"✗ API error: {data}")
-            return None
-        
-        # PrivateBin API returns the paste data differently
-        # Check if data has 'ct' and 'adata' OR if it's in different format
-        if 'ct' in data and 'adata' in data:
-            ct = data['ct']
-            adata = data['adata']
-        elif 'data' in data:
-            # Alternative format: data contains [ct, adata]
-            ct = data['data'][0]
-            adata = data['data'][1]
-        else:
-            print(f"✗ Unexpected data format: {data.keys()}")
-            return None
-        
-        print("✓ Got encrypted data\n")
-        
-        print(f"📊 Data structure:")
-        print(f"   Ciphertext: {len(ct)} chars")
-        print(f"   Adata: {adata}\n")
-        
-        # Extract encryption spec (first element of adata)
-        spec = adata[0]
-        
-        # spec[0] = IV (base64), spec[1] = salt (base64)
-        iv_b64 = spec[0]
-        salt_b64 = spec[1]
-        iterations = spec[2]
-        key_size = spec[3]
-        tag_size = spec[4]
-        
-        print(f"🔧 Encryption parameters:")
-        print(f"   Algorithm: AES-GCM")
-        print(f"   Mode: {spec[5]}")
-        print(f"   Compression: {spec[7]}")
-        print(f"   Key size: {key_size} bits")
-        print(f"   Tag size: {tag_size} bits")
-        print(f"   Iterations: {iterations}")
-        print(f"   IV (base64): {iv_b64}")
-        print(f"   Salt (base64): {salt_b64}\n")
-        
-        # Decode key from base58
-        key_bytes_raw = base58.b58decode(key)
-        print(f"🔑 Decoded key: {len(key_bytes_raw)} bytes")
-        
-        # CRITICAL: PrivateBin pads the key to 32 bytes OR uses first 32 bytes
-        # From JS: symmetricKey = CryptTool.base58decode(newKey).padStart(32, '\u0000');
-        if len(key_bytes_raw) < 32:
-            key_bytes = b'\x00' * (32 - len(key_bytes_raw)) + key_bytes_raw
-            print(f"🔑 Key padded to: {len(key_bytes)} bytes")
-        elif len(key_bytes_raw) > 32:
-            key_bytes = key_bytes_raw[:32]
-            print(f"🔑 Key truncated to: {len(key_bytes)} bytes")
-        else:
-            key_bytes = key_bytes_raw
-        
-        # Decode salt and IV
-        salt = base64.b64decode(salt_b64)
-        iv = base64.b64decode(iv_b64)
-        print(f"🧂 Salt: {len(salt)} bytes")
-        print(f"🔐 IV: {len(iv)} bytes")
-        
-        # Derive encryption key using PBKDF2 with SHA256
-        derived_key = PBKDF2(key_bytes, salt, dkLen=key_size//8, count=iterations, hmac_hash_module=SHA256)
-        print(f"🔑 Derived AES key: {len(derived_key)} bytes\n")
-        
-        # Decode ciphertext and extract auth tag
-        ct_bytes = base64.b64decode(ct)
-        tag_length = tag_size // 8
-        ciphertext = ct_bytes[:-tag_length]
-        tag = ct_bytes[-tag_length:]
-        
-        print(f"📦 Ciphertext: {len(ciphertext)} bytes")
-        print(f"🏷️  Auth tag: {len(tag)} bytes\n")
-        
-        # CRITICAL DISCOVERY from PrivateBin source (js/privatebin.js lines 1304-1313):
-        # JavaScript does:
-        #   1. adataString = JSON.stringify(data[1])  <-- uses ORIGINAL base64 spec values
-        #   2. spec[0] = atob(spec[0])                <-- THEN decodes for key/iv use
-        #   3. spec[1] = atob(spec[1])
-        # 
-        # So authenticated data must use the BASE64 spec values, NOT decoded!
-        
-        # Use the ORIGINAL adata with base64 values for authentication
-        adata_str = json.dumps(adata, separators=(',', ':'))
-        
-        print(f"📝 Authenticated data (with original base64 values):")
-        print(f"   Length: {len(adata_str)} chars\n")
-        
-        # Decrypt - standard UTF-8 encoding for the adata string
-        print("🔓 Decrypting...")
-        cipher = AES.new(derived_key, AES.MODE_GCM, nonce=iv)
-        
-        # Use UTF-8 encoding (standard JSON string encoding)
-        cipher.update(adata_str.encode('utf-8'))
-        
-        try:
-            plaintext = cipher.decrypt_and_verify(ciphertext, tag)
-            print("✅ Decryption successful!\n")
-        except ValueError as e:
-            print(f"✗ Decryption failed: {e}\n")
-            return None
-        
-        # Decompress using raw deflate (no zlib header)
-        print(f"📤 Decompressing ({spec[7]})...")
-        try:
-            # Use -zlib.MAX_WBITS for raw deflate format (no header)
-            decompressed = zlib.decompress(plaintext, -zlib.MAX_WBITS)
-            text = decompressed.decode('utf-8')
-            print(f"✅ Decompressed: {len(text)} chars\n")
-        except Exception as e:
-            print(f"✗ Decompression failed: {e}")
-            return None
+    def load():
+        log.info("📥 Fetching paste", extra={'paste_id': paste_id})
         
-        # Extract URLs
-        urls = re.findall(r'https?://[^\s<>"\']+', text)
-        print(f"✅ SUCCESS! Extracted {len(urls)} URLs\n")
+        # Fetch encrypted data from API
+        with _stage('paste', 'fetch'):
+            response = _get_session().get(api_url, headers=PASTE_API_HEADERS, timeout=HTTP_TIMEOUT)
+            response.raise_for_status()
+            data = response.json()
         
-        return urls
+        with _stage('paste', 'decrypt'):
+            return _decrypt_paste_data(data, key)
+    
+    try:
+        # Failed decryptions return None and are not cached
+        return _CACHE.get_or_load(_paste_cache_key(paste_id, key), load, force_refresh=force_refresh)
         
-    except Exception as e:
-        print(f"✗ Error: {e}")
-        import traceback
-        traceback.print_exc()
+    except Exception:
+        log.exception("✗ Paste %s failed", paste_id)
         return None
 
+
+async def decrypt_privatebin_paste_async(paste_url, force_refresh: bool = False):
+    """Async variant of decrypt_privatebin_paste sharing its cache; key derivation runs off the event loop."""
+    if '#' not in paste_url:
+        log.warning("✗ No encryption key in paste URL")
+        return None
+
+    api_url, paste_id, key = _split_paste_url(paste_url)
+
+    async def load():
+        log.info("📥 Fetching paste", extra={'paste_id': paste_id})
+        with _stage('paste', 'fetch'):
+            response = await _async_get(api_url, headers=PASTE_API_HEADERS)
+            data = response.json()
+        with _stage('paste', 'decrypt'):
+            return await _run_cpu(_decrypt_paste_data, data, key)
+
+    try:
+        return await _aget_or_load(_paste_cache_key(paste_id, key), load, force_refresh=force_refresh)
+
+    except Exception:
+        log.exception("✗ Paste %s failed", paste_id)
+        return None
+
+FUCKINGFAST_HEADERS = {
+    **BROWSER_HEADERS,
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+    'Accept-Language': 'en-US,en;q=0.5',
+    'Referer': 'https://fitgirl-repacks.site/',
+}
+
+
+def _fuckingfast_page_parts(soup: BeautifulSoup):
+    title = soup.find('title')
+    all_links = [
+        (a_tag.get('href'), a_tag.get_text(strip=True), a_tag.get('class', []))
+        for a_tag in soup.find_all('a', href=True)
+    ]
+    return title.get_text(strip=True) if title else None, [script.string for script in soup.find_all('script')], all_links
+
+
+def _fuckingfast_page_parts_lxml(root):
+    title = root.find('.//title')
+    all_links = [
+        (a_tag.get('href'), _lxml_text(a_tag), a_tag.get('class', '').split())
+        for a_tag in root.xpath('//a[@href]')
+    ]
+    return _lxml_text(title) if title is not None else None, [script.text for script in root.iter('script')], all_links
+
+
+def _parse_fuckingfast_page(html: str, parser: str = None):
+    if _parser_for('fuckingfast', parser) == 'lxml':
+        root = _lxml_root(html)
+        title, scripts, all_links = _fuckingfast_page_parts_lxml(root) if root is not None else (None, [], [])
+    else:
+        title, scripts, all_links = _fuckingfast_page_parts(_make_soup(html, 'fuckingfast', parser))
+    
+    log.debug("📄 FuckingFast page %r: %d links", title or 'No title', len(all_links))
+    
+    # Look for download links/buttons - common patterns:
+    # 1. Links with "download" in text or class
+    # 2. Buttons with download functionality
+    # 3. Direct file links
+    
+    download_buttons = []
+    
+    # Extract download URL from JavaScript - FuckingFast specific
+    # Look for window.open("URL") pattern in script tags
+    for script in scripts:
+        if script:
+            # Search for window.open("https://fuckingfast.co/dl/...") pattern
+            download_match = re.search(r'window\.open\(["\']([^"\']+)["\']', script)
+            if download_match:
+                download_url = download_match.group(1)
+                download_buttons.append({
+                    'text': 'Direct Download Link',
+                    'url': download_url
+                })
+                log.debug("✓ Found download URL in JavaScript: %.100s", download_url)
+    
+    # First 10 links for debugging (if no download found)
+    if not download_buttons and log.isEnabledFor(logging.DEBUG):
+        log.debug("📋 No download link; first links on page: %s",
+                  [(text[:50], classes, (href or '')[:80]) for href, text, classes in all_links[:10]])
+    
+    return download_buttons
+
+
 def fetch_fuckingfast_page(fuckingfast_url, save_html=True):
     """
     Fetch FuckingFast page and extract actual download button links
@@ -795,76 +1846,77 @@ def fetch_fuckingfast_page(fuckingfast_url, save_html=True):
     from the HTML after visiting the initial URL
     """
     
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-        'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
-        'Accept-Language': 'en-US,en;q=0.5',
-        'Referer': 'https://fitgirl-repacks.site/',
-    }
-    
     try:
-        print(f"\n🌐 Fetching FuckingFast page...")
-        print(f"   URL: {fuckingfast_url}")
+        log.info("🌐 Fetching FuckingFast page", extra={'url': fuckingfast_url})
         
-        response = _get_session().get(fuckingfast_url, headers=headers, timeout=REQUEST_TIMEOUT)
-        response.raise_for_status()
+        with _stage('fuckingfast', 'fetch'):
+            response = _get_session().get(fuckingfast_url, headers=FUCKINGFAST_HEADERS, timeout=HTTP_TIMEOUT)
+            response.raise_for_status()
         
         # Save HTML for analysis
         if save_html:
             filename = f"fuckingfast_page_{fuckingfast_url.split('/')[-1].split('#')[0]}.html"
             with open(filename, 'w', encoding='utf-8') as f:
                 f.write(response.text)
-            print(f"   💾 Saved HTML to: {filename}")
-        
-        soup = BeautifulSoup(response.text, 'lxml')
-        
-        # Debug: Print page title and basic info
-        title = soup.find('title')
-        print(f"   📄 Page title: {title.get_text(strip=True) if title else 'No title'}")
-        
-        # Count all links
-        all_links = soup.find_all('a', href=True)
-        print(f"   🔗 Total links on page: {len(all_links)}")
-        
-        # Look for download links/buttons - common patterns:
-        # 1. Links with "download" in text or class
-        # 2. Buttons with download functionality
-        # 3. Direct file links
-        
-        download_buttons = []
-        
-        # Extract download URL from JavaScript - FuckingFast specific
-        # Look for window.open("URL") pattern in script tags
-        scripts = soup.find_all('script')
-        for script in scripts:
-            if script.string:
-                # Search for window.open("https://fuckingfast.co/dl/...") pattern
-                download_match = re.search(r'window\.open\(["\']([^"\']+)["\']', script.string)
-                if download_match:
-                    download_url = download_match.group(1)
-                    download_buttons.append({
-                        'text': 'Direct Download Link',
-                        'url': download_url
-                    })
-                    print(f"   ✓ Found download URL in JavaScript: {download_url[:100]}")
+            log.info("💾 Saved HTML to: %s", filename)
         
-        # Print first 10 links for debugging (if no download found)
-        if not download_buttons:
-            print(f"\n   📋 First 10 links found:")
-            for idx, a_tag in enumerate(all_links[:10], 1):
-                href = a_tag.get('href')
-                text = a_tag.get_text(strip=True)
-                classes = a_tag.get('class', [])
-                print(f"      {idx}. Text: '{text[:50]}' | Class: {classes} | Href: {href[:80]}")
-        
-        print(f"\n   ✓ Found {len(download_buttons)} download links on page\n")
-        
-        return download_buttons
+        with _stage('fuckingfast', 'parse'):
+            return _parse_fuckingfast_page(response.text)
         
     except requests.exceptions.RequestException as e:
-        print(f"✗ Error fetching FuckingFast page: {e}")
+        log.warning("✗ Error fetching FuckingFast page %s: %s", fuckingfast_url, e)
+        return None
+
+
+async def _resolve_fuckingfast_page_async(fuckingfast_url):
+    log.info("🌐 Fetching FuckingFast page", extra={'url': fuckingfast_url})
+    with _stage('fuckingfast', 'fetch'):
+        response = await _async_get(fuckingfast_url, headers=FUCKINGFAST_HEADERS)
+    with _stage('fuckingfast', 'parse'):
+        return await _run_cpu(_parse_fuckingfast_page, response.text)
+
+
+async def fetch_fuckingfast_page_async(fuckingfast_url):
+    """Async variant of fetch_fuckingfast_page (never saves the HTML to disk)."""
+    try:
+        return await _resolve_fuckingfast_page_async(fuckingfast_url)
+    except httpx.HTTPError as e:
+        log.warning("✗ Error fetching FuckingFast page %s: %s", fuckingfast_url, e)
         return None
 
+
+def fuckingfast_urls_from(links):
+    """Keep only the FuckingFast part URLs from a decrypted paste, in order and without duplicates."""
+    return list(dict.fromkeys(url for url in links if 'fuckingfast' in url.lower()))
+
+
+async def resolve_fuckingfast_links_async(fuckingfast_urls):
+    """
+    Resolve every part of a repack concurrently, yielding each one as soon as it finishes.
+
+    Requests to each host go through the HOST_LIMITS limiter, so a 40-part repack
+    does not hit FuckingFast with 40 simultaneous requests.
+
+    Yields:
+        {'index', 'url', 'links', 'error'} per part in completion order; index is the
+        position in fuckingfast_urls and exactly one of links/error is set
+    """
+    async def one(index, url):
+        try:
+            return {'index': index, 'url': url, 'links': await _resolve_fuckingfast_page_async(url), 'error': None}
+        except Exception as e:
+            log.warning("✗ Error fetching FuckingFast page %s: %s", url, e)
+            return {'index': index, 'url': url, 'links': None, 'error': str(e) or e.__class__.__name__}
+
+    tasks = [asyncio.ensure_future(one(index, url)) for index, url in enumerate(fuckingfast_urls)]
+    try:
+        for finished in asyncio.as_completed(tasks):
+            yield await finished
+    finally:
+        # The consumer went away (client disconnected): drop the parts nobody will read
+        for task in tasks:
+            task.cancel()
+
 def process_download_links(download_links):
     """Process and display all available download providers"""
     
@@ -996,6 +2048,10 @@ def main():
         print("No results found!")
         return
     
+    print(f"🔗 Found {len(links)} results:\n")
+    for idx, link in enumerate(links, 1):
+        print(f"{idx}. {link['title']}")
+    
     # Let user select a link
     while True:
         try:
@@ -1027,4 +2083,5 @@ def main():
             print("Invalid input! Please enter a number or 'q' to quit")
 
 if __name__ == "__main__":
+    setup_logging()
     main()
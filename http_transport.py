@@ -0,0 +1,384 @@
+"""
+Upstream HTTP transport: per-host connection pools, DNS caching and pool stats.
+
+Both clients in ``fetch_fitgirl`` keep a separate connection pool for every
+upstream host, each with its own size, so a FuckingFast fan-out cannot use up
+the connections that article fetches need:
+
+* ``HostPoolAdapter`` - a requests ``HTTPAdapter`` that sizes each urllib3
+  host pool from ``host_pool_sizes``
+* ``HostPoolTransport`` - an httpx async transport that sends each request
+  through an httpcore connection pool of its own host, created on first use,
+  optionally speaking HTTP/2 (many requests multiplexed on one connection)
+
+Only known hosts get pools (and stats entries) of their own. Every other host
+shares one ``OTHER_HOSTS`` pool, because the API fetches URLs its callers pick.
+
+Given a ``DnsCache``, both also resolve upstream hosts through it: the
+adapter through its urllib3 connection classes, the transport through an
+httpcore network backend. A new connection to a known host then skips the
+lookup. Nothing else in the process is affected; ``socket.getaddrinfo`` is
+left alone.
+
+``pool_stats()`` on the adapter and the transport reports, per host, the pool
+size and how many connections are busy or idle; ``fetch_fitgirl`` exports
+them on ``/metrics``.
+"""
+
+import importlib.util
+import logging
+import socket
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+import anyio
+import httpcore
+import httpx
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.exceptions import ConnectTimeoutError, NameResolutionError
+
+log = logging.getLogger("http_transport")
+
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+# Pool and stats name shared by every host that is not configured
+OTHER_HOSTS = 'other'
+
+
+class HostPoolAdapter(HTTPAdapter):
+    """requests adapter with one urllib3 pool per host, sized per host."""
+
+    def __init__(self, pool_size: int = 10, host_pool_sizes: dict = None, dns_cache: "DnsCache" = None,
+                 hosts=(), **kwargs):
+        self.pool_size = pool_size
+        self.host_pool_sizes = dict(host_pool_sizes or {})
+        self.hosts = frozenset(hosts) | frozenset(self.host_pool_sizes)
+        self.dns_cache = dns_cache
+        super().__init__(pool_maxsize=pool_size, **kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        if self.dns_cache is not None:
+            self.poolmanager.pool_classes_by_scheme = _cached_dns_pool_classes(self.dns_cache)
+
+    def build_connection_pool_key_attributes(self, request, verify, cert=None):
+        host_params, pool_kwargs = super().build_connection_pool_key_attributes(request, verify, cert)
+        size = self.host_pool_sizes.get(host_params['host'])
+        if size:
+            # maxsize is part of urllib3's pool key, so the host gets a pool of this size
+            pool_kwargs['maxsize'] = size
+        return host_params, pool_kwargs
+
+    def pool_stats(self) -> dict:
+        """{host: {'max', 'active', 'idle', 'opened'}} over the pools urllib3 currently keeps.
+
+        Pools of hosts outside ``hosts`` are summed under ``OTHER_HOSTS``.
+        """
+        stats = {}
+        pools = self.poolmanager.pools
+        for key in pools.keys():
+            pool = pools.get(key)
+            if pool is None or pool.pool is None:
+                continue
+            queue = pool.pool
+            # The queue starts as maxsize placeholders (None); a connection checked out leaves a gap
+            idle = sum(1 for conn in list(queue.queue) if conn is not None)
+            name = pool.host if pool.host in self.hosts else OTHER_HOSTS
+            entry = stats.setdefault(name, {'max': 0, 'active': 0, 'idle': 0, 'opened': 0})
+            entry['max'] += queue.maxsize
+            entry['active'] += queue.maxsize - queue.qsize()
+            entry['idle'] += idle
+            # More opened than max means connections beyond the pool were made and thrown away
+            entry['opened'] += pool.num_connections
+        return stats
+
+
+# httpcore raises its own exception types; httpx callers expect the httpx ones of the same name
+_HTTPCORE_ERRORS = {
+    getattr(httpcore, name): getattr(httpx, name)
+    for name in ('ConnectTimeout', 'ReadTimeout', 'WriteTimeout', 'PoolTimeout', 'TimeoutException',
+                 'ConnectError', 'ReadError', 'WriteError', 'NetworkError', 'ProxyError',
+                 'UnsupportedProtocol', 'RemoteProtocolError', 'LocalProtocolError', 'ProtocolError')
+}
+
+
+@contextmanager
+def _httpx_errors():
+    try:
+        yield
+    except Exception as exc:
+        mapped = next((_HTTPCORE_ERRORS[cls] for cls in type(exc).__mro__ if cls in _HTTPCORE_ERRORS), None)
+        if mapped is None:
+            raise
+        raise mapped(str(exc)) from exc
+
+
+class _ResponseStream(httpx.AsyncByteStream):
+    def __init__(self, stream):
+        self._stream = stream
+
+    async def __aiter__(self):
+        with _httpx_errors():
+            async for part in self._stream:
+                yield part
+
+    async def aclose(self):
+        if hasattr(self._stream, 'aclose'):
+            await self._stream.aclose()
+
+
+class _HostPool:
+    def __init__(self, pool: httpcore.AsyncConnectionPool, size: int):
+        self.pool = pool
+        self.size = size
+        # Requests the pool has not yet handed to a connection
+        self.queued = 0
+
+
+class HostPoolTransport(httpx.AsyncBaseTransport):
+    """httpx transport routing every known host to its own httpcore connection pool.
+
+    Known hosts are those in ``hosts`` or ``host_pool_sizes``; all other hosts
+    share one ``OTHER_HOSTS`` pool, so URLs from callers cannot add pools.
+    """
+
+    def __init__(self, pool_size: int = 10, host_pool_sizes: dict = None, keepalive_expiry: float = 5.0,
+                 http2: bool = False, retries: int = 0, dns_cache: "DnsCache" = None, hosts=()):
+        if http2 and not HTTP2_AVAILABLE:
+            log.warning("⚠️ HTTP/2 requested but the h2 package is not installed; using HTTP/1.1")
+            http2 = False
+        self.pool_size = pool_size
+        self.host_pool_sizes = dict(host_pool_sizes or {})
+        self.hosts = frozenset(hosts) | frozenset(self.host_pool_sizes)
+        self.keepalive_expiry = keepalive_expiry
+        self.http2 = http2
+        self.retries = retries
+        self.dns_cache = dns_cache
+        self._ssl_context = httpx.create_ssl_context()
+        self._pools = {}
+
+    def _pool_for(self, host: str) -> _HostPool:
+        name = host if host in self.hosts else OTHER_HOSTS
+        host_pool = self._pools.get(name)
+        if host_pool is None:
+            size = self.host_pool_sizes.get(name, self.pool_size)
+            pool = httpcore.AsyncConnectionPool(
+                ssl_context=self._ssl_context,
+                max_connections=size,
+                max_keepalive_connections=size,
+                keepalive_expiry=self.keepalive_expiry,
+                http2=self.http2,
+                retries=self.retries,
+                network_backend=_CachedDnsBackend(self.dns_cache) if self.dns_cache is not None else None,
+            )
+            host_pool = self._pools[name] = _HostPool(pool, size)
+        return host_pool
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        host_pool = self._pool_for(request.url.host)
+        outer_trace = request.extensions.get('trace')
+        waiting = True
+        host_pool.queued += 1
+
+        async def trace(name, info):
+            nonlocal waiting
+            if waiting:
+                # The pool itself emits no trace events; the first comes from the connection it picked
+                waiting = False
+                host_pool.queued -= 1
+            if outer_trace is not None:
+                await outer_trace(name, info)
+
+        core_request = httpcore.Request(
+            method=request.method,
+            url=httpcore.URL(
+                scheme=request.url.raw_scheme,
+                host=request.url.raw_host,
+                port=request.url.port,
+                target=request.url.raw_path,
+            ),
+            headers=request.headers.raw,
+            content=request.stream,
+            extensions={**request.extensions, 'trace': trace},
+        )
+        try:
+            with _httpx_errors():
+                response = await host_pool.pool.handle_async_request(core_request)
+        finally:
+            if waiting:
+                waiting = False
+                host_pool.queued -= 1
+        return httpx.Response(
+            status_code=response.status,
+            headers=response.headers,
+            stream=_ResponseStream(response.stream),
+            extensions=response.extensions,
+        )
+
+    async def aclose(self):
+        pools, self._pools = list(self._pools.values()), {}
+        for host_pool in pools:
+            await host_pool.pool.aclose()
+
+    def pool_stats(self) -> dict:
+        """{host: {'max', 'active', 'idle', 'queued', 'http2'}} per pool used so far."""
+        stats = {}
+        for name, host_pool in list(self._pools.items()):
+            connections = list(host_pool.pool.connections)
+            idle = sum(1 for conn in connections if conn.is_idle())
+            stats[name] = {
+                'max': host_pool.size,
+                'active': len(connections) - idle,
+                'idle': idle,
+                'queued': host_pool.queued,
+                'http2': sum(1 for conn in connections if conn.info().startswith('HTTP/2')),
+            }
+        return stats
+
+
+class DnsCache:
+    """TTL cache of resolved upstream addresses; only successful answers are kept.
+
+    getaddrinfo does not expose record TTLs, so ``ttl`` is an upper bound on how
+    long an answer is reused. An entry is also dropped as soon as no address in
+    it accepts a connection, so a host that moved is looked up again at once.
+    """
+
+    def __init__(self, ttl: float = 60.0, max_entries: int = 256):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _cached(self, host: str, port: int):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get((host, port))
+            if entry is not None and entry[0] > now:
+                self.hits += 1
+                return entry[1]
+        return None
+
+    def _store(self, host: str, port: int, infos) -> list:
+        # One address per line of the answer, in resolver order, without duplicates
+        addresses = list(dict.fromkeys(info[4][0] for info in infos))
+        with self._lock:
+            self.misses += 1
+            if self.ttl > 0:
+                self._entries[(host, port)] = (time.monotonic() + self.ttl, addresses)
+                self._entries.move_to_end((host, port))
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return addresses
+
+    def resolve(self, host: str, port: int) -> list:
+        """Addresses for host, from the cache or a blocking lookup."""
+        addresses = self._cached(host, port)
+        if addresses is None:
+            addresses = self._store(host, port, socket.getaddrinfo(host, port, type=socket.SOCK_STREAM))
+        return addresses
+
+    async def aresolve(self, host: str, port: int) -> list:
+        """resolve() for async callers; a lookup runs in anyio's worker threads."""
+        addresses = self._cached(host, port)
+        if addresses is None:
+            addresses = self._store(host, port, await anyio.getaddrinfo(host, port, type=socket.SOCK_STREAM))
+        return addresses
+
+    def forget(self, host: str, port: int):
+        with self._lock:
+            self._entries.pop((host, port), None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {'entries': len(self._entries), 'hits': self.hits, 'misses': self.misses, 'ttl': self.ttl}
+
+
+def _is_ip(host: str) -> bool:
+    try:
+        socket.inet_pton(socket.AF_INET6 if ':' in host else socket.AF_INET, host)
+    except OSError:
+        return False
+    return True
+
+
+class _CachedDnsConnection:
+    """urllib3 connection mixin that connects to the addresses in ``dns_cache``.
+
+    Only the socket goes to the cached address; the Host header, SNI and the
+    certificate check still use the request host.
+    """
+
+    dns_cache = None
+
+    def _new_conn(self):
+        host = self._dns_host
+        if _is_ip(host):
+            return super()._new_conn()
+        try:
+            addresses = self.dns_cache.resolve(host, self.port)
+        except socket.gaierror as exc:
+            raise NameResolutionError(self.host, self, exc) from exc
+        error = None
+        for address in addresses:
+            self._dns_host = address
+            try:
+                return super()._new_conn()
+            except ConnectTimeoutError as exc:
+                error = exc
+            finally:
+                self._dns_host = host
+        self.dns_cache.forget(host, self.port)
+        raise error
+
+
+def _cached_dns_pool_classes(dns_cache: DnsCache) -> dict:
+    # urllib3 builds connections from a pool class attribute, so each cache gets its own subclasses
+    http_conn = type('CachedDnsHTTPConnection', (_CachedDnsConnection, HTTPConnection), {'dns_cache': dns_cache})
+    https_conn = type('CachedDnsHTTPSConnection', (_CachedDnsConnection, HTTPSConnection), {'dns_cache': dns_cache})
+    return {
+        'http': type('CachedDnsHTTPConnectionPool', (HTTPConnectionPool,), {'ConnectionCls': http_conn}),
+        'https': type('CachedDnsHTTPSConnectionPool', (HTTPSConnectionPool,), {'ConnectionCls': https_conn}),
+    }
+
+
+class _CachedDnsBackend(httpcore.AsyncNetworkBackend):
+    """httpcore network backend that connects to the addresses in a DnsCache."""
+
+    def __init__(self, dns_cache: DnsCache, backend: httpcore.AsyncNetworkBackend = None):
+        self.dns_cache = dns_cache
+        self._backend = backend or httpcore.AnyIOBackend()
+
+    async def connect_tcp(self, host, port, timeout=None, local_address=None, socket_options=None):
+        if _is_ip(host):
+            return await self._backend.connect_tcp(host, port, timeout, local_address, socket_options)
+        try:
+            with anyio.fail_after(timeout):
+                addresses = await self.dns_cache.aresolve(host, port)
+        except TimeoutError as exc:
+            raise httpcore.ConnectTimeout(f"Resolving {host} timed out") from exc
+        except OSError as exc:
+            raise httpcore.ConnectError(str(exc)) from exc
+        error = None
+        for address in addresses:
+            try:
+                return await self._backend.connect_tcp(address, port, timeout, local_address, socket_options)
+            except (httpcore.ConnectError, httpcore.ConnectTimeout) as exc:
+                error = exc
+        self.dns_cache.forget(host, port)
+        raise error
+
+    async def connect_unix_socket(self, path, timeout=None, socket_options=None):
+        return await self._backend.connect_unix_socket(path, timeout, socket_options)
+
+    async def sleep(self, seconds: float):
+        await self._backend.sleep(seconds)
@@ -0,0 +1,122 @@
+"""
+Logging setup for the scraper backend and its CLIs.
+
+Request paths log through the standard ``logging`` module instead of ``print``.
+``setup_logging`` installs a ``QueueHandler`` on the root logger: a log call
+only formats its message and appends the record to an in-memory queue, and a
+``QueueListener`` thread does the (blocking) write to stderr. Records below a
+logger's level are dropped before any formatting, so the per-link and
+per-parameter DEBUG lines cost a level check at INFO.
+
+Environment:
+
+* ``FITGIRL_LOG_LEVEL`` - root level (default ``INFO``)
+* ``FITGIRL_LOG_LEVELS`` - per-logger overrides, ``"fetch_fitgirl=DEBUG,crawler=WARNING"``
+  (``httpx`` and ``httpcore`` default to WARNING)
+* ``FITGIRL_LOG_FORMAT`` - ``json`` (one object per line) or ``text``; by default
+  ``text`` on a terminal and ``json`` otherwise
+
+Fields passed with ``extra={...}`` become keys of the JSON object.
+"""
+
+import atexit
+import copy
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import time
+
+FORMATS = ('json', 'text')
+TEXT_FORMAT = '%(asctime)s %(levelname)-7s %(name)s: %(message)s'
+# httpx logs every request at INFO; the fetchers already log what they fetch
+DEFAULT_LEVELS = {'httpx': 'WARNING', 'httpcore': 'WARNING'}
+# Attributes every LogRecord has; anything else on a record came from extra={...}
+_RECORD_ATTRS = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime', 'taskName'}
+
+_LISTENER = None
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record: timestamp, level, logger, message, extras and traceback."""
+
+    def format(self, record) -> str:
+        entry = {
+            'ts': time.strftime('%Y-%m-%dT%H:%M:%S', time.gmtime(record.created)) + f'.{int(record.msecs):03d}Z',
+            'level': record.levelname,
+            'logger': record.name,
+            'msg': record.getMessage(),
+        }
+        for name, value in vars(record).items():
+            if name not in _RECORD_ATTRS and not name.startswith('_'):
+                entry[name] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry['exc'] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    # The stock prepare() formats the whole record, traceback included, into msg; keep the
+    # traceback separate so the JSON formatter can put it in its own field
+    def prepare(self, record):
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def _parse_levels(spec: str) -> dict:
+    levels = {}
+    for item in spec.split(','):
+        name, sep, level = item.partition('=')
+        if sep and name.strip() and level.strip():
+            levels[name.strip()] = level.strip().upper()
+    return levels
+
+
+def setup_logging(level: str = None, levels: dict = None, log_format: str = None, stream=None):
+    """
+    Route all logging through a queue to one stderr handler (idempotent).
+
+    Arguments override the FITGIRL_LOG_* environment variables. Returns the
+    running ``QueueListener``.
+    """
+    global _LISTENER
+    if _LISTENER is not None:
+        return _LISTENER
+
+    stream = stream or sys.stderr
+    level = (level or os.environ.get('FITGIRL_LOG_LEVEL', 'INFO')).upper()
+    levels = {**DEFAULT_LEVELS, **_parse_levels(os.environ.get('FITGIRL_LOG_LEVELS', '')), **(levels or {})}
+    log_format = log_format or os.environ.get('FITGIRL_LOG_FORMAT') or ('text' if stream.isatty() else 'json')
+    if log_format not in FORMATS:
+        raise ValueError(f"Unknown log format '{log_format}', expected one of {FORMATS}")
+
+    output = logging.StreamHandler(stream)
+    output.setFormatter(JsonFormatter() if log_format == 'json' else logging.Formatter(TEXT_FORMAT))
+    records = queue.SimpleQueue()
+    _LISTENER = logging.handlers.QueueListener(records, output, respect_handler_level=True)
+    _LISTENER.start()
+    atexit.register(stop_logging)
+
+    root = logging.getLogger()
+    root.handlers[:] = [_QueueHandler(records)]
+    root.setLevel(level)
+    for name, logger_level in levels.items():
+        logging.getLogger(name).setLevel(logger_level)
+    return _LISTENER
+
+
+def stop_logging():
+    """Flush queued records and stop the writer thread."""
+    global _LISTENER
+    listener, _LISTENER = _LISTENER, None
+    if listener is not None:
+        listener.stop()
@@ -0,0 +1,254 @@
+"""
+Small Prometheus-style metrics registry for the scraper backend.
+
+Counters, gauges and histograms carry a fixed set of label names and are
+rendered in the Prometheus text exposition format by ``REGISTRY.render()``
+(served at ``GET /metrics``). ``Histogram.time`` returns a timer that works as
+a context manager and as a decorator for sync and async functions, so a scrape
+stage is instrumented with one ``with`` line.
+
+Values that already live elsewhere (cache counters, CPU pool stats) are not
+copied on every event: a collector function registered with
+``add_collector`` reads them when ``/metrics`` is scraped.
+
+Metrics are per process. With several uvicorn workers each one reports its
+own values, so scrape each worker or treat the numbers as one worker's share.
+"""
+
+import asyncio
+import functools
+import math
+import threading
+import time
+from contextlib import contextmanager
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+# Seconds; scrape stages run from sub-millisecond parses to multi-second upstream fetches
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+
+def _escape(value, quotes: bool = True) -> str:
+    # Label values escape quotes too; HELP text only backslashes and newlines
+    escaped = str(value).replace('\\', '\\\\').replace('\n', '\\n')
+    return escaped.replace('"', '\\"') if quotes else escaped
+
+
+def _format_labels(labels: dict) -> str:
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + '}'
+
+
+def _format_value(value) -> str:
+    if value == math.inf:
+        return '+Inf'
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = 'untyped'
+
+    def __init__(self, name: str, documentation: str, labels=()):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def _key(self, labels: dict) -> tuple:
+        if len(labels) != len(self.labels) or set(labels) != set(self.labels):
+            raise ValueError(f"{self.name} expects labels {self.labels}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labels)
+
+    def samples(self):
+        """(name suffix, labels, value) tuples for the exposition."""
+        with self._lock:
+            items = list(self._values.items())
+        return [('', dict(zip(self.labels, key)), value) for key, value in items]
+
+    def value(self, **labels):
+        with self._lock:
+            return self._values.get(self._key(labels), 0)
+
+
+class Counter(_Metric):
+    kind = 'counter'
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(_Metric):
+    kind = 'gauge'
+
+    def set(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+    @contextmanager
+    def track_in_progress(self, **labels):
+        self.inc(**labels)
+        try:
+            yield
+        finally:
+            self.dec(**labels)
+
+
+class _Timer:
+    """Observes elapsed seconds into a histogram; ``with`` block or function decorator."""
+
+    def __init__(self, histogram, labels: dict):
+        self._histogram = histogram
+        self._labels = labels
+        self._started = []
+
+    def __enter__(self):
+        self._started.append(time.perf_counter())
+        return self
+
+    def __exit__(self, *exc):
+        self._histogram.observe(time.perf_counter() - self._started.pop(), **self._labels)
+        return False
+
+    def __call__(self, func):
+        histogram, labels = self._histogram, self._labels
+        if asyncio.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                started = time.perf_counter()
+                try:
+                    return await func(*args, **kwargs)
+                finally:
+                    histogram.observe(time.perf_counter() - started, **labels)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                histogram.observe(time.perf_counter() - started, **labels)
+        return wrapper
+
+
+class Histogram(_Metric):
+    kind = 'histogram'
+
+    def __init__(self, name: str, documentation: str, labels=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                # Per-bucket (non-cumulative) counts, sum, count
+                state = self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[0][index] += 1
+                    break
+            state[1] += value
+            state[2] += 1
+
+    def time(self, **labels) -> _Timer:
+        self._key(labels)
+        return _Timer(self, labels)
+
+    def samples(self):
+        with self._lock:
+            items = [(key, (list(state[0]), state[1], state[2])) for key, state in self._values.items()]
+        samples = []
+        for key, (counts, total, count) in items:
+            labels = dict(zip(self.labels, key))
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                samples.append(('_bucket', {**labels, 'le': _format_value(float(bound))}, cumulative))
+            samples.append(('_bucket', {**labels, 'le': '+Inf'}, count))
+            samples.append(('_sum', labels, total))
+            samples.append(('_count', labels, count))
+        return samples
+
+    def value(self, **labels):
+        """(count, sum) observed for these labels."""
+        with self._lock:
+            state = self._values.get(self._key(labels))
+            return (state[2], state[1]) if state else (0, 0.0)
+
+
+class Registry:
+    """Named metrics plus collectors, rendered together."""
+
+    def __init__(self):
+        self._metrics = {}
+        self._collectors = []
+        self._lock = threading.Lock()
+
+    def _register(self, cls, name, documentation, labels, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, documentation, labels, **kwargs)
+            elif not isinstance(metric, cls) or metric.labels != tuple(labels):
+                raise ValueError(f"Metric {name} is already registered with a different type or labels")
+            return metric
+
+    def counter(self, name: str, documentation: str, labels=()) -> Counter:
+        return self._register(Counter, name, documentation, labels)
+
+    def gauge(self, name: str, documentation: str, labels=()) -> Gauge:
+        return self._register(Gauge, name, documentation, labels)
+
+    def histogram(self, name: str, documentation: str, labels=(), buckets=DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram, name, documentation, labels, buckets=buckets)
+
+    def add_collector(self, collector):
+        """
+        Register a function called on every render. It returns an iterable of
+        ``(name, kind, documentation, samples)`` where samples are ``(labels, value)``.
+        """
+        with self._lock:
+            self._collectors.append(collector)
+
+    def render(self) -> str:
+        lines = []
+
+        def family(name, kind, documentation, samples):
+            lines.append(f'# HELP {name} {_escape(documentation, quotes=False)}')
+            lines.append(f'# TYPE {name} {kind}')
+            for suffix, labels, value in samples:
+                lines.append(f'{name}{suffix}{_format_labels(labels)} {_format_value(value)}')
+
+        with self._lock:
+            metrics = sorted(self._metrics.values(), key=lambda metric: metric.name)
+            collectors = list(self._collectors)
+        for metric in metrics:
+            family(metric.name, metric.kind, metric.documentation, metric.samples())
+        for collector in collectors:
+            try:
+                collected = list(collector())
+            except Exception as e:
+                lines.append(f'# collector {getattr(collector, "__name__", collector)} failed: {_escape(e, quotes=False)}')
+                continue
+            for name, kind, documentation, samples in collected:
+                family(name, kind, documentation, [('', labels, value) for labels, value in samples])
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = Registry()
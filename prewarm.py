@@ -0,0 +1,145 @@
+"""
+Background refresh-ahead for the hottest scrape cache keys.
+
+The cache scores every entry by how often it is read (with exponential decay).
+On each tick the scheduler picks the top keys of every configured namespace and
+refreshes those about to expire, so a popular page's TTL expiry is paid for in
+the background instead of by the next user request.
+
+Each key's lead time is jittered by a fixed fraction derived from the key, so
+keys written together reach their refresh points at different times within
+``lead .. lead * (1 + jitter)``. Refreshes run through a concurrency limit and a global
+upstream budget (a token bucket in requests per minute). Keys that nobody reads
+any more decay below ``min_score`` and drop out on their own.
+"""
+
+import asyncio
+import logging
+import time
+import zlib
+
+log = logging.getLogger("prewarm")
+
+
+def _jitter_fraction(key: str) -> float:
+    # Stable in [0, 1) for a key, and the same in every worker process (unlike hash())
+    return zlib.crc32(key.encode('utf-8')) / 2 ** 32
+
+
+class PrewarmScheduler:
+    """Refreshes popular cache keys shortly before they expire."""
+
+    def __init__(self, cache, refreshers: dict, limits: dict, interval: float = 5, lead: float = 30,
+                 jitter: float = 0.5, concurrency: int = 4, budget_per_minute: float = 60,
+                 min_score: float = 1.5):
+        """
+        ``refreshers`` maps namespace -> coroutine function taking the cache key and
+        reloading it with ``force_refresh``; a ``None`` result counts as a failure.
+        ``limits`` maps namespace -> how many of its hottest keys to keep warm.
+        """
+        self.cache = cache
+        self.refreshers = dict(refreshers)
+        self.limits = {ns: limit for ns, limit in limits.items() if ns in self.refreshers}
+        self.interval = interval
+        self.lead = lead
+        self.jitter = jitter
+        self.concurrency = concurrency
+        self.budget_per_minute = budget_per_minute
+        self.min_score = min_score
+        self._tokens = float(budget_per_minute)
+        self._tokens_at = time.monotonic()
+        self._running = set()
+        self._tasks = set()
+        self._loop_task = None
+        self._semaphore = None
+        self._counters = {'ticks': 0, 'refreshes': 0, 'failures': 0, 'adopted': 0, 'over_budget': 0}
+        self._last_refresh = {}
+
+    def _take_token(self) -> bool:
+        now = time.monotonic()
+        capacity = float(self.budget_per_minute)
+        self._tokens = min(capacity, self._tokens + (now - self._tokens_at) * capacity / 60)
+        self._tokens_at = now
+        if self._tokens < 1:
+            return False
+        self._tokens -= 1
+        return True
+
+    def due(self, now: float = None):
+        """Hot keys whose jittered refresh point has passed, hottest first."""
+        now = time.time() if now is None else now
+        due = []
+        for key, score, expires_at in self.cache.hot_keys(self.limits, self.min_score):
+            if key in self._running:
+                continue
+            # Re-rolling every tick would let each key go at the first large roll, i.e. at the full lead
+            lead = self.lead * (1 + _jitter_fraction(key) * self.jitter)
+            if expires_at - now <= lead:
+                due.append(key)
+        return due
+
+    async def tick(self) -> int:
+        """Start refreshes for every due key the budget allows; returns how many were started."""
+        self._counters['ticks'] += 1
+        started = 0
+        for key in self.due():
+            if self.cache.adopt_shared(key):
+                # Another worker already refreshed it
+                self._counters['adopted'] += 1
+                continue
+            if not self._take_token():
+                self._counters['over_budget'] += 1
+                break
+            self._running.add(key)
+            task = asyncio.get_running_loop().create_task(self._refresh(key))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+            started += 1
+        return started
+
+    async def _refresh(self, key: str):
+        namespace = key.split(':', 1)[0]
+        try:
+            async with self._semaphore:
+                value = await self.refreshers[namespace](key)
+            self._counters['refreshes' if value is not None else 'failures'] += 1
+        except Exception as e:
+            self._counters['failures'] += 1
+            log.warning("⚠️ Pre-warm of %s failed: %s", key, e)
+        finally:
+            self._running.discard(key)
+            self._last_refresh[namespace] = time.time()
+
+    async def _run(self):
+        while True:
+            try:
+                await self.tick()
+            except Exception:
+                log.exception("⚠️ Pre-warm tick failed")
+            await asyncio.sleep(self.interval)
+
+    def start(self):
+        """Start the scheduler on the running event loop (idempotent)."""
+        if self._loop_task is not None and not self._loop_task.done():
+            return
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        self._loop_task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        tasks = [task for task in (self._loop_task, *self._tasks) if task is not None]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._loop_task = None
+        self._running.clear()
+
+    def stats(self) -> dict:
+        return {
+            'running': self._loop_task is not None and not self._loop_task.done(),
+            'in_flight': len(self._running),
+            **self._counters,
+            'budget_per_minute': self.budget_per_minute,
+            'budget_left': round(self._tokens, 2),
+            'limits': dict(self.limits),
+            'last_refresh': dict(self._last_refresh),
+        }
@@ -0,0 +1,875 @@
+"""
+Bounded in-memory cache for scraped payloads.
+
+Entries live in LRU order and are bounded both by entry count and by an
+approximate byte budget. Keys are namespaced by their prefix (``metadata:...``,
+``popular:...``); every namespace gets its own TTL and hit/miss/eviction counters,
+and optionally its own entry cap so one busy namespace cannot crowd out the rest.
+A background thread sweeps expired entries so keys that are never read again
+do not linger until they happen to be evicted.
+
+``get_or_load``/``aget_or_load`` add single-flight loading: concurrent misses on
+the same key run the loader once and every other caller (thread or asyncio
+task) waits for that result. Namespaces may also opt into:
+
+* stale-while-revalidate: for a grace window after expiry the old value is
+  served immediately while one background refresh runs;
+* stale-if-error: when a load fails (exception or ``None``), the last good
+  value is served for up to this many seconds past expiry.
+
+An optional ``SqliteCacheTier`` can sit behind the memory tier for selected
+namespaces: writes go through to disk, memory misses fall back to it, and
+``warm_from_l2`` pre-fills memory after a restart.
+
+Attached with ``shared=True`` the tier is the cache several worker processes
+have in common. Rows then carry their freshness deadline so every process
+agrees on when an entry expires, and a load (or stale refresh) first takes a
+per-key lease in the database. A process that finds the lease held waits for
+the holder's row instead of hitting upstream itself, so each key is fetched
+once across all workers.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from collections import OrderedDict
+
+log = logging.getLogger("scrape_cache")
+
+
+def namespace_of(key: str) -> str:
+    return key.split(':', 1)[0]
+
+
+def estimate_size(key: str, value) -> int:
+    # Scraped payloads are plain JSON-like dicts/lists; their compact JSON length is a good proxy
+    try:
+        payload = json.dumps(value, separators=(',', ':'), default=str)
+    except (TypeError, ValueError):
+        payload = repr(value)
+    return len(key) + len(payload.encode('utf-8'))
+
+
+_COUNTERS = (
+    'hits', 'misses', 'evictions', 'expirations', 'loads', 'coalesced',
+    'stale_hits', 'refreshes', 'stale_errors', 'l2_hits', 'peer_hits',
+)
+
+
+def _hit_rate(counters: dict) -> float:
+    # Every lookup served from cache (fresh, stale or from disk) over all lookups
+    served = counters['hits'] + counters['stale_hits'] + counters['l2_hits']
+    lookups = served + counters['misses']
+    return round(served / lookups, 4) if lookups else 0.0
+
+
+class _Entry:
+    __slots__ = ('value', 'expires_at', 'size', 'namespace', 'score', 'touched')
+
+    def __init__(self, value, expires_at: float, size: int, namespace: str):
+        self.value = value
+        self.expires_at = expires_at
+        self.size = size
+        self.namespace = namespace
+        # Exponentially decayed read count, used to pick keys worth refreshing ahead of expiry
+        self.score = 0.0
+        self.touched = 0.0
+
+    def decayed_score(self, now: float, half_life: float) -> float:
+        return self.score * 0.5 ** ((now - self.touched) / half_life)
+
+
+# Result of a flight whose leader was cancelled or interrupted rather than failed; waiters retry
+_ABANDONED = object()
+
+
+class _Flight:
+    """One in-progress load; sync callers block on ``done``, async callers get a future."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+        self._lock = threading.Lock()
+        self._async_waiters = []
+
+    def resolve(self, value=None, error: BaseException = None):
+        with self._lock:
+            self.value = value
+            self.error = error
+            self.done.set()
+            waiters, self._async_waiters = self._async_waiters, []
+        for loop, future in waiters:
+            loop.call_soon_threadsafe(self._settle, future, value, error)
+
+    @staticmethod
+    def _settle(future, value, error):
+        if future.done():
+            return
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(value)
+
+    def wait(self):
+        self.done.wait()
+        if self.error is not None:
+            raise self.error
+        return self.value
+
+    async def wait_async(self):
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        with self._lock:
+            if not self.done.is_set():
+                self._async_waiters.append((loop, future))
+            else:
+                self._settle(future, self.value, self.error)
+        # Shield so one cancelled waiter doesn't cancel the shared result for the others
+        return await asyncio.shield(future)
+
+    def abandon(self):
+        self.resolve(_ABANDONED)
+
+
+class SqliteCacheTier:
+    """Persistent second-level cache: zlib-compressed JSON rows with their own TTLs and size cap."""
+
+    PURGE_EVERY = 64
+
+    def __init__(self, path: str, namespace_ttls: dict = None, default_ttl: int = 86400,
+                 max_bytes: int = 256 * 1024 * 1024):
+        self.path = path
+        self.namespace_ttls = dict(namespace_ttls or {})
+        self.default_ttl = default_ttl
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._writes = 0
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=5, isolation_level=None)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS scrape_cache ('
+            ' key TEXT PRIMARY KEY, namespace TEXT NOT NULL, value BLOB NOT NULL,'
+            ' size INTEGER NOT NULL, expires_at REAL NOT NULL, accessed_at REAL NOT NULL, fresh_until REAL)'
+        )
+        columns = {row[1] for row in self._conn.execute('PRAGMA table_info(scrape_cache)')}
+        if 'fresh_until' not in columns:
+            # Files written before shared mode existed
+            self._conn.execute('ALTER TABLE scrape_cache ADD COLUMN fresh_until REAL')
+        self._conn.execute('CREATE INDEX IF NOT EXISTS scrape_cache_accessed ON scrape_cache (accessed_at)')
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS scrape_cache_leases ('
+            ' key TEXT PRIMARY KEY, owner TEXT NOT NULL, expires_at REAL NOT NULL)'
+        )
+
+    @staticmethod
+    def encode(value) -> bytes:
+        return zlib.compress(json.dumps(value, separators=(',', ':')).encode('utf-8'))
+
+    @staticmethod
+    def decode(blob: bytes):
+        return json.loads(zlib.decompress(blob).decode('utf-8'))
+
+    def get(self, key: str):
+        """Return ``(value, expires_at, fresh_until)`` or ``None`` when absent or expired.
+
+        ``fresh_until`` is only set on rows written by a shared cache.
+        """
+        now = time.time()
+        try:
+            with self._lock:
+                row = self._conn.execute(
+                    'SELECT value, expires_at, fresh_until FROM scrape_cache WHERE key = ?', (key,)
+                ).fetchone()
+                if row is None or row[1] <= now:
+                    return None
+                self._conn.execute('UPDATE scrape_cache SET accessed_at = ? WHERE key = ?', (now, key))
+            return self.decode(row[0]), row[1], row[2]
+        except (sqlite3.Error, ValueError, zlib.error):
+            return None
+
+    def set(self, key: str, value, fresh_for: float = None):
+        namespace = namespace_of(key)
+        try:
+            blob = self.encode(value)
+        except (TypeError, ValueError):
+            return
+        now = time.time()
+        expires_at = now + self.namespace_ttls.get(namespace, self.default_ttl)
+        fresh_until = now + fresh_for if fresh_for is not None else None
+        try:
+            with self._lock:
+                self._conn.execute(
+                    'INSERT OR REPLACE INTO scrape_cache'
+                    ' (key, namespace, value, size, expires_at, accessed_at, fresh_until)'
+                    ' VALUES (?, ?, ?, ?, ?, ?, ?)',
+                    (key, namespace, blob, len(blob), expires_at, now, fresh_until),
+                )
+                self._writes += 1
+                purge = self._writes % self.PURGE_EVERY == 0
+        except sqlite3.Error:
+            return
+        if purge:
+            self.purge()
+
+    def delete(self, key: str):
+        try:
+            with self._lock:
+                self._conn.execute('DELETE FROM scrape_cache WHERE key = ?', (key,))
+        except sqlite3.Error:
+            pass
+
+    def acquire_lease(self, key: str, owner: str, ttl: float) -> bool:
+        """Take the load lease for ``key`` unless another owner holds an unexpired one."""
+        now = time.time()
+        try:
+            with self._lock:
+                # One statement, so the check and the claim are atomic across processes
+                claimed = self._conn.execute(
+                    'INSERT INTO scrape_cache_leases (key, owner, expires_at) VALUES (?, ?, ?)'
+                    ' ON CONFLICT (key) DO UPDATE SET owner = excluded.owner, expires_at = excluded.expires_at'
+                    ' WHERE scrape_cache_leases.expires_at <= ? OR scrape_cache_leases.owner = excluded.owner',
+                    (key, owner, now + ttl, now),
+                ).rowcount
+            return claimed > 0
+        except sqlite3.Error:
+            # A busy or broken database must not stop this process from loading
+            return True
+
+    def release_lease(self, key: str, owner: str):
+        try:
+            with self._lock:
+                self._conn.execute('DELETE FROM scrape_cache_leases WHERE key = ? AND owner = ?', (key, owner))
+        except sqlite3.Error:
+            pass
+
+    def recent(self, namespaces, limit: int):
+        """Most recently used live rows in ``namespaces`` as ``(key, value, expires_at, fresh_until)``."""
+        namespaces = list(namespaces)
+        if not namespaces:
+            return []
+        placeholders = ','.join('?' * len(namespaces))
+        try:
+            with self._lock:
+                rows = self._conn.execute(
+                    f'SELECT key, value, expires_at, fresh_until FROM scrape_cache WHERE namespace IN ({placeholders})'
+                    ' AND expires_at > ? ORDER BY accessed_at DESC LIMIT ?',
+                    (*namespaces, time.time(), limit),
+                ).fetchall()
+        except sqlite3.Error:
+            return []
+        loaded = []
+        for key, blob, expires_at, fresh_until in rows:
+            try:
+                loaded.append((key, self.decode(blob), expires_at, fresh_until))
+            except (ValueError, zlib.error):
+                continue
+        return loaded
+
+    def purge(self) -> int:
+        """Delete expired rows, then least recently used rows until under ``max_bytes``."""
+        try:
+            with self._lock:
+                now = time.time()
+                removed = self._conn.execute('DELETE FROM scrape_cache WHERE expires_at <= ?', (now,)).rowcount
+                self._conn.execute('DELETE FROM scrape_cache_leases WHERE expires_at <= ?', (now,))
+                total = self._conn.execute('SELECT COALESCE(SUM(size), 0) FROM scrape_cache').fetchone()[0]
+                if total > self.max_bytes:
+                    excess = total - self.max_bytes
+                    victims = []
+                    for key, size in self._conn.execute(
+                        'SELECT key, size FROM scrape_cache ORDER BY accessed_at ASC'
+                    ):
+                        victims.append((key,))
+                        excess -= size
+                        if excess <= 0:
+                            break
+                    self._conn.executemany('DELETE FROM scrape_cache WHERE key = ?', victims)
+                    removed += len(victims)
+            return removed
+        except sqlite3.Error:
+            return 0
+
+    def stats(self) -> dict:
+        try:
+            with self._lock:
+                entries, size = self._conn.execute(
+                    'SELECT COUNT(*), COALESCE(SUM(size), 0) FROM scrape_cache'
+                ).fetchone()
+                leases = self._conn.execute(
+                    'SELECT COUNT(*) FROM scrape_cache_leases WHERE expires_at > ?', (time.time(),)
+                ).fetchone()[0]
+        except sqlite3.Error:
+            entries, size, leases = None, None, None
+        return {'path': self.path, 'entries': entries, 'bytes': size, 'max_bytes': self.max_bytes, 'leases': leases}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class ScrapeCache:
+    """Thread-safe LRU + TTL cache with entry-count and byte-budget limits."""
+
+    # Names of the per-namespace counters reported by stats()
+    COUNTERS = _COUNTERS
+
+    def __init__(self, max_entries: int = 2048, max_bytes: int = 64 * 1024 * 1024,
+                 namespace_ttls: dict = None, default_ttl: int = 300, sweep_interval: float = 60,
+                 stale_while_revalidate: dict = None, stale_if_error: dict = None,
+                 namespace_max_entries: dict = None, popularity_half_life: float = 600):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.namespace_ttls = dict(namespace_ttls or {})
+        self.namespace_max_entries = dict(namespace_max_entries or {})
+        self.stale_while_revalidate = dict(stale_while_revalidate or {})
+        self.stale_if_error = dict(stale_if_error or {})
+        self.default_ttl = default_ttl
+        self.sweep_interval = sweep_interval
+        self.popularity_half_life = popularity_half_life
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._namespace_counts = {}
+        self._lock = threading.RLock()
+        self._counters = {}
+        self._flights = {}
+        self._background_tasks = set()
+        self._l2 = None
+        self._l2_decoders = {}
+        self._l2_shared = False
+        self._lease_ttl = 30.0
+        self._lease_poll = 0.05
+        self._owner = None
+        self._sweeper = None
+        self._stop_sweeper = threading.Event()
+
+    def ttl_for(self, key: str) -> int:
+        return self.namespace_ttls.get(namespace_of(key), self.default_ttl)
+
+    def attach_l2(self, tier: SqliteCacheTier, decoders: dict, shared: bool = False,
+                  lease_ttl: float = 30.0, lease_poll: float = 0.05):
+        """Persist the namespaces in ``decoders`` to ``tier``.
+
+        ``decoders`` maps namespace -> callable that rebuilds a value read back
+        from disk (or ``None`` to use the decoded JSON as is).
+
+        With ``shared`` other processes use the same tier: entries keep the
+        freshness they were stored with, and loads are coalesced across
+        processes through ``lease_ttl``-second leases polled every ``lease_poll``.
+        """
+        self._l2 = tier
+        self._l2_decoders = dict(decoders)
+        self._l2_shared = shared
+        self._lease_ttl = lease_ttl
+        self._lease_poll = lease_poll
+        self._owner = f'{os.getpid()}:{id(self)}'
+
+    def detach_l2(self):
+        if self._l2 is not None:
+            self._l2.close()
+        self._l2 = None
+        self._l2_decoders = {}
+        self._l2_shared = False
+
+    def _l2_enabled(self, namespace: str) -> bool:
+        return self._l2 is not None and namespace in self._l2_decoders
+
+    def _shared(self, key: str) -> bool:
+        return self._l2_shared and self._l2_enabled(namespace_of(key))
+
+    def _decode_l2(self, key: str, value):
+        """Rebuild a persisted value; a row that cannot be rebuilt is deleted and reads as ``None``."""
+        decoder = self._l2_decoders.get(namespace_of(key))
+        if decoder is None:
+            return value
+        try:
+            return decoder(value)
+        except Exception:
+            # Corrupt rows and rows in an older format must not break warm-up or lookups
+            log.warning("Dropping persisted cache row %s that could not be decoded", key, exc_info=True)
+            self._l2.delete(key)
+            return None
+
+    def _from_l2(self, key: str, value, expires_at: float, fresh_until: float = None):
+        """Store a persisted row in memory; returns ``(value, seconds it stays fresh)``, <= 0 when stale.
+
+        Returns ``(None, 0)`` for a row that could not be decoded.
+        """
+        value = self._decode_l2(key, value)
+        if value is None:
+            return None, 0
+        # Fresh for at most one memory TTL; rows past their own disk TTL never get here.
+        # Shared rows also stop being fresh when the process that wrote them said so.
+        deadline = expires_at if fresh_until is None else min(expires_at, fresh_until)
+        ttl = min(deadline - time.time(), self.ttl_for(key))
+        self.set(key, value, ttl, persist=False)
+        return value, ttl
+
+    def warm_from_l2(self, limit: int = None) -> int:
+        """Pre-fill memory with the most recently used persisted entries; returns how many."""
+        if self._l2 is None:
+            return 0
+        rows = self._l2.recent(self._l2_decoders, limit or self.max_entries)
+        # Oldest first so the most recently used rows end up at the MRU end
+        warmed = 0
+        for key, *row in reversed(rows):
+            if self._from_l2(key, *row)[0] is not None:
+                warmed += 1
+        return warmed
+
+    def _retain_for(self, namespace: str) -> float:
+        # Expired entries are kept around as long as either stale policy can still serve them
+        return max(self.stale_while_revalidate.get(namespace, 0), self.stale_if_error.get(namespace, 0))
+
+    def _count(self, namespace: str, counter: str, amount: int = 1):
+        stats = self._counters.setdefault(namespace, dict.fromkeys(_COUNTERS, 0))
+        stats[counter] += amount
+
+    def _remove(self, key: str):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry.size
+            self._namespace_counts[entry.namespace] -= 1
+        return entry
+
+    def _touch(self, entry: _Entry, now: float):
+        entry.score = entry.decayed_score(now, self.popularity_half_life) + 1
+        entry.touched = now
+
+    def _lookup(self, key: str, allow_stale: bool):
+        """Return ``(value, state)`` where state is 'fresh', 'stale' or 'miss'."""
+        namespace = namespace_of(key)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                now = time.time()
+                if entry.expires_at > now:
+                    self._entries.move_to_end(key)
+                    self._touch(entry, now)
+                    self._count(namespace, 'hits')
+                    return entry.value, 'fresh'
+                if allow_stale and now < entry.expires_at + self.stale_while_revalidate.get(namespace, 0):
+                    self._entries.move_to_end(key)
+                    self._touch(entry, now)
+                    self._count(namespace, 'stale_hits')
+                    return entry.value, 'stale'
+                if now >= entry.expires_at + self._retain_for(namespace):
+                    self._remove(key)
+                    self._count(namespace, 'expirations')
+                self._count(namespace, 'misses')
+                return None, 'miss'
+            if not self._l2_enabled(namespace):
+                self._count(namespace, 'misses')
+                return None, 'miss'
+        # Absent from memory (never loaded here, or LRU-evicted): try the persistent tier
+        row = self._l2.get(key)
+        if row is None:
+            with self._lock:
+                self._count(namespace, 'misses')
+            return None, 'miss'
+        value, ttl = self._from_l2(key, *row)
+        with self._lock:
+            if value is None:
+                self._count(namespace, 'misses')
+                return None, 'miss'
+            if ttl > 0:
+                self._count(namespace, 'l2_hits')
+                return value, 'fresh'
+            # A shared row past its freshness, same rules as an expired memory entry
+            if allow_stale and -ttl < self.stale_while_revalidate.get(namespace, 0):
+                self._count(namespace, 'stale_hits')
+                return value, 'stale'
+            self._count(namespace, 'misses')
+            return None, 'miss'
+
+    def _stale_on_error(self, key: str):
+        namespace = namespace_of(key)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or time.time() >= entry.expires_at + self.stale_if_error.get(namespace, 0):
+                return None
+            self._count(namespace, 'stale_errors')
+            return entry.value
+
+    def get(self, key: str):
+        """Return the fresh value for ``key`` or ``None``; never serves stale entries."""
+        return self._lookup(key, allow_stale=False)[0]
+
+    def set(self, key: str, value, ttl: int = None, size: int = None, persist: bool = True):
+        if ttl is None:
+            ttl = self.ttl_for(key)
+        if persist and self._l2_enabled(namespace_of(key)):
+            self._l2.set(key, value, ttl if self._l2_shared else None)
+        if size is None:
+            size = estimate_size(key, value)
+        with self._lock:
+            previous = self._remove(key)
+            if size > self.max_bytes:
+                # A single oversized payload would flush the whole cache; don't store it
+                self._count(namespace_of(key), 'evictions')
+                return
+            namespace = namespace_of(key)
+            entry = self._entries[key] = _Entry(value, time.time() + ttl, size, namespace)
+            if previous is not None:
+                # A reload keeps the key's popularity
+                entry.score, entry.touched = previous.score, previous.touched
+            self._bytes += size
+            self._namespace_counts[namespace] = self._namespace_counts.get(namespace, 0) + 1
+            self._evict_namespace(namespace)
+            self._evict()
+
+    def _evict(self):
+        while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+            _, entry = self._entries.popitem(last=False)
+            self._bytes -= entry.size
+            self._namespace_counts[entry.namespace] -= 1
+            self._count(entry.namespace, 'evictions')
+
+    def _evict_namespace(self, namespace: str):
+        # Least recently used entries of this namespace go first, other namespaces are untouched
+        limit = self.namespace_max_entries.get(namespace)
+        if limit is None:
+            return
+        while self._namespace_counts.get(namespace, 0) > limit:
+            oldest = next(key for key, entry in self._entries.items() if entry.namespace == namespace)
+            self._remove(oldest)
+            self._count(namespace, 'evictions')
+
+    def _join_flight(self, key: str, force_refresh: bool):
+        """Return ``(flight, is_leader)``; the first caller for a key becomes the leader."""
+        with self._lock:
+            flight = self._flights.get(key)
+            if flight is not None:
+                self._count(namespace_of(key), 'coalesced')
+                return flight, False
+            entry = self._entries.get(key)
+            if not force_refresh and entry is not None and entry.expires_at > time.time():
+                # A flight finished between our miss and taking the lock
+                flight = _Flight()
+                flight.resolve(entry.value)
+                return flight, False
+            flight = self._flights[key] = _Flight()
+            self._count(namespace_of(key), 'loads')
+            return flight, True
+
+    def _claim_refresh(self, key: str):
+        """Start a background refresh flight unless one is already running for ``key``."""
+        with self._lock:
+            if key in self._flights:
+                return None
+            flight = self._flights[key] = _Flight()
+            self._count(namespace_of(key), 'refreshes')
+            return flight
+
+    def _shared_baseline(self, key: str, force_refresh: bool) -> float:
+        # Only rows fresh past this point count as a peer's result; a forced
+        # refresh must not settle for the row that was already there
+        baseline = time.time()
+        if force_refresh:
+            row = self._l2.get(key)
+            if row is not None and row[2] is not None:
+                baseline = max(baseline, row[2])
+        return baseline
+
+    def _peer_or_lease(self, key: str, baseline: float):
+        """One round of cross-process coalescing: ``(value, ttl, leased)``."""
+        row = self._l2.get(key)
+        value = None
+        if row is not None and row[2] is not None and row[2] > baseline:
+            value = self._decode_l2(key, row[0])
+        if value is not None:
+            with self._lock:
+                self._count(namespace_of(key), 'peer_hits')
+            return value, row[2] - time.time(), False
+        return None, None, self._l2.acquire_lease(key, self._owner, self._lease_ttl)
+
+    def _wait_for_peer(self, key: str, force_refresh: bool):
+        """Return ``(value, ttl, leased)``: a peer's fresh value, or whether we now hold the lease.
+
+        Gives up after one lease TTL (the holder probably died) and lets the caller load anyway.
+        """
+        baseline = self._shared_baseline(key, force_refresh)
+        deadline = time.monotonic() + self._lease_ttl
+        while True:
+            value, ttl, leased = self._peer_or_lease(key, baseline)
+            if value is not None or leased or time.monotonic() >= deadline:
+                return value, ttl, leased
+            time.sleep(self._lease_poll)
+
+    async def _wait_for_peer_async(self, key: str, force_refresh: bool):
+        baseline = self._shared_baseline(key, force_refresh)
+        deadline = time.monotonic() + self._lease_ttl
+        while True:
+            value, ttl, leased = self._peer_or_lease(key, baseline)
+            if value is not None or leased or time.monotonic() >= deadline:
+                return value, ttl, leased
+            await asyncio.sleep(self._lease_poll)
+
+    def _load(self, key: str, flight: _Flight, loader, ttl, force_refresh: bool = False):
+        """Run ``loader`` as the leader of ``flight`` (coalescing with other processes when shared)."""
+        error, leased, peer_ttl = None, False, None
+        try:
+            value = None
+            if self._shared(key):
+                value, peer_ttl, leased = self._wait_for_peer(key, force_refresh)
+            if value is None:
+                value = loader()
+        except BaseException as e:
+            value, error = None, e
+        try:
+            if peer_ttl is not None:
+                return self._complete(key, flight, value, error, peer_ttl, persist=False)
+            return self._complete(key, flight, value, error, ttl)
+        finally:
+            if leased:
+                self._l2.release_lease(key, self._owner)
+
+    async def _load_async(self, key: str, flight: _Flight, loader, ttl, force_refresh: bool = False):
+        error, leased, peer_ttl = None, False, None
+        try:
+            value = None
+            if self._shared(key):
+                value, peer_ttl, leased = await self._wait_for_peer_async(key, force_refresh)
+            if value is None:
+                value = await loader()
+        except BaseException as e:
+            value, error = None, e
+        try:
+            if peer_ttl is not None:
+                return self._complete(key, flight, value, error, peer_ttl, persist=False)
+            return self._complete(key, flight, value, error, ttl)
+        finally:
+            if leased:
+                self._l2.release_lease(key, self._owner)
+
+    def _complete(self, key: str, flight: _Flight, value, error, ttl, persist: bool = True):
+        """Store a load result, fall back to a stale value on failure, and wake the waiters."""
+        if error is not None and not isinstance(error, Exception):
+            # Cancellation or an interrupt only concerns the leader; the waiters were not
+            # cancelled, so they start the load again instead of receiving the error
+            with self._lock:
+                if self._flights.get(key) is flight:
+                    del self._flights[key]
+            flight.abandon()
+            raise error
+        if error is None and value is not None:
+            self.set(key, value, ttl, persist=persist)
+        elif error is None or isinstance(error, Exception):
+            stale = self._stale_on_error(key)
+            if stale is not None:
+                value, error = stale, None
+        with self._lock:
+            if self._flights.get(key) is flight:
+                del self._flights[key]
+        flight.resolve(value, error)
+        if error is not None:
+            raise error
+        return value
+
+    def _refresh(self, key: str, flight: _Flight, loader, ttl):
+        try:
+            self._load(key, flight, loader, ttl)
+        except Exception:
+            # Readers keep getting the stale value until the grace window runs out
+            pass
+
+    async def _refresh_async(self, key: str, flight: _Flight, loader, ttl):
+        try:
+            await self._load_async(key, flight, loader, ttl)
+        except Exception:
+            pass
+
+    def get_or_load(self, key: str, loader, ttl: int = None, force_refresh: bool = False):
+        """Return the cached value or run ``loader()`` once for all concurrent callers.
+
+        A ``None`` result is handed to the waiters but not cached; exceptions
+        raised by the loader propagate to every coalesced caller unless a
+        stale-if-error value is available.
+        """
+        if not force_refresh:
+            value, state = self._lookup(key, allow_stale=True)
+            if state == 'fresh':
+                return value
+            if state == 'stale':
+                flight = self._claim_refresh(key)
+                if flight is not None:
+                    threading.Thread(
+                        target=self._refresh, args=(key, flight, loader, ttl),
+                        name=f'scrape-cache-refresh:{key}', daemon=True,
+                    ).start()
+                return value
+        while True:
+            flight, leader = self._join_flight(key, force_refresh)
+            if leader:
+                return self._load(key, flight, loader, ttl, force_refresh)
+            value = flight.wait()
+            if value is not _ABANDONED:
+                return value
+
+    async def aget_or_load(self, key: str, loader, ttl: int = None, force_refresh: bool = False):
+        """Async counterpart of ``get_or_load``; ``loader`` is a coroutine function.
+
+        Cancelling a caller never cancels the shared load or the other waiters.
+        """
+        if not force_refresh:
+            value, state = self._lookup(key, allow_stale=True)
+            if state == 'fresh':
+                return value
+            if state == 'stale':
+                flight = self._claim_refresh(key)
+                if flight is not None:
+                    self._detach(self._refresh_async(key, flight, loader, ttl))
+                return value
+        while True:
+            flight, leader = self._join_flight(key, force_refresh)
+            if leader:
+                # The load runs in its own task, so cancelling this caller (a client that
+                # disconnected, a stopped prewarm job) leaves it running for the waiters
+                return await asyncio.shield(self._detach(self._load_async(key, flight, loader, ttl, force_refresh)))
+            value = await flight.wait_async()
+            if value is not _ABANDONED:
+                return value
+
+    def _detach(self, coro) -> asyncio.Task:
+        task = asyncio.get_running_loop().create_task(coro)
+        self._background_tasks.add(task)
+        task.add_done_callback(self._forget_task)
+        return task
+
+    def _forget_task(self, task: asyncio.Task):
+        self._background_tasks.discard(task)
+        if not task.cancelled():
+            # Retrieve the error so a load whose caller went away doesn't log "never retrieved"
+            task.exception()
+
+    def hot_keys(self, limits: dict, min_score: float = 0.0):
+        """Most read entries as ``(key, score, expires_at)``, hottest first.
+
+        ``limits`` maps namespace -> how many of its keys to return; entries
+        whose decayed score is below ``min_score`` are left out.
+        """
+        now = time.time()
+        per_namespace = {namespace: [] for namespace in limits}
+        with self._lock:
+            for key, entry in self._entries.items():
+                candidates = per_namespace.get(entry.namespace)
+                if candidates is None:
+                    continue
+                score = entry.decayed_score(now, self.popularity_half_life)
+                if score >= min_score:
+                    candidates.append((key, score, entry.expires_at))
+        hot = []
+        for namespace, candidates in per_namespace.items():
+            candidates.sort(key=lambda item: item[1], reverse=True)
+            hot.extend(candidates[:limits[namespace]])
+        hot.sort(key=lambda item: item[1], reverse=True)
+        return hot
+
+    def adopt_shared(self, key: str) -> bool:
+        """Take a fresher copy of ``key`` that another process wrote to the shared tier.
+
+        Lets a pre-warming worker skip upstream when a peer already refreshed the key.
+        """
+        if not self._shared(key):
+            return False
+        with self._lock:
+            entry = self._entries.get(key)
+            current = entry.expires_at if entry is not None else 0.0
+        row = self._l2.get(key)
+        if row is None or row[2] is None or row[2] <= current:
+            return False
+        value = self._decode_l2(key, row[0])
+        if value is None:
+            return False
+        with self._lock:
+            self._count(namespace_of(key), 'peer_hits')
+        self.set(key, value, row[2] - time.time(), persist=False)
+        return True
+
+    def invalidate(self, key: str):
+        with self._lock:
+            self._remove(key)
+        if self._l2_enabled(namespace_of(key)):
+            self._l2.delete(key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            self._namespace_counts.clear()
+
+    def sweep(self) -> int:
+        """Drop every entry past its expiry and stale windows; returns how many were removed."""
+        now = time.time()
+        with self._lock:
+            expired = [
+                key for key, entry in self._entries.items()
+                if entry.expires_at + self._retain_for(entry.namespace) <= now
+            ]
+            for key in expired:
+                entry = self._remove(key)
+                self._count(entry.namespace, 'expirations')
+        return len(expired)
+
+    def _sweep_loop(self):
+        while not self._stop_sweeper.wait(self.sweep_interval):
+            self.sweep()
+            if self._l2 is not None:
+                self._l2.purge()
+
+    def start_sweeper(self):
+        if self._sweeper is not None and self._sweeper.is_alive():
+            return
+        self._stop_sweeper.clear()
+        self._sweeper = threading.Thread(target=self._sweep_loop, name='scrape-cache-sweeper', daemon=True)
+        self._sweeper.start()
+
+    def stop_sweeper(self):
+        self._stop_sweeper.set()
+        if self._sweeper is not None:
+            self._sweeper.join(timeout=1)
+            self._sweeper = None
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key: str):
+        return key in self._entries
+
+    def stats(self) -> dict:
+        with self._lock:
+            namespaces = {}
+            for entry in self._entries.values():
+                ns = namespaces.setdefault(entry.namespace, {'entries': 0, 'bytes': 0})
+                ns['entries'] += 1
+                ns['bytes'] += entry.size
+            totals = dict.fromkeys(_COUNTERS, 0)
+            for namespace in set(namespaces) | set(self._counters):
+                ns = namespaces.setdefault(namespace, {'entries': 0, 'bytes': 0})
+                counters = self._counters.get(namespace, {})
+                for name in totals:
+                    ns[name] = counters.get(name, 0)
+                    totals[name] += ns[name]
+                ns['hit_rate'] = _hit_rate(ns)
+                ns['ttl'] = self.ttl_for(namespace + ':')
+                ns['max_entries'] = self.namespace_max_entries.get(namespace)
+                ns['stale_while_revalidate'] = self.stale_while_revalidate.get(namespace, 0)
+                ns['stale_if_error'] = self.stale_if_error.get(namespace, 0)
+            return {
+                'entries': len(self._entries),
+                'in_flight': len(self._flights),
+                'bytes': self._bytes,
+                'max_entries': self.max_entries,
+                'max_bytes': self.max_bytes,
+                **totals,
+                'hit_rate': _hit_rate(totals),
+                'namespaces': namespaces,
+                'l2': self._l2.stats() if self._l2 is not None else None,
+                'shared': self._l2_shared,
+            }
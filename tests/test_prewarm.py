@@ -0,0 +1,61 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from prewarm import PrewarmScheduler  # noqa: E402
+
+
+class _HotKeys:
+    """Stand-in cache: every key is hot and expires at the same moment."""
+
+    def __init__(self, keys, expires_at):
+        self.keys = keys
+        self.expires_at = expires_at
+
+    def hot_keys(self, limits, min_score=0.0):
+        return [(key, 10.0, self.expires_at) for key in self.keys]
+
+
+def _refresh_points(scheduler, expires_at, step=0.25):
+    # Walk the clock towards expiry one tick at a time; a key's refresh point is the first tick it is due
+    points = {}
+    now = expires_at - scheduler.lead * (1 + scheduler.jitter) - step
+    while now <= expires_at:
+        for key in scheduler.due(now):
+            points.setdefault(key, now)
+        now += step
+    return points
+
+
+def _scheduler(keys, expires_at, lead=30.0, jitter=0.5):
+    return PrewarmScheduler(_HotKeys(keys, expires_at), refreshers={'metadata': None},
+                            limits={'metadata': len(keys)}, lead=lead, jitter=jitter)
+
+
+def test_keys_with_equal_expiry_refresh_across_the_jitter_window():
+    keys = [f"metadata:https://fitgirl-repacks.site/game-{i}/" for i in range(200)]
+    expires_at = 10_000.0
+    scheduler = _scheduler(keys, expires_at)
+    points = _refresh_points(scheduler, expires_at)
+
+    assert set(points) == set(keys)
+    leads = sorted(expires_at - point for point in points.values())
+    window = scheduler.lead * scheduler.jitter
+    # Every key stays inside lead .. lead * (1 + jitter), spread over the whole window
+    assert leads[0] >= scheduler.lead - 0.25
+    assert leads[-1] <= scheduler.lead + window + 0.25
+    assert leads[-1] - leads[0] > 0.8 * window
+    # No tenth of the window holds more than a quarter of the keys
+    buckets = [0] * 10
+    for lead in leads:
+        buckets[min(9, int((lead - scheduler.lead) / window * 10))] += 1
+    assert max(buckets) < len(keys) / 4
+
+
+def test_refresh_point_is_stable_across_ticks_and_schedulers():
+    keys = [f"metadata:https://fitgirl-repacks.site/game-{i}/" for i in range(50)]
+    expires_at = 10_000.0
+    first = _refresh_points(_scheduler(keys, expires_at), expires_at)
+    second = _refresh_points(_scheduler(keys, expires_at), expires_at)
+    assert first == second
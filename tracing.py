@@ -0,0 +1,273 @@
+"""
+Request-scoped tracing: nested spans, a Server-Timing header and a file exporter.
+
+``TracingMiddleware`` starts a trace for every HTTP request. Code on the
+request path opens spans with ``with span('fetch.homepage'):``; the current
+trace and parent span live in context variables, so spans opened in
+``asyncio.gather`` children and in thread-pool workers (which copy the
+context) nest under the right parent. Outside a request ``span`` is a no-op,
+so the CLI and background jobs pay nothing.
+
+When the response starts, the middleware adds a ``Server-Timing`` header with
+the *self* time of every span name (its duration minus the time covered by its
+children, overlapping children counted once), so the entries add up to the
+request instead of double counting nested stages:
+
+    Server-Timing: cache.home;dur=0.4, fetch.homepage;dur=212.0, parse.homepage;dur=31.5, ...
+
+With ``FITGIRL_TRACE_FILE`` set, finished traces are also appended to that file
+as OTLP/JSON (one ``ExportTraceServiceRequest`` object per line, the format of
+the OpenTelemetry Collector's file exporter), written by a background thread.
+``FITGIRL_TRACE_SAMPLE`` (0-1, default 1) sets the share of requests exported.
+"""
+
+import contextvars
+import json
+import os
+import queue
+import random
+import threading
+import time
+from contextlib import contextmanager
+
+# OTLP span kinds
+INTERNAL, SERVER, CLIENT = 1, 2, 3
+# Server-Timing entries beyond this many (smallest self time first) are dropped
+SERVER_TIMING_MAX_ENTRIES = 24
+
+_TRACE = contextvars.ContextVar('trace', default=None)
+_SPAN = contextvars.ContextVar('span', default=None)
+
+
+def _new_id(nbytes: int) -> str:
+    return random.getrandbits(nbytes * 8).to_bytes(nbytes, 'big').hex()
+
+
+class Span:
+    __slots__ = ('name', 'kind', 'span_id', 'parent_id', 'attributes', 'error', 'start', 'end', 'start_ns')
+
+    def __init__(self, name: str, parent_id: str = None, kind: int = INTERNAL, attributes: dict = None):
+        self.name = name
+        self.kind = kind
+        self.span_id = _new_id(8)
+        self.parent_id = parent_id
+        self.attributes = attributes or {}
+        self.error = None
+        self.start_ns = time.time_ns()
+        self.start = time.perf_counter()
+        self.end = None
+
+    @property
+    def duration(self) -> float:
+        return ((self.end if self.end is not None else time.perf_counter()) - self.start)
+
+
+class Trace:
+    """All spans of one request; spans are appended as they finish."""
+
+    def __init__(self, name: str, **attributes):
+        self.trace_id = _new_id(16)
+        self.root = Span(name, kind=SERVER, attributes=attributes)
+        self.spans = []
+
+    def finish(self):
+        if self.root.end is None:
+            self.root.end = time.perf_counter()
+
+    def self_times(self) -> dict:
+        """Seconds of self time per span name, in order of first appearance (the root counts as 'request')."""
+        spans = [self.root, *self.spans]
+        children = {}
+        for item in spans[1:]:
+            children.setdefault(item.parent_id, []).append(item)
+        now = time.perf_counter()
+        totals = {}
+        for item in sorted(spans, key=lambda item: item.start):
+            end = item.end if item.end is not None else now
+            covered, reach = 0.0, item.start
+            # Union of the children's intervals, clipped to this span
+            for child in sorted(children.get(item.span_id, ()), key=lambda child: child.start):
+                child_start = max(child.start, reach)
+                child_end = min(child.end if child.end is not None else now, end)
+                if child_end > child_start:
+                    covered += child_end - child_start
+                    reach = child_end
+            # Server-Timing names are tokens, so the root ("GET /api/home") goes under a fixed name
+            name = 'request' if item is self.root else item.name
+            totals[name] = totals.get(name, 0.0) + max(0.0, end - item.start - covered)
+        return totals
+
+    def server_timing(self) -> str:
+        entries = list(self.self_times().items())
+        if len(entries) > SERVER_TIMING_MAX_ENTRIES:
+            keep = {name for name, _ in sorted(entries, key=lambda item: -item[1])[:SERVER_TIMING_MAX_ENTRIES]}
+            entries = [(name, seconds) for name, seconds in entries if name in keep]
+        parts = [f'{name};dur={seconds * 1000:.1f}' for name, seconds in entries]
+        parts.append(f'total;dur={self.root.duration * 1000:.1f}')
+        return ', '.join(parts)
+
+
+@contextmanager
+def span(name: str, kind: int = INTERNAL, **attributes):
+    """Time a block as a child of the current span; does nothing outside a trace."""
+    trace = _TRACE.get()
+    if trace is None:
+        yield None
+        return
+    parent = _SPAN.get() or trace.root
+    item = Span(name, parent.span_id, kind, attributes)
+    token = _SPAN.set(item)
+    try:
+        yield item
+    except BaseException as e:
+        item.error = f'{type(e).__name__}: {e}'
+        raise
+    finally:
+        item.end = time.perf_counter()
+        _SPAN.reset(token)
+        # list.append is atomic, so spans finishing on CPU pool threads are safe to add
+        trace.spans.append(item)
+
+
+def current_trace():
+    return _TRACE.get()
+
+
+def _attribute(key, value) -> dict:
+    if isinstance(value, bool):
+        return {'key': key, 'value': {'boolValue': value}}
+    if isinstance(value, int):
+        return {'key': key, 'value': {'intValue': str(value)}}
+    if isinstance(value, float):
+        return {'key': key, 'value': {'doubleValue': value}}
+    return {'key': key, 'value': {'stringValue': str(value)}}
+
+
+def _otlp_span(trace_id: str, item: Span) -> dict:
+    end = item.end if item.end is not None else time.perf_counter()
+    encoded = {
+        'traceId': trace_id,
+        'spanId': item.span_id,
+        'name': item.name,
+        'kind': item.kind,
+        'startTimeUnixNano': str(item.start_ns),
+        'endTimeUnixNano': str(item.start_ns + int((end - item.start) * 1e9)),
+        'attributes': [_attribute(key, value) for key, value in item.attributes.items()],
+        'status': {'code': 2, 'message': item.error} if item.error else {},
+    }
+    if item.parent_id:
+        encoded['parentSpanId'] = item.parent_id
+    return encoded
+
+
+class JsonlSpanExporter:
+    """Appends finished traces to a file as OTLP/JSON lines from a writer thread."""
+
+    def __init__(self, path: str, service_name: str = 'fitgirl-backend', sample_rate: float = 1.0):
+        self.path = path
+        self.service_name = service_name
+        self.sample_rate = sample_rate
+        self._queue = queue.SimpleQueue()
+        self._thread = None
+        self._lock = threading.Lock()
+        self.exported = 0
+        self.dropped = 0
+
+    def _ensure_thread(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='trace-exporter', daemon=True)
+                self._thread.start()
+
+    def export(self, trace: Trace):
+        if self.sample_rate < 1 and random.random() >= self.sample_rate:
+            self.dropped += 1
+            return
+        self._ensure_thread()
+        self._queue.put(trace)
+
+    def _encode(self, trace: Trace) -> str:
+        return json.dumps({'resourceSpans': [{
+            'resource': {'attributes': [_attribute('service.name', self.service_name)]},
+            'scopeSpans': [{
+                'scope': {'name': 'tracing'},
+                'spans': [_otlp_span(trace.trace_id, item) for item in (trace.root, *trace.spans)],
+            }],
+        }]}, ensure_ascii=False)
+
+    def _run(self):
+        while True:
+            trace = self._queue.get()
+            if trace is None:
+                return
+            batch = [trace]
+            # Drain whatever else is waiting so a burst costs one open and write
+            while True:
+                try:
+                    trace = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if trace is None:
+                    self._write(batch)
+                    return
+                batch.append(trace)
+            self._write(batch)
+
+    def _write(self, batch):
+        try:
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(''.join(self._encode(trace) + '\n' for trace in batch))
+            self.exported += len(batch)
+        except OSError:
+            self.dropped += len(batch)
+
+    def close(self):
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._queue.put(None)
+            thread.join(timeout=5)
+
+
+def exporter_from_env():
+    path = os.environ.get('FITGIRL_TRACE_FILE')
+    if not path:
+        return None
+    return JsonlSpanExporter(path, sample_rate=float(os.environ.get('FITGIRL_TRACE_SAMPLE', '1')))
+
+
+class TracingMiddleware:
+    """ASGI middleware: one trace per HTTP request, Server-Timing header, optional export."""
+
+    def __init__(self, app, exporter=None):
+        self.app = app
+        self.exporter = exporter
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            return await self.app(scope, receive, send)
+        trace = Trace(f"{scope['method']} {scope['path']}", **{
+            'http.method': scope['method'], 'http.target': scope['path'],
+        })
+        trace_token = _TRACE.set(trace)
+        span_token = _SPAN.set(trace.root)
+
+        async def send_wrapper(message):
+            if message['type'] == 'http.response.start':
+                trace.root.attributes['http.status_code'] = message['status']
+                # Streaming responses start before their body is produced; their header covers up to here
+                headers = [*message.get('headers', []), (b'server-timing', trace.server_timing().encode('latin-1'))]
+                message = {**message, 'headers': headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except BaseException as e:
+            trace.root.error = f'{type(e).__name__}: {e}'
+            raise
+        finally:
+            trace.finish()
+            _SPAN.reset(span_token)
+            _TRACE.reset(trace_token)
+            if self.exporter is not None:
+                self.exporter.export(trace)